@@ -19,7 +19,7 @@ def apply_duration_time(d):
 
 
 # we do not need polyline in csv
-df = df.drop("summary_polyline", axis=1)
+df = df.drop(["summary_polyline", "summary_polyline_lods"], axis=1, errors="ignore")
 df["elapsed_time"] = df["elapsed_time"].apply(apply_duration_time)
 df["moving_time"] = df["moving_time"].apply(apply_duration_time)
 
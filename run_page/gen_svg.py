@@ -1,37 +1,52 @@
 import argparse
+import copy
 import logging
+import multiprocessing
 import os
+import shlex
 import sys
+from collections import defaultdict, namedtuple
+from concurrent.futures import ProcessPoolExecutor
 
 from config import SQL_FILE
 from gpxtrackposter import (
     circular_drawer,
     github_drawer,
     grid_drawer,
+    heatmap_drawer,
     poster,
     track_loader,
     month_of_life_drawer,
     year_summary_drawer,
 )
 from gpxtrackposter.exceptions import ParameterError, PosterError
+from gpxtrackposter.render_manifest import (
+    RenderManifest,
+    code_digest,
+    task_digest,
+)
 
 # from flopp great repo
 __app_name__ = "create_poster"
 __app_author__ = "flopp.net"
 
+PosterTask = namedtuple(
+    "PosterTask", "args poster drawer tracks tracks_by_year year output"
+)
 
-def main():
-    """Handle command line arguments and call other modules as needed."""
 
-    p = poster.Poster()
-    drawers = {
+def create_drawers(p):
+    return {
         "grid": grid_drawer.GridDrawer(p),
         "circular": circular_drawer.CircularDrawer(p),
         "github": github_drawer.GithubDrawer(p),
         "monthoflife": month_of_life_drawer.MonthOfLifeDrawer(p),
         "year_summary": year_summary_drawer.YearSummaryDrawer(p),
+        "heatmap": heatmap_drawer.HeatmapDrawer(p),
     }
 
+
+def create_parser(drawers):
     args_parser = argparse.ArgumentParser()
     args_parser.add_argument(
         "--gpx-dir",
@@ -208,20 +223,65 @@ def main():
         help="Generate separate SVG files for each year (for github type only)",
     )
 
-    for _, drawer in drawers.items():
-        drawer.create_args(args_parser)
+    args_parser.add_argument(
+        "--svg-writer",
+        dest="svg_writer",
+        choices=["svgwrite", "stream", "compact"],
+        default="svgwrite",
+        help='SVG backend; "stream" writes elements straight to the file with '
+        'fixed-precision numbers, "compact" also uses relative path data and CSS '
+        'classes and reports the size saved (default: "svgwrite").',
+    )
+    args_parser.add_argument(
+        "--svg-precision",
+        dest="svg_precision",
+        metavar="DIGITS",
+        type=int,
+        help="Decimals kept by the stream/compact writers (default: 3 for stream, "
+        "2 for compact).",
+    )
+    args_parser.add_argument(
+        "--svg-static",
+        dest="svg_static",
+        action="store_true",
+        help="Drop per-track tooltips and click targets; with --svg-writer compact "
+        "same-style tracks are merged into one path.",
+    )
 
-    args = args_parser.parse_args()
+    args_parser.add_argument(
+        "--jobs",
+        dest="jobs",
+        metavar="FILE",
+        type=str,
+        help="Render every poster listed in FILE, one set of gen_svg arguments per "
+        "line, loading tracks only once; options given on the command line apply "
+        "to every line.",
+    )
+    args_parser.add_argument(
+        "--workers",
+        dest="workers",
+        metavar="N",
+        type=int,
+        default=os.cpu_count(),
+        help="Number of worker processes drawing posters and per-year posters "
+        "(default: CPU count).",
+    )
+
+    args_parser.add_argument(
+        "--manifest",
+        dest="manifest",
+        metavar="FILE",
+        type=str,
+        help="Keep a hash of every output's inputs in FILE and skip outputs "
+        "whose inputs did not change since the last run.",
+    )
 
     for _, drawer in drawers.items():
-        drawer.fetch_args(args)
+        drawer.create_args(args_parser)
+    return args_parser
 
-    log = logging.getLogger("gpxtrackposter")
-    log.setLevel(logging.INFO if args.verbose else logging.ERROR)
-    if args.logfile:
-        handler = logging.FileHandler(args.logfile)
-        log.addHandler(handler)
 
+def create_loader(args):
     loader = track_loader.TrackLoader()
     if args.use_localtime:
         loader.use_local_time = True
@@ -231,18 +291,38 @@ def main():
     loader.special_file_names = args.special
     loader.min_length = args.min_distance * 1000
 
+    return loader
+
+
+def load_tracks(args, with_geometry=True):
+    loader = create_loader(args)
     if args.from_db:
         # for svg from db here if you want gpx please do not use --from-db
         # args.type == "grid" means have polyline data or not
-        tracks = loader.load_tracks_from_db(SQL_FILE, args.type == "grid")
+        tracks = loader.load_tracks_from_db(
+            SQL_FILE, args.type == "grid", args.sport_type, with_geometry
+        )
     else:
         tracks = loader.load_tracks(args.gpx_dir)
+    return tracks
+
+
+def plan_posters(args, tracks):
+    """Set up the Poster described by args and return its render tasks.
+
+    Per-year posters (circular, year_summary, github --generate-all-years) get
+    one task per year over a tracks-by-year index, so years render independently.
+    """
+    p = poster.Poster()
+    drawers = create_drawers(p)
+    for _, drawer in drawers.items():
+        drawer.fetch_args(args)
 
     if args.sport_type != "all":
         tracks = [track for track in tracks if track.type == args.sport_type]
 
     if not tracks:
-        return
+        return []
 
     is_circular = args.type == "circular"
     is_mol = args.type == "monthoflife"
@@ -284,6 +364,9 @@ def main():
     if args.type == "github":
         p.height = 55 + p.years.real_year * 43
     p.github_style = args.github_style
+    p.svg_writer = args.svg_writer
+    p.svg_precision = args.svg_precision
+    p.svg_interactive = not args.svg_static
 
     if args.type == "circular":
         if args.background_color == "#222222":
@@ -295,47 +378,170 @@ def main():
         if args.text_color == "#FFFFFF":
             p.colors["text"] = "#e1ed5e"
 
-    # for special circular
+    tracks_by_year = defaultdict(list)
+    for t in tracks:
+        tracks_by_year[t.start_time_local.year].append(t)
+
+    drawer = drawers[args.type]
     if is_circular:
-        years = p.years.all()[:]
         output_dir = os.path.dirname(args.output) or "assets"
-        for y in years:
-            p.years.from_year, p.years.to_year = y, y
-            # may be refactor
-            p.set_tracks(tracks)
-            p.draw(drawers[args.type], os.path.join(output_dir, f"year_{str(y)}.svg"))
+        output = os.path.join(output_dir, "year_{}.svg")
     elif is_year_summary and args.summary_year is None:
         # Generate year summary for all years when --summary-year is not specified
-        years = p.years.all()[:]
         output_dir = os.path.dirname(args.output) or "assets"
-        for y in years:
-            drawers[args.type].year = y
-            p.draw(
-                drawers[args.type],
-                os.path.join(output_dir, f"year_summary_{str(y)}.svg"),
-            )
+        output = os.path.join(output_dir, "year_summary_{}.svg")
     elif is_github and args.year == "all" and args.generate_all_years:
         # Generate GitHub heat map for all years when --generate-all-years flag is set
-        years = p.years.all()[:]
         output_dir = os.path.dirname(args.output) or "assets"
-        for y in years:
-            p.years.from_year, p.years.to_year = y, y
-            # Single year = height for exactly 1 year row
-            p.height = 55 + 1 * 43
-            # Re-set tracks for this year's data
-            p.set_tracks(tracks)
-            # Use year-specific title if available, otherwise use default
-            year_title = args.title if args.title else f"{y} Running"
-            original_title = p.title
-            p.title = year_title
-            p.draw(
-                drawers[args.type],
-                os.path.join(output_dir, f"github_{str(y)}.svg"),
-            )
-            # Restore original title for next iteration
-            p.title = original_title
+        output = os.path.join(output_dir, "github_{}.svg")
+    else:
+        return [PosterTask(args, p, drawer, tracks, tracks_by_year, None, args.output)]
+    if is_github or is_year_summary:
+        # compute the statistics of all years once, the tasks' copies share them
+        _ = p.yearly_stats
+    return [
+        PosterTask(
+            args,
+            *_year_poster(args, p, drawer, tracks_by_year, y),
+            tracks,
+            tracks_by_year,
+            y,
+            output.format(y),
+        )
+        for y in p.years.all()
+    ]
+
+
+def _year_poster(args, p, drawer, tracks_by_year, year):
+    """Return a copy of the Poster and its drawer narrowed to one year."""
+    drawer = copy.copy(drawer)
+    if args.type == "year_summary":
+        drawer.year = year
+        return p, drawer
+    p = copy.copy(p)
+    p.years = copy.copy(p.years)
+    p.years.from_year, p.years.to_year = year, year
+    p.set_tracks(p.tracks, tracks_by_year.get(year, []))
+    if args.type == "github":
+        # Single year = height for exactly 1 year row
+        p.height = 55 + 1 * 43
+        # Use year-specific title if available, otherwise use default
+        p.title = args.title if args.title else f"{year} Running"
+    drawer.poster = p
+    return p, drawer
+
+
+def draw_poster(task):
+    """Draw one render task."""
+    p = task.poster
+    # tasks of different jobs may share this process, and the locale is global
+    p.set_language(p.language)
+    p.draw(task.drawer, task.output)
+
+
+# Shared with forked workers so tracks and posters are set up once, never pickled.
+_tasks = []
+
+
+def _draw_task(index):
+    draw_poster(_tasks[index])
+
+
+def draw_posters(tasks, workers):
+    """Draw all tasks, across forked worker processes when possible."""
+    global _tasks
+    can_fork = "fork" in multiprocessing.get_all_start_methods()
+    if workers <= 1 or len(tasks) <= 1 or not can_fork:
+        for task in tasks:
+            draw_poster(task)
+        return
+    _tasks = tasks
+    context = multiprocessing.get_context("fork")
+    try:
+        with ProcessPoolExecutor(min(workers, len(tasks)), mp_context=context) as pool:
+            for future in [pool.submit(_draw_task, i) for i in range(len(tasks))]:
+                future.result()
+    finally:
+        _tasks = []
+
+
+def parse_jobs(args, args_parser):
+    """Parse every line of the --jobs file on top of the command line args."""
+    jobs = []
+    with open(args.jobs, encoding="utf-8") as f:
+        for line in f:
+            job_args = shlex.split(line, comments=True)
+            if job_args:
+                namespace = copy.deepcopy(args)
+                namespace.jobs = None
+                jobs.append(args_parser.parse_args(job_args, namespace=namespace))
+    return jobs
+
+
+def _job_source(args):
+    return "db" if args.from_db else args.gpx_dir
+
+
+def plan_jobs(jobs, drawers):
+    """Load each track source once and plan the posters of all jobs."""
+    with_geometry = any(drawers[args.type].uses_geometry for args in jobs)
+    sources = {}
+    tasks = []
+    for args in jobs:
+        source = _job_source(args)
+        if source not in sources:
+            loader = track_loader.TrackLoader()
+            if args.from_db:
+                sources[source] = loader.read_tracks_from_db(
+                    SQL_FILE, with_geometry=with_geometry
+                )
+            else:
+                sources[source] = loader.read_tracks(args.gpx_dir)
+        tracks = create_loader(args).filter_tracks(
+            sources[source], args.from_db and args.type == "grid"
+        )
+        tasks.extend(plan_posters(args, tracks))
+    return tasks
+
+
+def draw_changed_posters(tasks, manifest_file, workers):
+    """Draw only the tasks whose inputs changed since the manifest was written."""
+    manifest = RenderManifest(manifest_file)
+    code = code_digest()
+    digests = {}
+    changed = []
+    for task in tasks:
+        digest = task_digest(task, code, digests)
+        if manifest.is_current(task.output, digest):
+            print(f"{task.output} is up to date, skipping")
+        else:
+            changed.append((task, digest))
+    draw_posters([task for task, _ in changed], workers)
+    for task, digest in changed:
+        manifest.update(task.output, digest)
+    manifest.save()
+
+
+def main():
+    """Handle command line arguments and call other modules as needed."""
+    drawers = create_drawers(poster.Poster())
+    args_parser = create_parser(drawers)
+    args = args_parser.parse_args()
+
+    log = logging.getLogger("gpxtrackposter")
+    log.setLevel(logging.INFO if args.verbose else logging.ERROR)
+    if args.logfile:
+        handler = logging.FileHandler(args.logfile)
+        log.addHandler(handler)
+
+    if args.jobs:
+        tasks = plan_jobs(parse_jobs(args, args_parser), drawers)
+    else:
+        tasks = plan_posters(args, load_tracks(args, drawers[args.type].uses_geometry))
+    if args.manifest:
+        draw_changed_posters(tasks, args.manifest, args.workers)
     else:
-        p.draw(drawers[args.type], args.output)
+        draw_posters(tasks, args.workers)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,148 @@
+"""
+Build a static Mapbox Vector Tile pyramid of all routes in the db.
+
+The tiles are written as {output}/{z}/{x}/{y}.pbf with a tiles.json next to
+them, so the web map can load only the geometry of the tiles in view instead
+of every polyline in activities.json.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+import polyline
+from config import SQL_FILE, TILES_DIR
+from generator.db import Activity, init_db
+from polyline_processor import filter_out
+from vector_tiles import (
+    clip_to_tiles,
+    encode_layer,
+    lat_lng_to_world,
+    simplify_lines,
+    world_to_lng_lat,
+)
+
+IGNORE_BEFORE_SAVING = os.getenv("IGNORE_BEFORE_SAVING", False)
+
+LAYER = "runs"
+FIELDS = {
+    "run_id": "Number",
+    "name": "String",
+    "type": "String",
+    "start_date_local": "String",
+    "distance": "Number",
+}
+
+
+def load_routes(sql_file):
+    """Routes of all activities with a polyline, as (properties, world points)."""
+    session = init_db(sql_file)
+    activities = (
+        session.query(Activity)
+        .filter(Activity.summary_polyline != "")
+        .order_by(Activity.start_date_local)
+    )
+    routes = []
+    for activity in activities:
+        summary_polyline = activity.summary_polyline
+        # the same privacy filter as activities.json, see Generator.load
+        if not IGNORE_BEFORE_SAVING:
+            summary_polyline = filter_out(summary_polyline)
+        if not summary_polyline:
+            continue
+        points = polyline.decode(summary_polyline)
+        if len(points) < 2:
+            continue
+        properties = {
+            "run_id": activity.run_id,
+            "name": activity.name,
+            "type": activity.type,
+            "start_date_local": activity.start_date_local,
+            "distance": activity.distance,
+        }
+        routes.append((properties, lat_lng_to_world(points)))
+    return routes
+
+
+def build_tiles(routes, output, min_zoom=0, max_zoom=14):
+    """Write the tiles of every zoom level and return how many were written."""
+    lines = [points for _, points in routes]
+    count = 0
+    for zoom in range(max_zoom, min_zoom - 1, -1):
+        for (x, y), pieces in clip_to_tiles(simplify_lines(lines, zoom), zoom).items():
+            features = [
+                (routes[i][0]["run_id"], routes[i][0], pieces[i])
+                for i in sorted(pieces)
+            ]
+            tile_dir = os.path.join(output, str(zoom), str(x))
+            os.makedirs(tile_dir, exist_ok=True)
+            with open(os.path.join(tile_dir, f"{y}.pbf"), "wb") as f:
+                f.write(encode_layer(LAYER, features))
+            count += 1
+    return count
+
+
+def write_tilejson(routes, output, url, min_zoom, max_zoom):
+    points = np.concatenate([points for _, points in routes])
+    west, north = world_to_lng_lat(*points.min(axis=0))
+    east, south = world_to_lng_lat(*points.max(axis=0))
+    tilejson = {
+        "tilejson": "3.0.0",
+        "tiles": [url],
+        "minzoom": min_zoom,
+        "maxzoom": max_zoom,
+        "bounds": [west, south, east, north],
+        "vector_layers": [
+            {
+                "id": LAYER,
+                "fields": FIELDS,
+                "minzoom": min_zoom,
+                "maxzoom": max_zoom,
+            }
+        ],
+    }
+    with open(os.path.join(output, "tiles.json"), "w", encoding="utf-8") as f:
+        json.dump(tilejson, f, indent=2)
+        f.write("\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--output",
+        default=TILES_DIR,
+        help=f"Directory to write the tiles to (default: {TILES_DIR}).",
+    )
+    parser.add_argument("--min-zoom", type=int, default=0, help="(default: 0)")
+    parser.add_argument("--max-zoom", type=int, default=14, help="(default: 14)")
+    parser.add_argument(
+        "--url",
+        default="/tiles/{z}/{x}/{y}.pbf",
+        help="Tile URL template written to tiles.json "
+        '(default: "/tiles/{z}/{x}/{y}.pbf").',
+    )
+    args = parser.parse_args()
+
+    start = time.time()
+    routes = load_routes(SQL_FILE)
+    # tiles of routes that were deleted or moved must not stay behind
+    for zoom in range(0, 31):
+        zoom_dir = os.path.join(args.output, str(zoom))
+        if os.path.isdir(zoom_dir):
+            shutil.rmtree(zoom_dir)
+    if not routes:
+        print("No routes to build tiles from.")
+        return
+    count = build_tiles(routes, args.output, args.min_zoom, args.max_zoom)
+    write_tilejson(routes, args.output, args.url, args.min_zoom, args.max_zoom)
+    print(
+        f"Wrote {count} tiles of {len(routes)} routes to {args.output} "
+        f"in {time.time() - start:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -9,7 +9,7 @@ import stravalib
 from gpxtrackposter import track_loader
 from sqlalchemy import func
 
-from polyline_processor import filter_out
+from polyline_processor import build_polyline_lods, filter_out
 from synced_data_file_logger import save_synced_data_file_list
 
 from .db import Activity, init_db, update_or_create_activity
@@ -275,6 +275,7 @@ class Generator:
                     poly = a.get("summary_polyline", "")
                     if poly and not db_activity.summary_polyline:
                         db_activity.summary_polyline = poly
+                        db_activity.summary_polyline_lods = build_polyline_lods(poly)
         self.session.commit()
 
         return activity_list
@@ -16,6 +16,8 @@ from sqlalchemy import (
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
+from polyline_processor import build_polyline_lods
+
 Base = declarative_base()
 
 
@@ -58,9 +60,11 @@ class Activity(Base):
     type = Column(String)
     subtype = Column(String)
     start_date = Column(String)
-    start_date_local = Column(String)
+    start_date_local = Column(String, index=True)
     location_country = Column(String)
     summary_polyline = Column(String)
+    # JSON list of simplified summary_polyline levels, see polyline_processor
+    summary_polyline_lods = Column(String)
     average_heartrate = Column(Float)
     average_speed = Column(Float)
     elevation_gain = Column(Float)
@@ -146,6 +150,9 @@ def update_or_create_activity(session, run_activity):
                     run_activity.map and run_activity.map.summary_polyline or ""
                 ),
             )
+            activity.summary_polyline_lods = build_polyline_lods(
+                activity.summary_polyline
+            )
             session.add(activity)
             created = True
         else:
@@ -161,6 +168,9 @@ def update_or_create_activity(session, run_activity):
             activity.summary_polyline = (
                 run_activity.map and run_activity.map.summary_polyline or ""
             )
+            activity.summary_polyline_lods = build_polyline_lods(
+                activity.summary_polyline
+            )
     except Exception as e:
         print(f"something wrong with {run_activity.id}")
         print(str(e))
@@ -168,6 +178,18 @@ def update_or_create_activity(session, run_activity):
     return created
 
 
+def fill_missing_polyline_lods(session):
+    """Precompute levels of detail for activities stored before they existed."""
+    activities = session.query(Activity).filter(
+        Activity.summary_polyline_lods.is_(None),
+        Activity.summary_polyline.isnot(None),
+        Activity.summary_polyline != "",
+    )
+    for activity in activities:
+        activity.summary_polyline_lods = build_polyline_lods(activity.summary_polyline)
+    session.commit()
+
+
 def add_missing_columns(engine, model):
     inspector = inspect(engine)
     table_name = model.__tablename__
@@ -186,6 +208,7 @@ def add_missing_columns(engine, model):
                         f"ALTER TABLE {table_name} ADD COLUMN {column.name} {column_type}"
                     )
                 )
+    return [column.name for column in missing_columns]
 
 
 def init_db(db_path):
@@ -195,10 +218,16 @@ def init_db(db_path):
     Base.metadata.create_all(engine)
 
     # check missing columns
-    add_missing_columns(engine, Activity)
+    added_columns = add_missing_columns(engine, Activity)
+    # create_all skips the indexes of tables that already exist
+    for index in Activity.__table__.indexes:
+        index.create(engine, checkfirst=True)
 
     sm = sessionmaker(bind=engine)
     session = sm()
+    if "summary_polyline_lods" in added_columns:
+        # once, for the routes stored before; new ones get theirs when written
+        fill_missing_polyline_lods(session)
     # apply the changes
     session.commit()
     return session
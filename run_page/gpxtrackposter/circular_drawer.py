@@ -152,10 +152,11 @@ class CircularDrawer(TracksDrawer):
                 path.push(
                     f"a{r3},{r3} 0 0,1 {r3 * (sin_a3 - sin_a1)},{r3 * (cos_a1 - cos_a3)}"
                 )
-                dr.add(path)
-                tpath = svgwrite.text.TextPath(
+                # Create the text path first so the path gets its id before being written
+                tpath = dr.textPath(
                     path, date.strftime("%B"), startOffset=(0.5 * r3 * (a3 - a1))
                 )
+                dr.add(path)
                 text = dr.text(
                     "",
                     fill=self.poster.colors["text"],
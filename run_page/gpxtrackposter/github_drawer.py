@@ -1,5 +1,5 @@
-import calendar
 import datetime
+import functools
 import locale
 import argparse
 
@@ -11,6 +11,10 @@ from .tracks_drawer import TracksDrawer
 from .utils import format_float
 from .xy import XY
 
+DAY_SIZE = (2.6, 2.6)
+DAY_SYMBOL = "github-day"
+INDOOR_DAY_SYMBOL = "github-day-indoor"
+
 
 class GithubDrawer(TracksDrawer):
     """Draw a github profile-like poster"""
@@ -56,75 +60,79 @@ class GithubDrawer(TracksDrawer):
         """Check if any track in the list is an indoor activity."""
         return any(getattr(t, "subtype", None) == "indoor" for t in tracks)
 
+    def _define_day_symbols(self, dr: svgwrite.Drawing):
+        """Define the day cell, and the day cell with the indoor stripe overlay.
+
+        Days reference these symbols and carry their own fill, which the cell
+        inherits, so every day is a single short `<use>` element.
+        """
+        day = dr.symbol(id=DAY_SYMBOL)
+        day.add(dr.rect((0, 0), DAY_SIZE))
+        dr.defs.add(day)
+        indoor_day = dr.symbol(id=INDOOR_DAY_SYMBOL)
+        indoor_day.add(dr.rect((0, 0), DAY_SIZE))
+        indoor_day.add(
+            dr.rect(
+                (0, 0),
+                DAY_SIZE,
+                fill="url(#indoor-stripe)",
+                style="pointer-events: none;",
+            )
+        )
+        dr.defs.add(indoor_day)
+
+    def _day_colors(self):
+        """Fill colour and tooltip of every date with tracks."""
+        distance1 = self.poster.special_distance["special_distance"]
+        distance2 = self.poster.special_distance["special_distance2"]
+        special2 = self.poster.colors.get("special2") or self.poster.colors.get(
+            "special"
+        )
+        days = {}
+        for date, tracks in self.poster.tracks_by_date.items():
+            length = sum([t.length for t in tracks])
+            distance = self.poster.m2u(length)
+            if distance >= distance2:
+                color = special2
+            else:
+                color = self.color(
+                    self.poster.length_range_by_date,
+                    length,
+                    distance1 < distance < distance2,
+                )
+            title = f"{date} {format_float(distance)} {self.poster.u()}"
+            days[date] = (color, title, self._has_indoor_track(tracks))
+        return days
+
     def draw(self, dr: svgwrite.Drawing, size: XY, offset: XY):
         if self.poster.tracks is None:
             raise PosterError("No tracks to draw")
         self._define_indoor_pattern(dr)
+        interactive = self.poster.svg_interactive
+        # the default output keeps one rect per day, which the site's click
+        # handler and svgo's colour classes rely on; the others reuse a symbol
+        use_symbols = self.poster.svg_writer != "svgwrite" or not interactive
+        if use_symbols:
+            self._define_day_symbols(dr)
         year_size = 200 * 4.0 / 80.0
         year_style = f"font-size:{year_size}px; font-family:Arial;"
         year_length_style = f"font-size:{110 * 3.0 / 80.0}px; font-family:Arial;"
         month_names_style = "font-size:2.5px; font-family:Arial"
-        total_length_year_dict = self.poster.total_length_year_dict
+        yearly_stats = self.poster.yearly_stats
+        month_names = _month_names()
+        days = self._day_colors()
+        day_href = f"#{DAY_SYMBOL}"
+        indoor_day_href = f"#{INDOOR_DAY_SYMBOL}"
 
         is_align_monday = self.poster.github_style == "align-monday"
         for year in range(self.poster.years.from_year, self.poster.years.to_year + 1)[
             ::-1
         ]:
-            start_date_weekday, _ = calendar.monthrange(year, 1)
-            github_rect_first_day = datetime.date(year, 1, 1)
-
-            # default GitHub svg style:  the start day of each year always aligns with first day.
-            github_rect_day = github_rect_first_day
-            first_day_weekday = github_rect_first_day.weekday()
-
-            if is_align_monday:
-                # This is an earlier GitHub style: the start day of each year always aligns with Monday.
-                # If you want to use this, please add the command-line argument "--github-style align-monday" .
-                github_rect_day = github_rect_first_day + datetime.timedelta(
-                    -start_date_weekday
-                )
-                first_day_weekday = 0
-
-            year_length = total_length_year_dict.get(year, 0)
+            year_length = yearly_stats.year(year).total_length
             year_length = format_float(self.poster.m2u(year_length))
 
             if str(year_length) == "0.0":
                 continue
-            try:
-                month_names = [
-                    locale.nl_langinfo(day)[:3]  # Get only first three letters
-                    for day in [
-                        locale.MON_1,
-                        locale.MON_2,
-                        locale.MON_3,
-                        locale.MON_4,
-                        locale.MON_5,
-                        locale.MON_6,
-                        locale.MON_7,
-                        locale.MON_8,
-                        locale.MON_9,
-                        locale.MON_10,
-                        locale.MON_11,
-                        locale.MON_12,
-                    ]
-                ]
-                # support windows or others doesn't support locale Name, by Hard code
-            except Exception as e:
-                print(str(e))
-                month_names = [
-                    "Jan",
-                    "Feb",
-                    "Mar",
-                    "Apr",
-                    "May",
-                    "Jun",
-                    "Jul",
-                    "Aug",
-                    "Sep",
-                    "Oct",
-                    "Nov",
-                    "Dec",
-                ]
             dr.add(
                 dr.text(
                     f"{year}",
@@ -155,57 +163,76 @@ class GithubDrawer(TracksDrawer):
                     )
                 )
 
-            rect_x = 10.0
-            dom = (2.6, 2.6)
-
-            # add every day of this year for 53 weeks and per week has 7 days
-            for i in range(54):
-                # the first day of the first week of the year may not Monday
-                # so we need to skip some empty spaces
-                if i == 0:
-                    rect_y = offset.y + year_size + 2 + 3.5 * first_day_weekday
+            top = offset.y + year_size + 2
+            for date, x, y in _year_layout(year, is_align_monday):
+                color, title, indoor = days.get(date, (self.empty_color, date, False))
+                if use_symbols:
+                    day = dr.use(
+                        indoor_day_href if indoor else day_href,
+                        insert=(x, top + y),
+                        fill=color,
+                    )
                 else:
-                    # the first day of the n week (n >1) must be  Monday
-                    # so set first_day_weekday = 0
-                    first_day_weekday = 0
-                    rect_y = offset.y + year_size + 2
-                for j in range(7 - first_day_weekday):
-                    if int(github_rect_day.year) > year:
-                        break
-                    rect_y += 3.5
-                    color = self.empty_color
-                    date_title = str(github_rect_day)
-                    if date_title in self.poster.tracks_by_date:
-                        tracks = self.poster.tracks_by_date[date_title]
-                        length = sum([t.length for t in tracks])
-                        distance1 = self.poster.special_distance["special_distance"]
-                        distance2 = self.poster.special_distance["special_distance2"]
-                        has_special = distance1 < self.poster.m2u(length) < distance2
-                        color = self.color(
-                            self.poster.length_range_by_date, length, has_special
+                    day = dr.rect((x, top + y), DAY_SIZE, fill=color)
+                if interactive:
+                    day.set_desc(title=title)
+                dr.add(day)
+                if indoor and not use_symbols:
+                    # diagonal stripe overlay for indoor days
+                    dr.add(
+                        dr.rect(
+                            (x, top + y),
+                            DAY_SIZE,
+                            fill="url(#indoor-stripe)",
+                            style="pointer-events: none;",
                         )
-                        if self.poster.m2u(length) >= distance2:
-                            color = self.poster.colors.get(
-                                "special2"
-                            ) or self.poster.colors.get("special")
-                        str_length = format_float(self.poster.m2u(length))
-                        date_title = f"{date_title} {str_length} {self.poster.u()}"
-
-                    rect = dr.rect((rect_x, rect_y), dom, fill=color)
-                    rect.set_desc(title=date_title)
-                    dr.add(rect)
-                    # Add diagonal stripe overlay for indoor days
-                    day_key = date_title.split(" ")[0]
-                    if day_key in self.poster.tracks_by_date:
-                        if self._has_indoor_track(self.poster.tracks_by_date[day_key]):
-                            dr.add(
-                                dr.rect(
-                                    (rect_x, rect_y),
-                                    dom,
-                                    fill="url(#indoor-stripe)",
-                                    style="pointer-events: none;",
-                                )
-                            )
-                    github_rect_day += datetime.timedelta(1)
-                rect_x += 3.5
+                    )
             offset.y += 3.5 * 9 + year_size + 1.0
+
+
+@functools.lru_cache(maxsize=None)
+def _year_layout(year: int, align_monday: bool):
+    """(date, x, y) of every day cell of a year, y relative to the first row.
+
+    By default the first column starts with January 1st; with `align_monday`
+    (an earlier GitHub style) every column starts on Monday, so the first one
+    may hold the last days of the previous year.
+    """
+    first_day = datetime.date(year, 1, 1)
+    if align_monday:
+        first_day -= datetime.timedelta(first_day.weekday())
+    last_day = datetime.date(year, 12, 31)
+    layout = []
+    position = first_day.weekday()
+    for ordinal in range(first_day.toordinal(), last_day.toordinal() + 1):
+        week, weekday = divmod(position, 7)
+        date = datetime.date.fromordinal(ordinal)
+        layout.append((str(date), 10.0 + 3.5 * week, 3.5 * (weekday + 1)))
+        position += 1
+    return tuple(layout)
+
+
+def _month_names():
+    """Abbreviated month names of the current locale."""
+    try:
+        # Get only first three letters
+        return [
+            locale.nl_langinfo(getattr(locale, f"MON_{m}"))[:3] for m in range(1, 13)
+        ]
+    # support windows or others doesn't support locale Name, by Hard code
+    except Exception as e:
+        print(str(e))
+        return [
+            "Jan",
+            "Feb",
+            "Mar",
+            "Apr",
+            "May",
+            "Jun",
+            "Jul",
+            "Aug",
+            "Sep",
+            "Oct",
+            "Nov",
+            "Dec",
+        ]
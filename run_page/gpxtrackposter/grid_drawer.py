@@ -11,17 +11,28 @@ from .exceptions import PosterError
 from .poster import Poster
 from .track import Track
 from .tracks_drawer import TracksDrawer
-from .utils import compute_grid, format_float, project
+from .utils import compute_grid, coordinates_bbox, format_float, project
 from .xy import XY
 
+# CSS pixels the site shows grid.svg at, at most: two thirds of the 1536px wide
+# page, less its 64px padding
+DISPLAY_WIDTH = 940
+
 
 class GridDrawer(TracksDrawer):
     """Drawer used to draw a grid poster
 
+    Attributes:
+        display_width: Pixels the poster's width is shown at. Tracks are drawn
+            with the coarsest level of detail within half a pixel at that size.
+
     Methods:
         draw: For each track, draw it on the poster.
     """
 
+    display_width = DISPLAY_WIDTH
+    uses_geometry = True
+
     def __init__(self, the_poster: Poster):
         super().__init__(the_poster)
 
@@ -58,7 +69,9 @@ class GridDrawer(TracksDrawer):
         str_length = format_float(self.poster.m2u(tr.length))
 
         date_title = f"{str(tr.start_time_local)[:10]} {str_length}{self.poster.u()}"
-        for line in project(tr.bbox(), size, offset, tr.polylines):
+        pixels_per_unit = self.display_width / self.poster.width
+        lines = tr.coordinates_for(max(size.x, size.y) * pixels_per_unit)
+        for line in project(coordinates_bbox(lines), size, offset, lines):
             distance1 = self.poster.special_distance["special_distance"]
             distance2 = self.poster.special_distance["special_distance2"]
             has_special = distance1 < self.poster.m2u(tr.length) < distance2
@@ -69,7 +82,7 @@ class GridDrawer(TracksDrawer):
                 )
             is_indoor = getattr(tr, "subtype", None) == "indoor"
             polyline = dr.polyline(
-                points=line,
+                points=line.tolist(),
                 stroke=color,
                 fill="none",
                 stroke_width=0.5,
@@ -0,0 +1,157 @@
+"""Draw a density heatmap of all tracks on one map."""
+
+import argparse
+import base64
+import math
+
+import numpy as np
+import s2sphere as s2
+import svgwrite
+
+from .exceptions import PosterError
+from .poster import Poster
+from .raster import accumulate_lines, encode_png, mask_rects, scale_density
+from .tracks_drawer import TracksDrawer
+from .utils import COLOR_STEPS, color_gradient, project
+from .xy import XY
+
+
+class HeatmapDrawer(TracksDrawer):
+    """Draw how often each place was run through as a density raster.
+
+    All tracks are projected onto one map and rasterised into a NumPy grid,
+    so rendering time and file size depend on the resolution rather than on
+    the number of tracks.
+
+    Attributes:
+        scale: "log" or "percentile" scaling of the density.
+        output: "png" embeds one image, "svg" draws density levels as paths.
+        pixels_per_unit: Raster pixels per poster unit.
+        levels: Number of density levels drawn with svg output.
+        focus_degrees: The map shows the area within this many degrees of
+            the 0.1 degree cell with the most track points, so runs in other
+            cities do not shrink the one most run in.
+        bbox_percentile: Points outside this percentile range of latitudes
+            and longitudes in that area are left out of the map.
+
+    Methods:
+        create_args: Set up an argparser for heatmap poster options.
+        fetch_args: Get args from argparser.
+        draw: Draw the density of all tracks on the Poster.
+    """
+
+    uses_geometry = True
+
+    def __init__(self, the_poster: Poster):
+        super().__init__(the_poster)
+        self.scale = "log"
+        self.output = "png"
+        self.pixels_per_unit = 4
+        self.levels = 8
+        self.focus_degrees = 0.25
+        self.bbox_percentile = 1
+
+    def create_args(self, args_parser: argparse.ArgumentParser):
+        group = args_parser.add_argument_group("Heatmap Type Options")
+        group.add_argument(
+            "--heatmap-scale",
+            dest="heatmap_scale",
+            choices=["log", "percentile"],
+            default="log",
+            help='Density scaling; "log" or "percentile" (default: "log").',
+        )
+        group.add_argument(
+            "--heatmap-output",
+            dest="heatmap_output",
+            choices=["png", "svg"],
+            default="png",
+            help='"png" embeds one raster image, "svg" draws density levels as '
+            'paths (default: "png").',
+        )
+        group.add_argument(
+            "--heatmap-resolution",
+            dest="heatmap_resolution",
+            metavar="PIXELS",
+            type=int,
+            default=4,
+            help="Raster pixels per poster unit (default: 4).",
+        )
+
+    def fetch_args(self, args):
+        self.scale = args.heatmap_scale
+        self.output = args.heatmap_output
+        self.pixels_per_unit = args.heatmap_resolution
+
+    def draw(self, dr: svgwrite.Drawing, size: XY, offset: XY):
+        if self.poster.tracks is None:
+            raise PosterError("No tracks to draw.")
+        ppu = self.pixels_per_unit
+        lines = []
+        for tr in self.poster.tracks:
+            lines.extend(tr.coordinates_for(max(size.x, size.y) * ppu))
+        bbox = self._bbox(lines)
+        if bbox is None:
+            return
+        width, height = math.ceil(size.x * ppu), math.ceil(size.y * ppu)
+        projected = project(bbox, XY(width, height), XY(0, 0), lines)
+        values = scale_density(accumulate_lines(projected, width, height), self.scale)
+        gradient = color_gradient(
+            self.poster.colors["track"], self.poster.colors["special"]
+        )
+        if self.output == "svg":
+            self._draw_levels(dr, values, gradient, offset)
+        else:
+            self._draw_image(dr, values, gradient, offset)
+
+    def _bbox(self, lines):
+        points = [line for line in lines if len(line)]
+        if not points:
+            return None
+        points = np.concatenate(points)
+        cells, counts = np.unique(
+            np.floor(points * 10).astype(np.int64), axis=0, return_counts=True
+        )
+        center = (cells[np.argmax(counts)] + 0.5) / 10
+        points = points[(np.abs(points - center) <= self.focus_degrees).all(axis=1)]
+        lo = np.percentile(points, self.bbox_percentile, axis=0)
+        hi = np.percentile(points, 100 - self.bbox_percentile, axis=0)
+        if (lo == hi).any():
+            return None
+        return s2.LatLngRect.from_point_pair(
+            s2.LatLng.from_degrees(*lo), s2.LatLng.from_degrees(*hi)
+        )
+
+    def _draw_image(self, dr, values, gradient, offset: XY):
+        rgb = np.array(
+            [[int(color[i : i + 2], 16) for i in (1, 3, 5)] for color in gradient],
+            dtype=np.uint8,
+        )
+        height, width = values.shape
+        rgba = np.zeros((height, width, 4), dtype=np.uint8)
+        rgba[..., :3] = rgb[np.rint(values * (COLOR_STEPS - 1)).astype(int)]
+        # faint areas fade into the background instead of a hard edge
+        rgba[..., 3] = np.where(values > 0, np.rint(255 * (0.3 + 0.7 * values)), 0)
+        href = "data:image/png;base64," + base64.b64encode(encode_png(rgba)).decode()
+        dr.add(
+            dr.image(
+                href,
+                insert=offset.tuple(),
+                size=(width / self.pixels_per_unit, height / self.pixels_per_unit),
+                preserveAspectRatio="none",
+            )
+        )
+
+    def _draw_levels(self, dr, values, gradient, offset: XY):
+        levels = np.ceil(values * self.levels)
+        # level paths are drawn on top of each other, in raster pixels
+        transform = (
+            f"translate({offset.x:.3f},{offset.y:.3f}) "
+            f"scale({1 / self.pixels_per_unit:.6f})"
+        )
+        for level in range(1, self.levels + 1):
+            rects = mask_rects(levels >= level)
+            if not rects:
+                continue
+            d = "".join(f"M{x} {y}h{w}v{h}h{-w}z" for x, y, w, h in rects)
+            color = gradient[round(level / self.levels * (COLOR_STEPS - 1))]
+            dr.add(dr.path(d=d, fill=color, stroke="none", transform=transform))
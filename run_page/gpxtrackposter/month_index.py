@@ -0,0 +1,115 @@
+"""Per-month and per-day totals, built once and shared by drawers and the TUI."""
+
+import calendar
+
+import numpy as np
+
+
+class MonthIndex:
+    """Distance and activity counts bucketed by month and day of month.
+
+    Activities are keyed by (year * 12 + month - 1) * 31 + day - 1 and summed
+    with one np.bincount, so looking up a month or a year is an array slice.
+
+    Methods:
+        from_tracks: Build the index from poster tracks (lengths in meters)
+        total: Summed value of a month
+        count: Number of activities in a month
+        day_totals: Summed value of each day (1-31) of a month
+        month_totals: Summed value of each month (1-12) of a year
+        month_counts: Number of activities in each month (1-12) of a year
+        year_day_totals: Summed value of each day of a year, January 1st first
+        year_day_counts: Number of activities on each day of a year
+    """
+
+    def __init__(self, dates, values, counts=None):
+        """
+        Args:
+            dates: date or datetime of each activity.
+            values: Value summed per bucket for each activity, e.g. a distance.
+            counts: Number of activities of each entry when they are already
+                summed by day, one each by default.
+        """
+        keys = np.fromiter(
+            ((d.year * 12 + d.month - 1) * 31 + d.day - 1 for d in dates),
+            dtype=np.int64,
+        )
+        self.first = int(keys.min()) // 31 if len(keys) else 0
+        keys -= self.first * 31
+        size = (int(keys.max()) // 31 + 1) * 31 if len(keys) else 0
+        self.totals = np.bincount(
+            keys, weights=np.asarray(values, dtype=float), minlength=size
+        ).reshape(-1, 31)
+        if counts is None:
+            self.counts = np.bincount(keys, minlength=size).reshape(-1, 31)
+        else:
+            self.counts = (
+                np.bincount(keys, weights=np.asarray(counts), minlength=size)
+                .astype(np.int64)
+                .reshape(-1, 31)
+            )
+
+    @classmethod
+    def from_tracks(cls, tracks) -> "MonthIndex":
+        return cls([t.start_time_local for t in tracks], [t.length for t in tracks])
+
+    @classmethod
+    def combine(cls, indexes) -> "MonthIndex":
+        """Index of the activities of several indexes, their tables summed."""
+        indexes = [index for index in indexes if len(index.totals)]
+        combined = cls([], [])
+        if not indexes:
+            return combined
+        combined.first = min(index.first for index in indexes)
+        rows = max(index.first + len(index.totals) for index in indexes)
+        combined.totals = np.zeros((rows - combined.first, 31))
+        combined.counts = np.zeros((rows - combined.first, 31), dtype=np.int64)
+        for index in indexes:
+            start = index.first - combined.first
+            combined.totals[start : start + len(index.totals)] += index.totals
+            combined.counts[start : start + len(index.counts)] += index.counts
+        return combined
+
+    def _days(self, table: np.ndarray, year: int, month: int) -> np.ndarray:
+        row = year * 12 + month - 1 - self.first
+        if 0 <= row < len(table):
+            return table[row]
+        return np.zeros(31, dtype=table.dtype)
+
+    def _year(self, table: np.ndarray, year: int) -> np.ndarray:
+        start = year * 12 - self.first
+        result = np.zeros((12, 31), dtype=table.dtype)
+        lo, hi = max(start, 0), min(start + 12, len(table))
+        if lo < hi:
+            result[lo - start : hi - start] = table[lo:hi]
+        return result
+
+    def _months(self, table: np.ndarray, year: int) -> np.ndarray:
+        return self._year(table, year).sum(axis=1)
+
+    def _year_days(self, table: np.ndarray, year: int) -> np.ndarray:
+        # the real dates of the (month, day) table, in calendar order
+        lengths = [calendar.monthrange(year, month)[1] for month in range(1, 13)]
+        real = np.arange(31) < np.array(lengths)[:, None]
+        return self._year(table, year)[real]
+
+    def total(self, year: int, month: int) -> float:
+        return float(self._days(self.totals, year, month).sum())
+
+    def count(self, year: int, month: int) -> int:
+        return int(self._days(self.counts, year, month).sum())
+
+    def day_totals(self, year: int, month: int) -> np.ndarray:
+        return self._days(self.totals, year, month)
+
+    def month_totals(self, year: int) -> np.ndarray:
+        return self._months(self.totals, year)
+
+    def month_counts(self, year: int) -> np.ndarray:
+        return self._months(self.counts, year)
+
+    def year_day_totals(self, year: int) -> np.ndarray:
+        return self._year_days(self.totals, year)
+
+    def year_day_counts(self, year: int) -> np.ndarray:
+        return self._year_days(self.counts, year)
@@ -4,6 +4,7 @@ import datetime
 import svgwrite
 
 from .exceptions import PosterError
+from .month_index import MonthIndex
 from .tracks_drawer import TracksDrawer
 from .utils import format_float
 from .xy import XY
@@ -12,6 +13,9 @@ from .xy import XY
 class MonthOfLifeDrawer(TracksDrawer):
     """Draw a Month of Life poster with 1000 months as circles"""
 
+    # the current month is highlighted
+    uses_today = True
+
     def __init__(self, the_poster):
         super().__init__(the_poster)
         self.birth_year = None
@@ -55,17 +59,13 @@ class MonthOfLifeDrawer(TracksDrawer):
         spacing_y = size.y / rows
         radius = min(spacing_x, spacing_y) / 2 * 0.85
         # prepare distance data by month
+        index = MonthIndex.from_tracks(self.poster.tracks)
         month_distances = []  # in meters
         for idx in range(total_months):
             y = self.birth_year + (self.birth_month - 1 + idx) // 12
             m = (self.birth_month - 1 + idx) % 12 + 1
-            # sum distances for this month
-            dist = 0
-            for tr in self.poster.tracks:
-                dt = tr.start_time_local
-                if dt.year == y and dt.month == m:
-                    dist += tr.length
-            month_distances.append((y, m, dist))
+            month_distances.append((y, m, index.total(y, m)))
+        current_date = datetime.datetime.now()
         # draw circles
         for idx, (y, m, dist) in enumerate(month_distances):
             x_idx = idx % cols
@@ -73,7 +73,6 @@ class MonthOfLifeDrawer(TracksDrawer):
             cx = offset.x + spacing_x * x_idx + spacing_x / 2
             cy = offset.y + spacing_y * y_idx + spacing_y / 2
 
-            current_date = datetime.datetime.now()
             month_date = datetime.datetime(y, m, 1)
             is_past = month_date < current_date
 
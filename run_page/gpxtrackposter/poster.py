@@ -2,16 +2,20 @@
 
 import gettext
 import locale
-from collections import defaultdict
 from datetime import datetime
 
 import pytz
 import svgwrite
 
+from .svg_stream import CompactDrawing, StreamingDrawing
 from .utils import format_float
 from .value_range import ValueRange
 from .xy import XY
 from .year_range import YearRange
+from .year_stats import YearlyStats
+
+# the locale the process started with, restored for posters without a language
+DEFAULT_LOCALE = locale.setlocale(locale.LC_ALL)
 
 
 class Poster:
@@ -30,6 +34,13 @@ class Poster:
         height: Poster height.
         years: Years included in the poster.
         tracks_drawer: drawer used to draw the poster.
+        language: Language of the poster texts, None for the default.
+        svg_writer: "svgwrite" to build an svgwrite DOM, "stream" to write
+            elements straight to the output file, "compact" to also shrink
+            the encoding (relative path data, CSS classes).
+        svg_precision: Decimals kept by the "stream" and "compact" writers.
+        svg_interactive: Keep per-track tooltips; when False the "compact"
+            writer merges same-style tracks into one path.
 
     Methods:
         set_tracks: Associate the Poster with a set of tracks
@@ -61,15 +72,23 @@ class Poster:
         self.set_language(None)
         self.tc_offset = datetime.now(pytz.timezone("Asia/Shanghai")).utcoffset()
         self.github_style = "align-firstday"
+        self.svg_writer = "svgwrite"
+        self.svg_precision = None
+        self.svg_interactive = True
+        self._yearly_stats = None
 
     def set_language(self, language):
+        self.language = language
         if language:
             try:
                 locale.setlocale(locale.LC_ALL, f"{language}.utf8")
             except locale.Error as e:
                 print(f'Cannot set locale to "{language}": {e}')
-                language = None
+                language = self.language = None
                 pass
+        if not language:
+            # the locale is global, undo the language of an earlier poster
+            locale.setlocale(locale.LC_ALL, DEFAULT_LOCALE)
 
         # Fall-back to NullTranslations, if the specified language translation cannot be found.
         if language:
@@ -80,18 +99,19 @@ class Poster:
             lang = gettext.NullTranslations()
         self.trans = lang.gettext
 
-    def set_tracks(self, tracks):
+    def set_tracks(self, tracks, year_tracks=None):
         """Associate the set of tracks with this poster.
 
         In addition to setting self.tracks, also compute the necessary attributes for the Poster
-        based on this set of tracks.
+        based on this set of tracks. year_tracks may pass the tracks already known to be in
+        self.years (e.g. one bucket of a tracks-by-year index) to avoid rescanning all tracks.
         """
         self.tracks = tracks
         self.tracks_by_date = {}
         self.length_range = ValueRange()
         self.length_range_by_date = ValueRange()
         self.__compute_years(tracks)
-        for track in tracks:
+        for track in tracks if year_tracks is None else year_tracks:
             if not self.years.contains(track.start_time_local):
                 continue
             text_date = track.start_time_local.strftime("%Y-%m-%d")
@@ -104,6 +124,17 @@ class Poster:
             length = sum([t.length for t in tracks])
             self.length_range_by_date.extend(length)
 
+    @property
+    def yearly_stats(self) -> YearlyStats:
+        """Statistics of all tracks by year, computed once per set of tracks.
+
+        Per-year posters narrow tracks_by_date but keep all tracks, so every
+        year of a run shares one YearlyStats.
+        """
+        if self._yearly_stats is None or self._yearly_stats[0] is not self.tracks:
+            self._yearly_stats = (self.tracks, YearlyStats.from_tracks(self.tracks))
+        return self._yearly_stats[1]
+
     def draw(self, drawer, output):
         """Set the Poster's drawer and draw the tracks."""
         self.tracks_drawer = drawer
@@ -114,7 +145,21 @@ class Poster:
         if self.drawer_type == "year_summary":
             # Year summary has its own layout, use full size
             height = height
-        d = svgwrite.Drawing(output, (f"{width}mm", f"{height}mm"))
+        size = (f"{width}mm", f"{height}mm")
+        precision = (
+            {} if self.svg_precision is None else {"precision": self.svg_precision}
+        )
+        if self.svg_writer == "compact":
+            d = CompactDrawing(
+                output, size, interactive=self.svg_interactive, **precision
+            )
+        elif self.svg_writer == "stream":
+            d = StreamingDrawing(output, size, **precision)
+        else:
+            # Number auto ids from 1 in every file, whatever was drawn before
+            # in this process, so the output doesn't depend on render order.
+            svgwrite.utils.AutoID(1)
+            d = svgwrite.Drawing(output, size)
         d.viewbox(0, 0, self.width, height)
         d.add(d.rect((0, 0), (width, height), fill=self.colors["background"]))
         if self.drawer_type == "year_summary":
@@ -127,6 +172,8 @@ class Poster:
         else:
             self.__draw_tracks(d, XY(width - 20, height), XY(10, 0))
         d.save()
+        if self.svg_writer == "compact":
+            print(d.size_report())
 
     def m2u(self, m):
         """Convert meters to kilometers or miles, according to units."""
@@ -279,23 +326,13 @@ class Poster:
         )
 
     def __compute_track_statistics(self):
-        length_range = ValueRange()
-        total_length = 0
-        total_length_year_dict = defaultdict(int)
-        weeks = {}
-        for t in self.tracks:
-            total_length += t.length
-            total_length_year_dict[t.start_time_local.year] += t.length
-            length_range.extend(t.length)
-            # time.isocalendar()[1] -> week number
-            weeks[(t.start_time_local.year, t.start_time_local.isocalendar()[1])] = 1
-        self.total_length_year_dict = total_length_year_dict
+        stats = self.yearly_stats
         return (
-            total_length,
-            total_length / len(self.tracks),
-            length_range.lower(),
-            length_range.upper(),
-            len(weeks),
+            stats.total_length,
+            stats.total_length / stats.count,
+            stats.length_range.lower(),
+            stats.length_range.upper(),
+            stats.weeks,
         )
 
     def __compute_years(self, tracks):
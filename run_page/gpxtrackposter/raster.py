@@ -0,0 +1,130 @@
+"""Rasterise projected lines into a density grid and encode it."""
+
+import struct
+import zlib
+from typing import List
+
+import numpy as np
+
+# upper bound for the samples rasterised at once, to bound memory use
+CHUNK_SAMPLES = 1 << 21
+
+
+def _segments(lines: List[np.ndarray]):
+    lines = [line for line in lines if len(line) >= 2]
+    if not lines:
+        empty = np.zeros((0, 2))
+        return empty, empty
+    starts = np.concatenate([line[:-1] for line in lines])
+    ends = np.concatenate([line[1:] for line in lines])
+    return starts, ends
+
+
+def accumulate_lines(
+    lines: List[np.ndarray], width: int, height: int, step: float = 0.5
+) -> np.ndarray:
+    """Sum the length of line segments passing through each pixel.
+
+    Segments are sampled every step pixels at most and each sample is split
+    between its four neighbouring pixels (bilinear weights), which draws the
+    lines anti-aliased. Lines are (N, 2) arrays of x, y pixel coordinates.
+
+    Returns a (height, width) array.
+    """
+    density = np.zeros(width * height)
+    starts, ends = _segments(lines)
+    deltas = ends - starts
+    lengths = np.hypot(deltas[:, 0], deltas[:, 1])
+    counts = np.maximum(np.ceil(lengths / step).astype(np.int64), 1)
+    bounds = np.searchsorted(
+        np.cumsum(counts), np.arange(CHUNK_SAMPLES, counts.sum(), CHUNK_SAMPLES)
+    )
+    for chunk in np.split(np.arange(len(counts)), bounds):
+        if len(chunk) == 0:
+            continue
+        chunk_counts = counts[chunk]
+        segment = np.repeat(chunk, chunk_counts)
+        first = np.repeat(np.cumsum(chunk_counts) - chunk_counts, chunk_counts)
+        t = (np.arange(len(segment)) - first + 0.5) / counts[segment]
+        points = starts[segment] + deltas[segment] * t[:, None]
+        weights = (lengths / counts)[segment]
+        # pixel centers are at half-integer coordinates
+        x, y = points[:, 0] - 0.5, points[:, 1] - 0.5
+        x0, y0 = np.floor(x), np.floor(y)
+        fx, fy = x - x0, y - y0
+        x0, y0 = x0.astype(np.int64), y0.astype(np.int64)
+        for dx, dy, w in (
+            (0, 0, (1 - fx) * (1 - fy)),
+            (1, 0, fx * (1 - fy)),
+            (0, 1, (1 - fx) * fy),
+            (1, 1, fx * fy),
+        ):
+            px, py = x0 + dx, y0 + dy
+            inside = (px >= 0) & (px < width) & (py >= 0) & (py < height)
+            density += np.bincount(
+                py[inside] * width + px[inside],
+                weights=(weights * w)[inside],
+                minlength=width * height,
+            )
+    return density.reshape(height, width)
+
+
+def scale_density(
+    density: np.ndarray, scale: str = "log", percentile: float = 99
+) -> np.ndarray:
+    """Map a density grid to [0, 1].
+
+    "log" compresses the range with log1p, so single runs stay visible next
+    to routes run a thousand times; "percentile" is linear up to the given
+    percentile of the covered pixels and saturates above it.
+    """
+    covered = density[density > 0]
+    if len(covered) == 0:
+        return np.zeros_like(density)
+    if scale == "percentile":
+        return np.clip(density / np.percentile(covered, percentile), 0, 1)
+    return np.log1p(density) / np.log1p(covered.max())
+
+
+def _png_chunk(kind: bytes, data: bytes) -> bytes:
+    chunk = kind + data
+    return struct.pack(">I", len(data)) + chunk + struct.pack(">I", zlib.crc32(chunk))
+
+
+def encode_png(rgba: np.ndarray) -> bytes:
+    """Encode a (height, width, 4) uint8 array as a PNG file."""
+    height, width, _ = rgba.shape
+    # every scanline starts with filter type 0 (none)
+    rows = np.zeros((height, width * 4 + 1), dtype=np.uint8)
+    rows[:, 1:] = rgba.reshape(height, width * 4)
+    return b"".join(
+        [
+            b"\x89PNG\r\n\x1a\n",
+            _png_chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0)),
+            _png_chunk(b"IDAT", zlib.compress(rows.tobytes(), 9)),
+            _png_chunk(b"IEND", b""),
+        ]
+    )
+
+
+def mask_rects(mask: np.ndarray) -> List[tuple]:
+    """Cover the true pixels of a 2D mask with (x, y, width, height) rectangles.
+
+    Runs of pixels in a row are merged with identical runs in the rows below.
+    """
+    rects = []
+    open_runs = {}
+    height, width = mask.shape
+    padded = np.zeros((height + 1, width + 2), dtype=np.int8)
+    padded[:height, 1:-1] = mask
+    edges = np.diff(padded, axis=1)
+    for y in range(height + 1):
+        row = edges[y]
+        runs = set(zip(np.flatnonzero(row == 1), np.flatnonzero(row == -1)))
+        for run in sorted(open_runs.keys() - runs):
+            x0, x1 = run
+            top = open_runs.pop(run)
+            rects.append((int(x0), top, int(x1 - x0), y - top))
+        for run in runs:
+            open_runs.setdefault(run, y)
+    return sorted(rects, key=lambda rect: (rect[1], rect[0]))
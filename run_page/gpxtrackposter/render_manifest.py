@@ -0,0 +1,125 @@
+"""Remember what each poster was rendered from, to skip unchanged outputs."""
+
+import datetime
+import glob
+import hashlib
+import json
+import os
+
+# Arguments that only affect how gen_svg runs, not what it draws.
+IGNORED_ARGS = {"jobs", "workers", "verbose", "logfile", "manifest"}
+
+
+def code_digest() -> str:
+    """Hash the poster drawing code, so any change to it invalidates the manifest."""
+    package_dir = os.path.dirname(os.path.abspath(__file__))
+    paths = sorted(glob.glob(os.path.join(package_dir, "*.py")))
+    # gen_svg sets up the Poster, e.g. its colors and sizes, before drawing
+    run_page_dir = os.path.dirname(package_dir)
+    paths.append(os.path.join(run_page_dir, "gen_svg.py"))
+    paths.append(os.path.join(run_page_dir, "polyline_processor.py"))
+    digest = hashlib.sha256()
+    for path in paths:
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                digest.update(f.read())
+    return digest.hexdigest()
+
+
+def track_fingerprint(track) -> tuple:
+    """The track attributes drawers read."""
+    return (
+        track.run_id,
+        str(track.start_time),
+        str(track.start_time_local),
+        str(track.end_time),
+        track.length,
+        track.special,
+        track.type,
+        getattr(track, "subtype", None),
+        sorted((k, str(v)) for k, v in track.moving_dict.items()),
+        track.polyline_str,
+        track.polyline_lods,
+    )
+
+
+def tracks_digest(tracks) -> str:
+    """Hash the drawn attributes of a list of tracks."""
+    digest = hashlib.sha256()
+    for track in tracks:
+        digest.update(repr(track_fingerprint(track)).encode())
+    return digest.hexdigest()
+
+
+def render_digest(code: str, args: dict, year, tracks: str, uses_today=False) -> str:
+    """Hash everything an output is drawn from.
+
+    Args:
+        code: code_digest() of the drawing code.
+        args: gen_svg arguments (vars(args)); run-only options are ignored.
+        year: The year of a per-year output, None otherwise.
+        tracks: tracks_digest() of the tracks the output depends on.
+        uses_today: Whether the drawer also depends on today's date.
+    """
+    digest = hashlib.sha256(code.encode())
+    options = {k: v for k, v in args.items() if k not in IGNORED_ARGS}
+    digest.update(json.dumps(options, sort_keys=True, default=str).encode())
+    digest.update(repr(year).encode())
+    if uses_today:
+        digest.update(datetime.date.today().isoformat().encode())
+    digest.update(tracks.encode())
+    return digest.hexdigest()
+
+
+def task_digest(task, code: str, digests: dict) -> str:
+    """Hash everything a gen_svg PosterTask is drawn from.
+
+    Args:
+        task: The PosterTask.
+        code: code_digest() of the drawing code.
+        digests: tracks_digest() of the track lists hashed so far, by id.
+    """
+    if task.year is not None and task.args.type != "github":
+        # circular and year summary posters of a year only draw its tracks
+        tracks = task.tracks_by_year.get(task.year, [])
+    else:
+        # the footer of a github poster totals every track, of all years
+        tracks = task.tracks
+    # tasks of one poster share their track lists, hash each list once
+    if id(tracks) not in digests:
+        digests[id(tracks)] = tracks_digest(tracks)
+    digest = digests[id(tracks)]
+    if task.year is not None and task.args.type == "year_summary":
+        # the header also counts the days since the first run of all years
+        digest += str(task.poster.yearly_stats.first)
+    return render_digest(
+        code, vars(task.args), task.year, digest, task.drawer.uses_today
+    )
+
+
+class RenderManifest:
+    """JSON file mapping each output file to the digest of its inputs.
+
+    Methods:
+        is_current: Whether output exists and was rendered from digest
+        update: Record the digest output was rendered from
+        save: Write the manifest back to its file
+    """
+
+    def __init__(self, file_name: str):
+        self.file_name = file_name
+        self.entries = {}
+        if os.path.exists(file_name):
+            with open(file_name, encoding="utf-8") as f:
+                self.entries = json.load(f)
+
+    def is_current(self, output: str, digest: str) -> bool:
+        return self.entries.get(output) == digest and os.path.exists(output)
+
+    def update(self, output: str, digest: str):
+        self.entries[output] = digest
+
+    def save(self):
+        with open(self.file_name, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f, indent=2, sort_keys=True)
+            f.write("\n")
@@ -0,0 +1,471 @@
+"""Stream SVG elements straight to a file instead of building a DOM."""
+
+import os
+import re
+import shutil
+import tempfile
+from xml.sax.saxutils import escape, quoteattr
+
+import numpy as np
+
+SVG_HEADER = '<?xml version="1.0" encoding="utf-8" ?>\n'
+SVG_NAMESPACES = (
+    ("xmlns", "http://www.w3.org/2000/svg"),
+    ("xmlns:ev", "http://www.w3.org/2001/xml-events"),
+    ("xmlns:xlink", "http://www.w3.org/1999/xlink"),
+)
+
+# Presentation attributes that CompactDrawing may move into CSS classes.
+STYLE_PROPERTIES = {
+    "alignment-baseline",
+    "dominant-baseline",
+    "fill",
+    "opacity",
+    "stroke",
+    "stroke-dasharray",
+    "stroke-linecap",
+    "stroke-linejoin",
+    "stroke-opacity",
+    "stroke-width",
+    "style",
+    "text-anchor",
+}
+# Elements CompactDrawing merges into one path per style when not interactive.
+MERGEABLE = ("polyline", "rect")
+_NUMBER_RE = re.compile(r"-?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?")
+
+
+def format_number(value, precision: int) -> str:
+    """Format a number with at most `precision` decimals and no trailing zeros."""
+    if isinstance(value, (int, np.integer)) and not isinstance(value, bool):
+        return str(int(value))
+    text = f"{float(value):.{precision}f}"
+    if "." in text:
+        text = text.rstrip("0").rstrip(".")
+    return "0" if text == "-0" else text
+
+
+class StreamElement:
+    """A single SVG element, serialized once it is added to the drawing."""
+
+    def __init__(self, drawing, tag: str, attribs: dict, text: str = None):
+        self.drawing = drawing
+        self.tag = tag
+        self.attribs = attribs
+        self.text = text
+        self.elements = []
+
+    def __getitem__(self, key):
+        return self.attribs[key]
+
+    def __setitem__(self, key, value):
+        self.attribs[key] = value
+
+    def add(self, element):
+        self.elements.append(element)
+        return element
+
+    def set_desc(self, title=None, desc=None):
+        if desc is not None:
+            self.elements.insert(0, StreamElement(self.drawing, "desc", {}, desc))
+        if title is not None:
+            self.elements.insert(0, StreamElement(self.drawing, "title", {}, title))
+
+    def get_id(self) -> str:
+        if "id" not in self.attribs:
+            self.attribs["id"] = self.drawing.next_id()
+        return self.attribs["id"]
+
+    def get_iri(self) -> str:
+        return f"#{self.get_id()}"
+
+    def push(self, *commands):
+        """Append path commands, mirroring `svgwrite.path.Path.push`."""
+        self.attribs["d"].extend(commands)
+
+    def tostring(self, number=None) -> str:
+        number = number or self.drawing.number
+        parts = [f"<{self.tag}"]
+        for name, value in self.attribs.items():
+            if name == "d" and isinstance(value, list):
+                value = " ".join(v if isinstance(v, str) else number(v) for v in value)
+            elif name == "points" and not isinstance(value, str):
+                value = " ".join(f"{number(x)},{number(y)}" for x, y in value)
+            elif not isinstance(value, str):
+                value = number(value)
+            parts.append(f" {name}={quoteattr(value)}")
+        if not self.elements and self.text is None:
+            parts.append(" />")
+            return "".join(parts)
+        parts.append(">")
+        if self.text is not None:
+            parts.append(escape(str(self.text)))
+        parts.extend(element.tostring(number) for element in self.elements)
+        parts.append(f"</{self.tag}>")
+        return "".join(parts)
+
+
+class StreamDefs:
+    """Write definitions (patterns, ...) as their own `<defs>` block."""
+
+    def __init__(self, drawing):
+        self.drawing = drawing
+
+    def add(self, element):
+        self.drawing.write(f"<defs>{self.drawing.serialize(element)}</defs>\n")
+        return element
+
+
+def _attribs(extra: dict) -> dict:
+    """Translate svgwrite style keyword arguments into SVG attribute names."""
+    attribs = {}
+    for name, value in extra.items():
+        if value is None:
+            continue
+        if name.endswith("_"):
+            name = name[:-1]
+        attribs[name.replace("_", "-")] = value
+    return attribs
+
+
+class StreamingDrawing:
+    """Drop-in replacement for the subset of `svgwrite.Drawing` the drawers use.
+
+    Elements are serialized and written to the output file as soon as they are
+    added, with fixed-precision numbers and no attribute validation, so memory
+    stays flat and the same input always produces the same bytes.
+    """
+
+    def __init__(self, filename: str, size=("100%", "100%"), precision: int = 3):
+        self.filename = filename
+        self.size = size
+        self.precision = precision
+        self.attribs = {}
+        self.defs = StreamDefs(self)
+        self._file = None
+        self._ids = 0
+
+    def number(self, value) -> str:
+        return format_number(value, self.precision)
+
+    def next_id(self) -> str:
+        self._ids += 1
+        return f"id{self._ids}"
+
+    def viewbox(self, minx=0, miny=0, width=0, height=0):
+        self.attribs["viewBox"] = " ".join(
+            self.number(v) for v in (minx, miny, width, height)
+        )
+
+    def header(self) -> str:
+        width, height = self.size
+        attribs = {
+            "baseProfile": "full",
+            "height": height,
+            "version": "1.1",
+            "width": width,
+            **self.attribs,
+        }
+        header = "".join(f" {k}={quoteattr(v)}" for k, v in attribs.items())
+        namespaces = "".join(f' {k}="{v}"' for k, v in SVG_NAMESPACES)
+        return f"{SVG_HEADER}<svg{header}{namespaces}>\n"
+
+    def write(self, text: str):
+        if self._file is None:
+            self._file = open(self.filename, "w", encoding="utf-8")
+            self._file.write(self.header())
+        self._file.write(text)
+
+    def serialize(self, element: StreamElement) -> str:
+        return element.tostring()
+
+    def add(self, element: StreamElement):
+        self.write(self.serialize(element) + "\n")
+        return element
+
+    def save(self):
+        self.write("</svg>\n")
+        self._file.close()
+        self._file = None
+
+    def element(self, tag: str, attribs: dict, extra: dict, text: str = None):
+        attribs.update(_attribs(extra))
+        return StreamElement(self, tag, attribs, text)
+
+    def rect(self, insert=(0, 0), size=(1, 1), **extra):
+        attribs = {"x": insert[0], "y": insert[1], "width": size[0], "height": size[1]}
+        return self.element("rect", attribs, extra)
+
+    def circle(self, center=(0, 0), r=1, **extra):
+        return self.element("circle", {"cx": center[0], "cy": center[1], "r": r}, extra)
+
+    def line(self, start=(0, 0), end=(0, 0), **extra):
+        attribs = {"x1": start[0], "y1": start[1], "x2": end[0], "y2": end[1]}
+        return self.element("line", attribs, extra)
+
+    def polyline(self, points=(), **extra):
+        return self.element("polyline", {"points": points}, extra)
+
+    def path(self, d=None, **extra):
+        if d is None:
+            d = []
+        elif isinstance(d, str):
+            d = [d]
+        return self.element("path", {"d": list(d)}, extra)
+
+    def text(self, text, insert=None, **extra):
+        attribs = {} if insert is None else {"x": insert[0], "y": insert[1]}
+        return self.element("text", attribs, extra, text)
+
+    def textPath(self, path, text, startOffset=None, **extra):
+        attribs = {"xlink:href": path.get_iri()}
+        if startOffset is not None:
+            attribs["startOffset"] = startOffset
+        return self.element("textPath", attribs, extra, text)
+
+    def image(self, href, insert=None, size=None, **extra):
+        attribs = {"xlink:href": href}
+        if insert is not None:
+            attribs.update({"x": insert[0], "y": insert[1]})
+        if size is not None:
+            attribs.update({"width": size[0], "height": size[1]})
+        return self.element("image", attribs, extra)
+
+    def symbol(self, **extra):
+        return self.element("symbol", {}, extra)
+
+    def use(self, href, insert=None, size=None, **extra):
+        if not isinstance(href, str):
+            href = href.get_iri()
+        attribs = {"xlink:href": href}
+        if insert is not None:
+            attribs.update({"x": insert[0], "y": insert[1]})
+        if size is not None:
+            attribs.update({"width": size[0], "height": size[1]})
+        return self.element("use", attribs, extra)
+
+    def pattern(self, insert=None, size=None, **extra):
+        attribs = {}
+        if insert is not None:
+            attribs.update({"x": insert[0], "y": insert[1]})
+        if size is not None:
+            attribs.update({"width": size[0], "height": size[1]})
+        return self.element("pattern", attribs, extra)
+
+
+class CompactDrawing(StreamingDrawing):
+    """Streaming drawing that trades readability for file size.
+
+    Polylines become relative path data at `precision` decimals, repeated
+    presentation attributes move into CSS classes and numbers drop redundant
+    zeros. When `interactive` is False, tooltips (`<title>`/`<desc>`) are
+    dropped and polylines and rects sharing a style are merged into a single
+    path.
+
+    Elements with an inline fill colour keep all their attributes inline: the
+    web build and theme code match on those colours and replace the class.
+    """
+
+    def __init__(
+        self,
+        filename: str,
+        size=("100%", "100%"),
+        precision: int = 2,
+        interactive: bool = True,
+        class_prefix: str = None,
+    ):
+        super().__init__(filename, size, precision)
+        self.interactive = interactive
+        if class_prefix is None:
+            stem = os.path.splitext(os.path.basename(filename))[0]
+            class_prefix = re.sub(r"[^A-Za-z0-9-]", "-", stem)
+        self.class_prefix = class_prefix
+        self.classes = {}
+        self.merged = {}
+        self.symbols = {}
+        self.plain_size = 0
+        self.compact_size = 0
+        self._scale = 10**precision
+        self._body = tempfile.TemporaryFile("w+", encoding="utf-8")
+
+    def number(self, value) -> str:
+        return self.scaled(round(float(value) * self._scale))
+
+    def scaled(self, value: int) -> str:
+        """Format an integer number of 10**-precision units, e.g. -50 -> "-.5"."""
+        if self.precision == 0 or value == 0:
+            return str(value)
+        sign = "-" if value < 0 else ""
+        digits = str(abs(value)).rjust(self.precision + 1, "0")
+        whole, fraction = digits[: -self.precision], digits[-self.precision :]
+        fraction = fraction.rstrip("0")
+        if whole == "0" and fraction:
+            whole = ""
+        return f"{sign}{whole}.{fraction}" if fraction else f"{sign}{whole}"
+
+    def join(self, numbers) -> str:
+        """Join numbers, omitting the separator before a minus sign."""
+        parts = []
+        for text in numbers:
+            if parts and not text.startswith("-"):
+                parts.append(" ")
+            parts.append(text)
+        return "".join(parts)
+
+    def path_data(self, points) -> str:
+        """Encode points as an absolute move followed by relative line segments."""
+        scaled = np.rint(np.asarray(points, dtype=float) * self._scale).astype(np.int64)
+        if len(scaled) == 0:
+            return ""
+        deltas = np.diff(scaled, axis=0)
+        deltas = deltas[deltas.any(axis=1)]
+        if len(deltas) == 0:
+            deltas = np.zeros((1, 2), dtype=np.int64)
+        start = self.join(self.scaled(int(v)) for v in scaled[0])
+        lines = self.join(self.scaled(int(v)) for v in deltas.ravel())
+        return f"M{start}l{lines}"
+
+    def path_commands(self, commands) -> str:
+        parts = []
+        for command in commands:
+            if isinstance(command, str):
+                command = _NUMBER_RE.sub(
+                    lambda m: self.number(float(m.group())), command
+                )
+            else:
+                command = self.number(command)
+            parts.append(command)
+        return " ".join(parts)
+
+    def class_for(self, style: dict) -> str:
+        rule = ";".join(f"{name}:{value}" for name, value in style.items())
+        if rule not in self.classes:
+            self.classes[rule] = f"{self.class_prefix}-{len(self.classes)}"
+        return self.classes[rule]
+
+    def expand_use(self, element: StreamElement):
+        """The rects of a symbol made of plain rects, placed where `<use>` is."""
+        symbol = self.symbols.get(element.attribs["xlink:href"].lstrip("#"))
+        if symbol is None or element.elements:
+            return None
+        if any(e.tag != "rect" or e.elements for e in symbol.elements):
+            return None
+        x = float(element.attribs.get("x", 0))
+        y = float(element.attribs.get("y", 0))
+        inherited = {
+            name: value
+            for name, value in element.attribs.items()
+            if name not in ("xlink:href", "x", "y")
+        }
+        rects = []
+        for e in symbol.elements:
+            attribs = {**inherited, **e.attribs}
+            attribs["x"] = float(attribs["x"]) + x
+            attribs["y"] = float(attribs["y"]) + y
+            rects.append(StreamElement(self, "rect", attribs))
+        return rects
+
+    def compact(self, element: StreamElement, merge: bool = True) -> str:
+        attribs = dict(element.attribs)
+        tag = element.tag
+        if tag == "symbol" and "id" in attribs:
+            self.symbols[attribs["id"]] = element
+        elif tag == "use" and merge and not self.interactive:
+            # rects merge into far shorter paths than one <use> per copy
+            rects = self.expand_use(element)
+            if rects is not None:
+                return "".join(self.compact(rect) for rect in rects)
+        if tag == "polyline":
+            tag = "path"
+            attribs = {"d": self.path_data(attribs.pop("points")), **attribs}
+        elif tag == "path" and isinstance(attribs.get("d"), list):
+            attribs["d"] = self.path_commands(attribs["d"])
+        elements = element.elements
+        if not self.interactive:
+            elements = [e for e in elements if e.tag not in ("title", "desc")]
+
+        fill = attribs.get("fill", "none")
+        inline, style = {}, {}
+        for name, value in attribs.items():
+            if not isinstance(value, str):
+                value = self.number(value)
+            if fill != "none" or name not in STYLE_PROPERTIES:
+                inline[name] = value
+            elif name == "style":
+                for declaration in value.split(";"):
+                    if ":" in declaration:
+                        key, val = declaration.split(":", 1)
+                        style[key.strip()] = val.strip()
+            elif name in ("fill", "stroke") and value != "none":
+                inline[name] = value
+            else:
+                style[name] = value
+        if style:
+            inline["class"] = self.class_for(style)
+
+        mergeable = merge and element.tag in MERGEABLE
+        if not self.interactive and not elements and mergeable:
+            if element.tag == "rect":
+                x, y, width, height = (
+                    inline.pop(name) for name in ("x", "y", "width", "height")
+                )
+                d = f"M{self.join((x, y))}h{width}v{height}h-{width}z"
+            else:
+                d = inline.pop("d")
+            self.merged.setdefault(tuple(inline.items()), []).append(d)
+            return ""
+
+        parts = [f"<{tag}"]
+        parts.extend(f" {name}={quoteattr(value)}" for name, value in inline.items())
+        if not elements and element.text is None:
+            parts.append("/>")
+            return "".join(parts)
+        parts.append(">")
+        if element.text is not None:
+            parts.append(escape(str(element.text)))
+        # children of symbols, patterns, ... must stay where they are
+        parts.extend(self.compact(e, merge=False) for e in elements)
+        parts.append(f"</{tag}>")
+        return "".join(parts)
+
+    def serialize(self, element: StreamElement) -> str:
+        self.plain_size += len(element.tostring(str)) + 1
+        return self.compact(element)
+
+    def add(self, element: StreamElement):
+        text = self.serialize(element)
+        if text:
+            self.flush()
+            self.write(text + "\n")
+        return element
+
+    def flush(self):
+        """Write merged paths, keeping them below anything added afterwards."""
+        for key, paths in self.merged.items():
+            attribs = "".join(f" {name}={quoteattr(value)}" for name, value in key)
+            self.write(f'<path d="{"".join(paths)}"{attribs}/>\n')
+        self.merged = {}
+
+    def write(self, text: str):
+        self._body.write(text)
+
+    def save(self):
+        self.flush()
+        self.write("</svg>\n")
+        rules = "".join(f".{name}{{{rule}}}" for rule, name in self.classes.items())
+        self._body.seek(0)
+        with open(self.filename, "w", encoding="utf-8") as f:
+            f.write(self.header())
+            if rules:
+                f.write(f"<style>{rules}</style>\n")
+            shutil.copyfileobj(self._body, f)
+            self.compact_size = f.tell()
+        self._body.close()
+        self.plain_size += len(self.header()) + len("</svg>\n")
+
+    def size_report(self) -> str:
+        ratio = self.plain_size / self.compact_size if self.compact_size else 0
+        return (
+            f"{self.filename}: {self.plain_size / 1024:.1f} KiB -> "
+            f"{self.compact_size / 1024:.1f} KiB ({ratio:.1f}x smaller)"
+        )
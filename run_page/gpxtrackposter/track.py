@@ -12,11 +12,12 @@ from collections import namedtuple
 
 import gpxpy as mod_gpxpy
 import lxml
+import numpy as np
 import polyline
 import s2sphere as s2
 from garmin_fit_sdk import Decoder, Stream
 from garmin_fit_sdk.util import FIT_EPOCH_S
-from polyline_processor import filter_out
+from polyline_processor import filter_out, select_polyline_lod
 from rich import print
 from tcxreader.tcxreader import TCXReader
 
@@ -39,8 +40,11 @@ SEMICIRCLE = 11930465
 class Track:
     def __init__(self):
         self.file_names = []
-        self.polylines = []
+        self._polylines = []
+        # summary polyline not decoded into polylines yet, see load_from_db
+        self._pending_polyline = None
         self.polyline_str = ""
+        self.polyline_lods = ""
         self.track_name = None
         self.start_time = None
         self.end_time = None
@@ -57,6 +61,28 @@ class Track:
         self.subtype = None  # for fit file
         self.device = ""
 
+    @property
+    def polylines(self):
+        """Lines of s2.LatLng, decoded on first access for tracks from the db."""
+        if self._pending_polyline is not None:
+            polyline_data = self._decode(self._pending_polyline)
+            self._polylines = [
+                [s2.LatLng.from_degrees(p[0], p[1]) for p in polyline_data]
+            ]
+            self._pending_polyline = None
+        return self._polylines
+
+    @polylines.setter
+    def polylines(self, value):
+        self._polylines = value
+        self._pending_polyline = None
+
+    @staticmethod
+    def _decode(summary_polyline):
+        if IGNORE_BEFORE_SAVING:
+            summary_polyline = filter_out(summary_polyline)
+        return polyline.decode(summary_polyline) if summary_polyline else []
+
     def load_gpx(self, file_name):
         """
         TODO refactor with load_tcx to one function
@@ -122,7 +148,12 @@ class Track:
             )
             print(str(e))
 
-    def load_from_db(self, activity):
+    def load_from_db(self, activity, with_geometry=True):
+        """Load an activity row; its polyline is only decoded when first used.
+
+        Without geometry the polyline columns are not read at all, for drawers
+        that only use dates and distances.
+        """
         # use strava as file name
         self.file_names = [str(activity.run_id)]
         start_time = datetime.datetime.strptime(
@@ -131,12 +162,11 @@ class Track:
         self.start_time_local = start_time
         self.end_time = start_time + activity.elapsed_time
         self.length = float(activity.distance)
-        if IGNORE_BEFORE_SAVING:
-            summary_polyline = filter_out(activity.summary_polyline)
-        else:
-            summary_polyline = activity.summary_polyline
-        polyline_data = polyline.decode(summary_polyline) if summary_polyline else []
-        self.polylines = [[s2.LatLng.from_degrees(p[0], p[1]) for p in polyline_data]]
+        if with_geometry:
+            self.polylines = []
+            self._pending_polyline = activity.summary_polyline or ""
+            self.polyline_str = activity.summary_polyline or ""
+            self.polyline_lods = getattr(activity, "summary_polyline_lods", None) or ""
         self.run_id = activity.run_id
         self.type = get_normalized_sport_type(activity.type)
         self.subtype = activity.subtype if hasattr(activity, "subtype") else None
@@ -148,6 +178,23 @@ class Track:
             "average_speed": activity.average_speed or 0,
         }
 
+    def coordinates_for(self, pixel_budget):
+        """Return the cheapest level of detail good enough for pixel_budget pixels.
+
+        Lines are returned as (N, 2) arrays of (lat, lng) degrees.
+        """
+        summary_polyline = select_polyline_lod(
+            self.polyline_str, self.polyline_lods, pixel_budget
+        )
+        if summary_polyline == self.polyline_str and self._pending_polyline is None:
+            return [
+                np.array(
+                    [(p.lat().degrees, p.lng().degrees) for p in line], dtype=float
+                ).reshape(-1, 2)
+                for line in self.polylines
+            ]
+        return [np.array(self._decode(summary_polyline), dtype=float).reshape(-1, 2)]
+
     def bbox(self):
         """Compute the smallest rectangle that contains the entire track (border box)."""
         bbox = s2.LatLngRect()
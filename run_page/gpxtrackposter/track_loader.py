@@ -14,9 +14,11 @@ sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
 import concurrent.futures
 
 from generator.db import Activity, init_db
+from sqlalchemy.orm import defer
 
 from .exceptions import ParameterError, TrackLoadError
 from .track import Track
+from .utils import get_normalized_sport_type
 from .year_range import YearRange
 
 from synced_data_file_logger import load_synced_file_list
@@ -54,6 +56,12 @@ def load_fit_file(file_name, activity_title_dict={}):
     return t
 
 
+def _db_sport_types(sport_type):
+    """The raw activity types stored in the db for a normalized sport type"""
+    candidates = {"Run", "Walk", "Ride", sport_type}
+    return sorted(t for t in candidates if get_normalized_sport_type(t) == sport_type)
+
+
 class TrackLoader:
     """
     Attributes:
@@ -63,6 +71,8 @@ class TrackLoader:
 
     Methods:
         load_tracks: Load all data from GPX files
+        load_tracks_from_db: Load the activities matching the filters from the db
+        filter_tracks: Filter tracks loaded with read_tracks/read_tracks_from_db
     """
 
     def __init__(self):
@@ -77,42 +87,88 @@ class TrackLoader:
 
     def load_tracks(self, data_dir, file_suffix="gpx", activity_title_dict={}):
         """Load tracks data_dir and return as a List of tracks"""
+        tracks = self.read_tracks(data_dir, file_suffix, activity_title_dict)
+        return self.filter_tracks(tracks)
+
+    def read_tracks(self, data_dir, file_suffix="gpx", activity_title_dict={}):
+        """Load every track in data_dir without applying any filter"""
         file_names = [x for x in self._list_data_files(data_dir, file_suffix)]
         print(f"{file_suffix.upper()} files: {len(file_names)}")
 
-        tracks = []
-
         loaded_tracks = self._load_data_tracks(
             file_names,
             self.load_func_dict.get(file_suffix, load_gpx_file),
             activity_title_dict,
         )
-
-        tracks.extend(loaded_tracks.values())
         log.info(f"Conventionally loaded tracks: {len(loaded_tracks)}")
+        return list(loaded_tracks.values())
 
-        tracks = self._filter_tracks(tracks)
-        # filter out tracks with length < min_length
-        return [t for t in tracks if t.length >= self.min_length]
+    def load_tracks_from_db(
+        self, sql_file, is_grid=False, sport_type="all", with_geometry=True
+    ):
+        """Load the activities matching the filters from the db.
 
-    def load_tracks_from_db(self, sql_file, is_grid=False):
+        The year range, min length and sport type are applied in the query,
+        only the special file names are marked afterwards.
+        """
         session = init_db(sql_file)
-        if is_grid:
-            activities = (
-                session.query(Activity)
-                .filter(Activity.summary_polyline != "")
-                .order_by(Activity.start_date_local)
+        print(f"All tracks: {session.query(Activity).count()}")
+        activities = self._query_activities(session, is_grid, with_geometry)
+        activities = activities.filter(
+            Activity.distance >= max(self.min_length, 1),
+            Activity.start_date_local != "",
+        )
+        if self.year_range.from_year is not None:
+            activities = activities.filter(
+                Activity.start_date_local >= f"{self.year_range.from_year:04d}",
+                Activity.start_date_local < f"{self.year_range.to_year + 1:04d}",
             )
-        else:
-            activities = session.query(Activity).order_by(Activity.start_date_local)
+        if sport_type != "all":
+            activities = activities.filter(
+                Activity.type.in_(_db_sport_types(sport_type))
+            )
+        tracks = self._tracks_from_activities(activities, with_geometry)
+        for t in tracks:
+            t.special = t.file_names[0] in self.special_file_names
+        print(f"After filter tracks: {len(tracks)}")
+        return tracks
+
+    def read_tracks_from_db(self, sql_file, is_grid=False, with_geometry=True):
+        """Load every activity in the db as a track without applying any filter"""
+        session = init_db(sql_file)
+        activities = self._query_activities(session, is_grid, with_geometry)
+        return self._tracks_from_activities(activities, with_geometry)
+
+    @staticmethod
+    def _query_activities(session, is_grid, with_geometry):
+        activities = session.query(Activity)
+        if not with_geometry:
+            activities = activities.options(
+                defer(Activity.summary_polyline), defer(Activity.summary_polyline_lods)
+            )
+        if is_grid:
+            activities = activities.filter(Activity.summary_polyline != "")
+        return activities.order_by(Activity.start_date_local)
+
+    @staticmethod
+    def _tracks_from_activities(activities, with_geometry):
         tracks = []
         for activity in activities:
             t = Track()
-            t.load_from_db(activity)
+            t.load_from_db(activity, with_geometry)
             tracks.append(t)
-        print(f"All tracks: {len(tracks)}")
+        return tracks
+
+    def filter_tracks(self, tracks, is_grid=False):
+        """Apply the year range, special files and min length to loaded tracks.
+
+        `is_grid` keeps only tracks with a polyline, matching what
+        `read_tracks_from_db(sql_file, is_grid=True)` returns.
+        """
+        if is_grid:
+            tracks = [t for t in tracks if t.polyline_str]
         tracks = self._filter_tracks(tracks)
-        print(f"After filter tracks: {len(tracks)}")
+        # filter out tracks with length < min_length
         return [t for t in tracks if t.length >= self.min_length]
 
     def _filter_tracks(self, tracks):
@@ -10,13 +10,23 @@ import argparse
 import svgwrite
 
 from .poster import Poster
-from .utils import interpolate_color
+from .utils import COLOR_STEPS, color_gradient
 from .value_range import ValueRange
 from .xy import XY
 
 
 class TracksDrawer:
-    """Base class that other drawer classes inherit from."""
+    """Base class that other drawer classes inherit from.
+
+    Attributes:
+        uses_today: Whether the drawing depends on today's date, so an
+            unchanged set of tracks still needs redrawing on another day.
+        uses_geometry: Whether the drawing reads track polylines; other
+            drawers get tracks loaded from the db without them.
+    """
+
+    uses_today = False
+    uses_geometry = False
 
     def __init__(self, the_poster: Poster):
         self.poster = the_poster
@@ -53,4 +63,4 @@ class TracksDrawer:
         ):
             return color1
 
-        return interpolate_color(color1, color2, (length - length_range.lower()) / diff)
+        return color_gradient(color1, color2)[length_range.index(length, COLOR_STEPS)]
@@ -5,12 +5,14 @@
 # Use of this source code is governed by a MIT-style
 # license that can be found in the LICENSE file.
 
+import functools
 import locale
 import math
 from datetime import datetime
 from typing import List, Optional, Tuple
 
 import colour
+import numpy as np
 import pytz
 import s2sphere as s2
 
@@ -33,17 +35,49 @@ def latlng2xy(latlng: s2.LatLng) -> XY:
     return XY(lng2x(latlng.lng().degrees), lat2y(latlng.lat().degrees))
 
 
-def lng2x(lng_deg: float) -> float:
+def lng2x(lng_deg):
     return lng_deg / 180 + 1
 
 
-def lat2y(lat_deg: float) -> float:
+def lat2y(lat_deg):
+    """Mercator y of a latitude, or of a whole array of latitudes."""
+    if isinstance(lat_deg, np.ndarray):
+        return 0.5 - np.log(np.tan(np.pi / 4 * (1 + lat_deg / 90))) / np.pi
     return 0.5 - math.log(math.tan(math.pi / 4 * (1 + lat_deg / 90))) / math.pi
 
 
+def coordinates_bbox(lines: List[np.ndarray]) -> s2.LatLngRect:
+    """Compute the smallest rectangle containing lines of (lat, lng) degrees."""
+    lines = [line for line in lines if len(line)]
+    if not lines:
+        return s2.LatLngRect()
+    lo = np.radians(np.min([line.min(axis=0) for line in lines], axis=0))
+    hi = np.radians(np.max([line.max(axis=0) for line in lines], axis=0))
+    return s2.LatLngRect(
+        s2.LineInterval(float(lo[0]), float(hi[0])),
+        s2.SphereInterval(float(lo[1]), float(hi[1])),
+    )
+
+
+def _contains_mask(bbox: s2.LatLngRect, line: np.ndarray) -> np.ndarray:
+    """Vectorized bbox.contains() for a line of (lat, lng) degrees."""
+    lat, lng = np.radians(line[:, 0]), np.radians(line[:, 1])
+    lng = np.where(lng == -np.pi, np.pi, lng)
+    mask = (bbox.lat().lo() <= lat) & (lat <= bbox.lat().hi())
+    lng_interval = bbox.lng()
+    if lng_interval.is_inverted():
+        return mask & ((lng >= lng_interval.lo()) | (lng <= lng_interval.hi()))
+    return mask & (lng >= lng_interval.lo()) & (lng <= lng_interval.hi())
+
+
 def project(
-    bbox: s2.LatLngRect, size: XY, offset: XY, latlnglines: List[List[s2.LatLng]]
-) -> List[List[Tuple[float, float]]]:
+    bbox: s2.LatLngRect, size: XY, offset: XY, lines: List[np.ndarray]
+) -> List[np.ndarray]:
+    """Project lines of (lat, lng) degrees into the size x offset box.
+
+    Returns packed (N, 2) arrays of x, y poster coordinates; lines are split
+    wherever they leave bbox.
+    """
     min_x = lng2x(bbox.lng_lo().degrees)
     d_x = lng2x(bbox.lng_hi().degrees) - min_x
     while d_x >= 2:
@@ -58,45 +92,47 @@ def project(
         return []
     scale = size.x / d_x if size.x / size.y <= d_x / d_y else size.y / d_y
     offset = offset + 0.5 * (size - scale * XY(d_x, -d_y)) - scale * XY(min_x, min_y)
-    lines = []
+    projected = []
     # If len > $zoom_threshold, choose 1 point out of every $step to reduce size of the SVG file
     zoom_threshold = 400
-    for latlngline in latlnglines:
-        line = []
-        step = int(len(latlngline) / zoom_threshold) + 1
-        for i in range(0, len(latlngline), step):
-            latlng = latlngline[i]
-            if bbox.contains(latlng):
-                line.append((offset + scale * latlng2xy(latlng)).tuple())
-            else:
-                if len(line) > 0:
-                    lines.append(line)
-                    line = []
-        if len(line) > 0:
-            lines.append(line)
-    return lines
+    for line in lines:
+        line = np.asarray(line, dtype=float).reshape(-1, 2)
+        line = line[:: len(line) // zoom_threshold + 1]
+        xy = np.empty_like(line)
+        xy[:, 0] = offset.x + scale * lng2x(line[:, 1])
+        xy[:, 1] = offset.y + scale * lat2y(line[:, 0])
+        # split into runs of consecutive points inside bbox
+        inside = np.concatenate(([0], _contains_mask(bbox, line), [0]))
+        bounds = np.flatnonzero(np.diff(inside.astype(np.int8)))
+        for start, end in zip(bounds[::2], bounds[1::2]):
+            projected.append(xy[start:end])
+    return projected
 
 
 def compute_grid(
     count: int, dimensions: XY
 ) -> Tuple[Optional[float], Optional[Tuple[int, int]]]:
-    # this is somehow suboptimal O(count^2). I guess it's possible in O(count)
+    # For a fixed count_x the cell size can only shrink as count_y grows, so the
+    # least wasteful count_y is the smallest one that still fits every cell:
+    # ceil(count / count_x). Only float rounding can push that waste below
+    # zero, in which case the next larger count_y is tried, as before.
     min_waste = -1.0
     best_size = None
     best_counts = None
     for count_x in range(1, count + 1):
         size_x = dimensions.x / count_x
-        for count_y in range(1, count + 1):
-            if count_x * count_y >= count:
-                size_y = dimensions.y / count_y
-                size = min(size_x, size_y)
-                waste = dimensions.x * dimensions.y - count * size * size
-                if waste < 0:
-                    continue
-                elif best_size is None or waste < min_waste:
-                    best_size = size
-                    best_counts = count_x, count_y
-                    min_waste = waste
+        for count_y in range(-(-count // count_x), count + 1):
+            size_y = dimensions.y / count_y
+            size = min(size_x, size_y)
+            waste = dimensions.x * dimensions.y - count * size * size
+            if waste >= 0:
+                break
+        else:
+            continue
+        if best_size is None or waste < min_waste:
+            best_size = size
+            best_counts = count_x, count_y
+            min_waste = waste
     return best_size, best_counts
 
 
@@ -115,6 +151,36 @@ def interpolate_color(color1: str, color2: str, ratio: float) -> str:
     return c3.hex_l
 
 
+# number of colours in a precomputed gradient
+COLOR_STEPS = 256
+
+
+@functools.lru_cache(maxsize=None)
+def color_gradient(
+    color1: str, color2: str, steps: int = COLOR_STEPS, space: str = "hsl"
+) -> Tuple[str, ...]:
+    """Return steps hex colours evenly spaced from color1 to color2.
+
+    Gradients are cached per colour pair, so drawers look colours up by index
+    instead of interpolating for every element. space is "hsl", matching
+    interpolate_color, or "rgb" for a linear blend of the channels.
+    """
+    if space == "rgb":
+        rgb1, rgb2 = (
+            [int(colour.Color(c).hex_l[i : i + 2], 16) for i in (1, 3, 5)]
+            for c in (color1, color2)
+        )
+        return tuple(
+            "#{:02x}{:02x}{:02x}".format(
+                *(int(a + (b - a) * i / (steps - 1)) for a, b in zip(rgb1, rgb2))
+            )
+            for i in range(steps)
+        )
+    return tuple(
+        interpolate_color(color1, color2, i / (steps - 1)) for i in range(steps)
+    )
+
+
 def format_float(f):
     return locale.format_string("%.1f", f)
 
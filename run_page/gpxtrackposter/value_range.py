@@ -21,6 +21,7 @@ class ValueRange:
         diameter: Return difference between upper and lower bounds if valid, else 0.
         contains: Returns True if the range contains value.
         extend: Adjust the range to include value.
+        index: Position of value in the range as an index into steps buckets.
 
     """
 
@@ -59,3 +60,9 @@ class ValueRange:
         else:
             self._lower = min(self._lower, value)
             self._upper = max(self._upper, value)
+
+    def index(self, value: float, steps: int) -> int:
+        if self.diameter() == 0:
+            return 0
+        i = round((value - self.lower()) / self.diameter() * (steps - 1))
+        return min(max(i, 0), steps - 1)
@@ -0,0 +1,120 @@
+"""Per-year statistics of all runs, computed once and shared by drawers and the TUI."""
+
+import datetime
+from dataclasses import dataclass
+from typing import Dict
+
+from .value_range import ValueRange
+
+
+@dataclass
+class YearStats:
+    """Statistics of the runs of one year, lengths in meters and times in seconds."""
+
+    year: int
+    count: int = 0
+    total_length: float = 0.0
+    moving_time: float = 0.0
+    longest: float = 0.0
+    marathon_count: int = 0
+    half_marathon_count: int = 0
+    ten_k_count: int = 0
+    # longest number of consecutive days with a run
+    streak: int = 0
+
+
+def track_moving_time(track) -> float:
+    """Moving time of a track in seconds, or its elapsed time if unknown."""
+    if track.moving_dict and "moving_time" in track.moving_dict:
+        moving_time = track.moving_dict["moving_time"]
+        if isinstance(moving_time, datetime.timedelta):
+            return moving_time.total_seconds()
+        return float(moving_time)
+    if isinstance(track.end_time, datetime.datetime) and isinstance(
+        track.start_time, datetime.datetime
+    ):
+        return (track.end_time - track.start_time).total_seconds()
+    return 0
+
+
+class YearlyStats:
+    """Statistics of every year and of all runs, built in one sweep.
+
+    Runs are sorted by start time once, then each run updates its year's
+    totals, race counts and streak of consecutive days, along with the
+    overall totals, length range and active weeks.
+
+    Attributes:
+        years: YearStats by year, in ascending order.
+        count: Number of runs.
+        total_length: Summed length of all runs.
+        length_range: ValueRange of the run lengths.
+        weeks: Number of distinct (year, ISO week number) pairs with a run.
+        first: Start time of the first run, None without runs.
+        last: Start time of the last run, None without runs.
+
+    Methods:
+        from_tracks: Build the statistics of poster tracks
+        year: YearStats of a year, empty if it has no runs
+        total_length_by_year: Summed length of each year
+    """
+
+    def __init__(self, starts, lengths, moving_times):
+        """
+        Args:
+            starts: date or datetime of each run.
+            lengths: Length of each run in meters.
+            moving_times: Moving time of each run in seconds.
+        """
+        runs = sorted(zip(starts, lengths, moving_times), key=lambda run: run[0])
+        self.years: Dict[int, YearStats] = {}
+        self.count = len(runs)
+        self.total_length = 0.0
+        self.length_range = ValueRange()
+        self.first = runs[0][0] if runs else None
+        self.last = runs[-1][0] if runs else None
+        weeks = set()
+
+        stats = None
+        last_day = streak = 0
+        for start, length, moving_time in runs:
+            if stats is None or stats.year != start.year:
+                stats = self.years[start.year] = YearStats(start.year)
+                last_day = streak = 0
+            stats.count += 1
+            stats.total_length += length
+            stats.moving_time += moving_time
+            stats.longest = max(stats.longest, length)
+            km = length / 1000
+            if km >= 42.0:
+                stats.marathon_count += 1
+            elif km >= 21.0:
+                stats.half_marathon_count += 1
+            elif km >= 10.0:
+                stats.ten_k_count += 1
+
+            day = start.toordinal()
+            if day != last_day:
+                streak = streak + 1 if day == last_day + 1 else 1
+                stats.streak = max(stats.streak, streak)
+                last_day = day
+
+            self.total_length += length
+            self.length_range.extend(length)
+            # isocalendar()[1] -> week number
+            weeks.add((start.year, start.isocalendar()[1]))
+        self.weeks = len(weeks)
+
+    @classmethod
+    def from_tracks(cls, tracks) -> "YearlyStats":
+        return cls(
+            [t.start_time_local for t in tracks],
+            [t.length for t in tracks],
+            [track_moving_time(t) for t in tracks],
+        )
+
+    def year(self, year: int) -> YearStats:
+        return self.years.get(year) or YearStats(year)
+
+    def total_length_by_year(self) -> Dict[int, float]:
+        return {year: stats.total_length for year, stats in self.years.items()}
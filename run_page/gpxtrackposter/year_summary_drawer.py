@@ -1,17 +1,22 @@
 """Draw a Year Summary poster similar to Cursor stats style."""
 
 import datetime
-from collections import defaultdict
 
 import svgwrite
 
+from .month_index import MonthIndex
 from .tracks_drawer import TracksDrawer
+from .utils import COLOR_STEPS, color_gradient
+from .value_range import ValueRange
 from .xy import XY
 
 
 class YearSummaryDrawer(TracksDrawer):
     """Draw a Year Summary poster with monthly activity dots and statistics"""
 
+    # the header counts the days since the first run
+    uses_today = True
+
     def __init__(self, the_poster):
         super().__init__(the_poster)
         self.year = None
@@ -44,7 +49,7 @@ class YearSummaryDrawer(TracksDrawer):
         ]
 
         # Calculate statistics
-        stats = self._calculate_stats(year_tracks)
+        stats = self._calculate_stats()
 
         # Layout settings - left side takes about 40% width
         left_margin = offset.x + 6
@@ -52,7 +57,7 @@ class YearSummaryDrawer(TracksDrawer):
         right_section_start = offset.x + left_width
 
         # Draw "Running for X Days" header - align with top of dots (offset.y + 8)
-        first_run_date = self._get_first_run_date()
+        first_run_date = self.poster.yearly_stats.first
         if first_run_date:
             days_ago = (datetime.datetime.now() - first_run_date).days
             header_text = f"Running for {days_ago} Days"
@@ -241,98 +246,30 @@ class YearSummaryDrawer(TracksDrawer):
             dim_color,
         )
 
-    def _calculate_stats(self, tracks):
-        """Calculate running statistics for the year"""
+    def _calculate_stats(self):
+        """Running statistics of the year, from the poster's yearly statistics"""
+        year_stats = self.poster.yearly_stats.year(self.year)
         stats = {
-            "total_runs": len(tracks),
-            "total_distance": 0,
-            "marathon_count": 0,
-            "half_marathon_count": 0,
-            "10k_count": 0,
+            "total_runs": year_stats.count,
+            "total_distance": self.poster.m2u(year_stats.total_length),
+            "marathon_count": year_stats.marathon_count,
+            "half_marathon_count": year_stats.half_marathon_count,
+            "10k_count": year_stats.ten_k_count,
             "avg_pace": "0'00\"",
-            "streak": 0,
-            "total_time": 0,
-            "longest_run": 0,
+            "streak": year_stats.streak,
+            "total_time": year_stats.moving_time,
+            "longest_run": self.poster.m2u(year_stats.longest),
         }
 
-        if not tracks:
-            return stats
-
-        total_distance_m = sum(t.length for t in tracks)
-        total_time_s = 0
-        longest_run_m = 0
-
-        for t in tracks:
-            dist_km = t.length / 1000
-            # Track longest run
-            if t.length > longest_run_m:
-                longest_run_m = t.length
-
-            # Count race distances
-            if dist_km >= 42.0:
-                stats["marathon_count"] += 1
-            elif dist_km >= 21.0:
-                stats["half_marathon_count"] += 1
-            elif dist_km >= 10.0:
-                stats["10k_count"] += 1
-
-            # Calculate total moving time
-            if t.moving_dict and "moving_time" in t.moving_dict:
-                moving_time = t.moving_dict["moving_time"]
-                if isinstance(moving_time, datetime.timedelta):
-                    total_time_s += moving_time.total_seconds()
-                else:
-                    total_time_s += float(moving_time)
-            elif t.end_time and t.start_time:
-                if isinstance(t.end_time, datetime.datetime) and isinstance(
-                    t.start_time, datetime.datetime
-                ):
-                    total_time_s += (t.end_time - t.start_time).total_seconds()
-
-        stats["total_distance"] = self.poster.m2u(total_distance_m)
-        stats["total_time"] = total_time_s
-        stats["longest_run"] = self.poster.m2u(longest_run_m)
-
         # Calculate average pace (min per Unit)
-        if total_distance_m > 0 and total_time_s > 0:
-            pace_s_per_unit = total_time_s / self.poster.m2u(total_distance_m)
+        if year_stats.total_length > 0 and year_stats.moving_time > 0:
+            pace_s_per_unit = year_stats.moving_time / stats["total_distance"]
             pace_min = int(pace_s_per_unit // 60)
             pace_sec = int(pace_s_per_unit % 60)
             stats["avg_pace"] = f"{pace_min}'{pace_sec:02d}\""
 
-        # Calculate streak (consecutive days)
-        stats["streak"] = self._calculate_streak(tracks)
-
         return stats
 
-    def _calculate_streak(self, tracks):
-        """Calculate the longest running streak in days"""
-        if not tracks:
-            return 0
-
-        # Get unique dates
-        dates = sorted(set(t.start_time_local.date() for t in tracks))
-        if not dates:
-            return 0
-
-        max_streak = 1
-        current_streak = 1
-
-        for i in range(1, len(dates)):
-            if (dates[i] - dates[i - 1]).days == 1:
-                current_streak += 1
-                max_streak = max(max_streak, current_streak)
-            else:
-                current_streak = 1
-
-        return max_streak
-
-    def _get_first_run_date(self):
-        """Get the date of the first run ever"""
-        if not self.poster.tracks:
-            return None
-        return min(t.start_time_local for t in self.poster.tracks)
-
     def _draw_monthly_grid_vertical(
         self,
         dr,
@@ -347,11 +284,11 @@ class YearSummaryDrawer(TracksDrawer):
     ):
         """Draw the monthly activity grid - 12 columns (months), 31 rows (days)"""
         # Group tracks by month and day
-        month_data = defaultdict(lambda: defaultdict(float))
-        for t in tracks:
-            month = t.start_time_local.month
-            day = t.start_time_local.day
-            month_data[month][day] += self.poster.m2u(t.length)
+        index = MonthIndex.from_tracks(tracks)
+        month_data = {
+            month: self.poster.m2u(index.day_totals(self.year, month)).tolist()
+            for month in range(1, 13)
+        }
 
         # Grid parameters - 12 columns (months), 31 rows (days)
         cols = 12  # months
@@ -362,13 +299,9 @@ class YearSummaryDrawer(TracksDrawer):
         spacing_y = height / rows
         radius = min(spacing_x, spacing_y) / 2 * 0.75
 
-        # Find max distance for color scaling
-        max_dist = 1
-        for month_days in month_data.values():
-            for dist in month_days.values():
-                max_dist = max(max_dist, dist)
-
         special_distance = self.poster.special_distance.get("special_distance", 10)
+        intensity_range = ValueRange.from_pair(0, special_distance)
+        gradient = color_gradient(dim_color, track_color, space="rgb")
 
         # Draw dots - each column is a month, each row is a day
         for month in range(1, 13):
@@ -383,7 +316,7 @@ class YearSummaryDrawer(TracksDrawer):
                 cx = x_start + (month - 1) * spacing_x + spacing_x / 2
                 cy = y_start + (day - 1) * spacing_y + spacing_y / 2
 
-                dist = month_data[month].get(day, 0)
+                dist = month_data[month][day - 1]
 
                 if dist > 0:
                     # Activity day - color based on distance
@@ -391,10 +324,7 @@ class YearSummaryDrawer(TracksDrawer):
                         color = special_color
                     else:
                         # Interpolate between dim and track color based on distance
-                        intensity = min(dist / special_distance, 1.0)
-                        color = self._interpolate_color(
-                            dim_color, track_color, intensity
-                        )
+                        color = gradient[intensity_range.index(dist, COLOR_STEPS)]
                 else:
                     # No activity - dim dot
                     color = dim_color
@@ -405,19 +335,3 @@ class YearSummaryDrawer(TracksDrawer):
                     title += f": {int(dist) if dist >= 1 else round(dist, 1)} {self.poster.u()}"
                 circle.set_desc(title=title)
                 dr.add(circle)
-
-    def _interpolate_color(self, color1, color2, t):
-        """Interpolate between two hex colors"""
-
-        def hex_to_rgb(hex_color):
-            hex_color = hex_color.lstrip("#")
-            return tuple(int(hex_color[i : i + 2], 16) for i in (0, 2, 4))
-
-        def rgb_to_hex(rgb):
-            return "#{:02x}{:02x}{:02x}".format(*rgb)
-
-        rgb1 = hex_to_rgb(color1)
-        rgb2 = hex_to_rgb(color2)
-
-        rgb = tuple(int(rgb1[i] + (rgb2[i] - rgb1[i]) * t) for i in range(3))
-        return rgb_to_hex(rgb)
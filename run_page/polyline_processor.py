@@ -1,4 +1,6 @@
 from typing import List, Tuple
+import json
+import numpy as np
 import polyline
 import os
 import warnings
@@ -105,3 +107,98 @@ def filter_out(polyline_str):
     if not new_pl:
         return
     return polyline.encode(new_pl)
+
+
+# Levels of detail precomputed for every stored summary polyline, finest first.
+# Each tolerance is a fraction of the route's bounding box extent, so a level
+# stays accurate to half a pixel as long as tolerance * pixel_budget <= 0.5.
+LOD_TOLERANCES = (1 / 512, 1 / 128, 1 / 32)
+
+
+def _farthest_point(points, coords, first, last):
+    """Index and squared distance of the point farthest from segment first-last."""
+    lat1, lng1 = points[first]
+    d_lat, d_lng = points[last][0] - lat1, points[last][1] - lng1
+    segment_sq = d_lat * d_lat + d_lng * d_lng
+    if last - first > 64:
+        # long runs are cheaper in numpy, short ones in plain python
+        offsets = coords[first + 1 : last] - coords[first]
+        if segment_sq > 0:
+            t = (offsets[:, 0] * d_lat + offsets[:, 1] * d_lng) / segment_sq
+            offsets -= np.clip(t, 0.0, 1.0)[:, None] * (d_lat, d_lng)
+        distances_sq = np.einsum("ij,ij->i", offsets, offsets)
+        index = int(distances_sq.argmax())
+        return first + 1 + index, distances_sq[index]
+    max_sq, index = 0.0, first
+    for i in range(first + 1, last):
+        lat, lng = points[i][0] - lat1, points[i][1] - lng1
+        if segment_sq > 0:
+            t = max(0.0, min(1.0, (lat * d_lat + lng * d_lng) / segment_sq))
+            lat, lng = lat - t * d_lat, lng - t * d_lng
+        distance_sq = lat * lat + lng * lng
+        if distance_sq > max_sq:
+            max_sq, index = distance_sq, i
+    return index, max_sq
+
+
+def simplify_points(points: List[Tuple[float]], tolerance: float) -> List[Tuple[float]]:
+    """Douglas-Peucker simplification, tolerance in degrees."""
+    if len(points) < 3 or tolerance <= 0:
+        return list(points)
+    coords = np.asarray(points, dtype=float)
+    keep = [False] * len(points)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(points) - 1)]
+    while stack:
+        first, last = stack.pop()
+        if last - first < 2:
+            continue
+        index, distance_sq = _farthest_point(points, coords, first, last)
+        if distance_sq > tolerance * tolerance:
+            keep[index] = True
+            stack.append((first, index))
+            stack.append((index, last))
+    return [p for p, k in zip(points, keep) if k]
+
+
+def build_polyline_lods(polyline_str):
+    """Encode the LOD_TOLERANCES levels of a summary polyline as a JSON list.
+
+    Returns an empty string when there is nothing worth simplifying, in which
+    case consumers fall back to the summary polyline itself.
+    """
+    if not polyline_str:
+        return ""
+    points = polyline.decode(polyline_str)
+    if len(points) < 3:
+        return ""
+    extent = max(
+        max(p[0] for p in points) - min(p[0] for p in points),
+        max(p[1] for p in points) - min(p[1] for p in points),
+    )
+    if extent == 0:
+        return ""
+    lods = []
+    for tolerance in LOD_TOLERANCES:
+        # every level is simplified from the previous, finer one
+        points = simplify_points(points, tolerance * extent)
+        lods.append(polyline.encode(points))
+    return json.dumps(lods)
+
+
+def select_polyline_lod(polyline_str, polyline_lods, pixel_budget):
+    """Return the cheapest level of detail that is good enough for pixel_budget.
+
+    pixel_budget is the number of pixels the route's longer side is drawn on.
+    """
+    if not polyline_lods:
+        return polyline_str
+    try:
+        lods = json.loads(polyline_lods)
+    except ValueError:
+        return polyline_str
+    best = polyline_str
+    for tolerance, lod in zip(LOD_TOLERANCES, lods):
+        if tolerance * pixel_budget <= 0.5:
+            best = lod
+    return best
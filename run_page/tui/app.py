@@ -2,34 +2,41 @@
 
 from __future__ import annotations
 
+import asyncio
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Sequence
 
 from rich.console import Group as RichGroup
 from rich.panel import Panel
+from rich.segment import Segment
+from rich.style import Style
 from rich.table import Table as RichTable
 from rich.text import Text as RichText
-from textual import events
+from textual import events, work
 from textual.app import App, ComposeResult
 from textual.message import Message
 from textual.binding import Binding
 from textual.containers import Horizontal, Vertical, VerticalScroll
+from textual.geometry import Size
 from textual.reactive import reactive
+from textual.scroll_view import ScrollView
+from textual.strip import Strip
 from textual.widget import Widget
-from textual.widgets import Button, DataTable, Label, Static
+from textual.widgets import Button, Label, Static
 
 from .braille import render_polyline
 from .data import (
     Activity,
     AggregatedData,
-    FilterFunc,
-    YearStats,
-    aggregate_activities,
+    SearchIndex,
+    StatsCube,
+    data_file_key,
+    diff_activities,
     find_data_file,
     load_activities,
-    make_type_filter,
-    make_year_filter,
 )
+from .sqlite_source import SQLiteSource, source_key
 
 # ── colour palette ─────────────────────────────────────────
 
@@ -59,6 +66,11 @@ TYPE_COLORS = {
 INDOOR_COLOR = MUTED_TEXT_COLOR
 TRAIL_COLOR = SPECIAL_COLOR
 
+# seconds a worker runs before the list and stats show as loading
+LOADING_DELAY = 0.15
+# seconds between checks of the data file for changes, e.g. by a sync
+WATCH_INTERVAL = 1.0
+
 
 def _type_color(activity: Activity) -> str:
     if activity.subtype in ("indoor", "treadmill", "virtualrun"):
@@ -94,30 +106,12 @@ def fmt_duration(seconds: float) -> str:
     return " ".join(parts) if parts else "0s"
 
 
-def _monthly_distances(year_stats: YearStats) -> list[float]:
-    totals = [0.0] * 12
-    for date_str, distance_km in year_stats.daily_distances.items():
-        try:
-            month = int(date_str[5:7])
-        except (TypeError, ValueError, IndexError):
-            continue
-        if 1 <= month <= 12:
-            totals[month - 1] += distance_km
-    return totals
-
-
-def _monthly_counts(activities: list[Activity], year: str) -> list[int]:
-    totals = [0] * 12
-    for activity in activities:
-        if activity.year != year:
-            continue
-        try:
-            month = int(activity.date_local[5:7])
-        except (TypeError, ValueError, IndexError):
-            continue
-        if 1 <= month <= 12:
-            totals[month - 1] += 1
-    return totals
+def _monthly_distances(data: AggregatedData, year: str) -> list[float]:
+    return data.monthly_distances(year)
+
+
+def _monthly_counts(data: AggregatedData, year: str) -> list[int]:
+    return data.monthly_counts(year)
 
 
 def _render_bar_chart(
@@ -219,7 +213,7 @@ def _render_distribution_panel(data: AggregatedData, focus_year: str) -> Panel:
     lines.append("\n")
     if data.year_stats and focus_year in data.year_stats:
         ys = data.year_stats[focus_year]
-        monthly = _monthly_distances(ys)
+        monthly = _monthly_distances(data, focus_year)
         best_month = (
             max(range(12), key=lambda idx: monthly[idx]) if any(monthly) else None
         )
@@ -298,6 +292,204 @@ def _stats_layout_flags(
 # ── widgets ─────────────────────────────────────────────────
 
 
+class RunTable(ScrollView, can_focus=True):
+    """Table of activities that formats only the rows on screen.
+
+    Rows are drawn line by line from the activity list (Textual's line API),
+    so showing a new list, scrolling or moving the cursor costs the same
+    however many activities there are. Rows around the visible window are
+    formatted once and kept until the window moves past them.
+    """
+
+    COMPONENT_CLASSES = {
+        "run-table--header",
+        "run-table--cursor",
+        "run-table--stripe",
+    }
+
+    BINDINGS = [
+        Binding("up", "cursor_up", "Up", show=False),
+        Binding("down", "cursor_down", "Down", show=False),
+        Binding("pageup", "page_up", "Page Up", show=False),
+        Binding("pagedown", "page_down", "Page Down", show=False),
+        Binding("home", "cursor_first", "First", show=False),
+        Binding("end", "cursor_last", "Last", show=False),
+        Binding("enter", "select_cursor", "Select", show=False),
+    ]
+
+    # (label, width, right aligned); "#" is widened to the row count
+    COLUMNS = [
+        ("#", 3, True),
+        ("Date", 10, False),
+        ("Distance", 8, True),
+        ("Time", 8, True),
+        ("Pace", 5, True),
+        ("Type", 8, False),
+        ("HR", 3, True),
+    ]
+
+    # rows formatted past each edge of the screen
+    OVERSCAN = 20
+
+    class RowHighlighted(Message):
+        def __init__(self, cursor_row: int) -> None:
+            super().__init__()
+            self.cursor_row = cursor_row
+
+    class RowSelected(Message):
+        def __init__(self, cursor_row: int) -> None:
+            super().__init__()
+            self.cursor_row = cursor_row
+
+    def __init__(self, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.activities: Sequence[Activity] = []
+        self.cursor_row = 0
+        self._widths = [width for _, width, _ in self.COLUMNS]
+        self._rows: dict[int, list[Segment]] = {}
+
+    def set_activities(
+        self, activities: Sequence[Activity], keep_cursor: bool = False
+    ) -> None:
+        """Show a new list of activities with the cursor on the first one.
+
+        With keep_cursor, the cursor stays on its activity if it is still in
+        the list and the table keeps its scroll position.
+        """
+        selected = None
+        if keep_cursor and self.cursor_row < len(self.activities):
+            selected = self.activities[self.cursor_row].run_id
+        self.activities = activities
+        self.cursor_row = 0
+        self._widths[0] = max(self.COLUMNS[0][1], len(str(len(activities))))
+        self._rows = {}
+        self.virtual_size = Size(
+            sum(self._widths) + 2 * len(self._widths), len(activities) + 1
+        )
+        if selected is None:
+            self.scroll_to(0, 0, animate=False)
+        else:
+            if hasattr(activities, "position"):  # pages of a database
+                row = activities.position(selected) or 0
+            else:
+                row = next(
+                    (i for i, a in enumerate(activities) if a.run_id == selected), 0
+                )
+            self.cursor_row = row
+            self.move_cursor(row)
+        self.refresh()
+
+    def move_cursor(self, row: int) -> None:
+        """Move the cursor to a row, scrolling it into view."""
+        if not self.activities:
+            return
+        row = max(0, min(row, len(self.activities) - 1))
+        visible = max(1, self.size.height - 1)
+        top = self.scroll_offset.y
+        if row < top:
+            self.scroll_to(y=row, animate=False)
+        elif row >= top + visible:
+            self.scroll_to(y=row - visible + 1, animate=False)
+        if row != self.cursor_row:
+            self.cursor_row = row
+            self.refresh()
+            self.post_message(self.RowHighlighted(row))
+
+    def _cells(self, cells, styles) -> list[Segment]:
+        segments = []
+        for (_, _, right), width, cell, style in zip(
+            self.COLUMNS, self._widths, cells, styles
+        ):
+            cell = cell[:width]
+            cell = cell.rjust(width) if right else cell.ljust(width)
+            segments.append(Segment(f" {cell} ", style))
+        return segments
+
+    def _format_row(self, index: int) -> list[Segment]:
+        a = self.activities[index]
+        hr = f"{a.average_heartrate:.0f}" if a.average_heartrate else "-"
+        cells = (
+            str(index + 1),
+            a.date_local,
+            f"{a.distance_km:.2f}",
+            a.formatted_time,
+            a.pace_min_km or "-",
+            a.sport_type_normalized,
+            hr,
+        )
+        styles = [None] * len(cells)
+        styles[5] = Style(color=_type_color(a))
+        return self._cells(cells, styles)
+
+    def _row(self, index: int) -> list[Segment]:
+        row = self._rows.get(index)
+        if row is None:
+            # format the window around the screen, dropping rows scrolled away
+            top = self.scroll_offset.y
+            start = max(0, min(index, top) - self.OVERSCAN)
+            end = min(
+                len(self.activities),
+                max(index + 1, top + self.size.height) + self.OVERSCAN,
+            )
+            self._rows = {
+                i: self._rows.get(i) or self._format_row(i) for i in range(start, end)
+            }
+            row = self._rows[index]
+        return row
+
+    def render_line(self, y: int) -> Strip:
+        width = self.size.width
+        scroll_x, scroll_y = self.scroll_offset
+        base = self.rich_style
+        if y == 0:
+            labels = [label for label, _, _ in self.COLUMNS]
+            segments = self._cells(labels, [None] * len(labels))
+            style = base + self.get_component_rich_style("run-table--header")
+        else:
+            index = scroll_y + y - 1
+            if index >= len(self.activities):
+                return Strip.blank(width, base)
+            segments = self._row(index)
+            style = base
+            if index == self.cursor_row:
+                style += self.get_component_rich_style("run-table--cursor")
+            elif index % 2:
+                style += self.get_component_rich_style("run-table--stripe")
+        strip = Strip(segments).apply_style(style)
+        return strip.crop_extend(scroll_x, scroll_x + width, style)
+
+    def on_click(self, event: events.Click) -> None:
+        offset = event.get_content_offset(self)
+        if offset is None or offset.y == 0:
+            return
+        row = self.scroll_offset.y + offset.y - 1
+        if row < len(self.activities):
+            self.move_cursor(row)
+            self.post_message(self.RowSelected(row))
+
+    def action_cursor_up(self) -> None:
+        self.move_cursor(self.cursor_row - 1)
+
+    def action_cursor_down(self) -> None:
+        self.move_cursor(self.cursor_row + 1)
+
+    def action_page_up(self) -> None:
+        self.move_cursor(self.cursor_row - max(1, self.size.height - 1))
+
+    def action_page_down(self) -> None:
+        self.move_cursor(self.cursor_row + max(1, self.size.height - 1))
+
+    def action_cursor_first(self) -> None:
+        self.move_cursor(0)
+
+    def action_cursor_last(self) -> None:
+        self.move_cursor(len(self.activities) - 1)
+
+    def action_select_cursor(self) -> None:
+        if self.activities:
+            self.post_message(self.RowSelected(self.cursor_row))
+
+
 class RouteMapWidget(Widget):
     """Renders a running route as braille art."""
 
@@ -323,6 +515,20 @@ class RouteMapWidget(Widget):
         text.append("\n".join(lines), style=SINGLE_RUN_COLOR)
         return text
 
+    def prefetch(self, polylines: list[Optional[str]]) -> None:
+        """Render routes likely shown next in a thread, filling the render cache."""
+        w, h = self.size.width, self.size.height
+        polylines = [p for p in polylines if p]
+        if w < 10 or h < 4 or not polylines:
+            return
+        self.run_worker(
+            lambda: [render_polyline(p, w, h - 1) for p in polylines],
+            thread=True,
+            group="route-prefetch",
+            exclusive=True,
+            exit_on_error=False,
+        )
+
 
 class RunDetailPanel(Widget):
     """Metadata for the selected activity."""
@@ -363,7 +569,7 @@ class RunDetailPanel(Widget):
             return rows
 
         year_acts = sorted(
-            [a for a in self.data.activities if a.year == activity.year],
+            self.data.year_runs(activity.year),
             key=lambda a: (a.date_local, a.run_id),
         )
         month = activity.date_local[:7]
@@ -660,13 +866,13 @@ class StatsView(VerticalScroll):
             focus_year = d.years[0]
             monthly_distance_chart = _render_monthly_chart(
                 focus_year,
-                _monthly_distances(d.year_stats[focus_year]),
+                _monthly_distances(d, focus_year),
                 self.size.width,
             )
             monthly_count_chart = _render_bar_chart(
                 f"Monthly Runs ({focus_year})",
                 [f"{month:02d}" for month in range(1, 13)],
-                _monthly_counts(d.activities, focus_year),
+                _monthly_counts(d, focus_year),
                 width=self.size.width,
                 color=SECONDARY_COLOR,
                 suffix=" r",
@@ -877,11 +1083,11 @@ class RunningTUI(App):
         padding: 0 1;
     }
     #route-panel { border: solid #404040; background: #171717; }
-    DataTable { height: 100%; }
+    RunTable { height: 100%; }
 
-    DataTable > .datatable--header { background: #262626; color: #d4d4d8; }
-    DataTable > .datatable--cursor { background: #3a3a22; color: #e0ed5e; }
-    DataTable > .datatable--hover { background: #262626; }
+    RunTable > .run-table--header { background: #262626; color: #d4d4d8; text-style: bold; }
+    RunTable > .run-table--cursor { background: #3a3a22; color: #e0ed5e; }
+    RunTable > .run-table--stripe { background: #1c1c1c; }
 
     /* ── detail / stats / places / grid views ────────── */
     #main-area { height: 1fr; }
@@ -907,12 +1113,20 @@ class RunningTUI(App):
     def __init__(self, data_path: str | Path | None = None) -> None:
         super().__init__()
         self.data_path = Path(data_path) if data_path else find_data_file()
-        self.activities: list[Activity] = []
-        self._displayed_activities: list[Activity] = []
+        # a running_page database is read a page at a time, not loaded whole
+        self._database = self.data_path.suffix == ".db"
+        self.activities: Sequence[Activity] = []
+        self._displayed_activities: Sequence[Activity] = []
+        self.cube: StatsCube | SQLiteSource | None = None
+        self._search_index: Optional[SearchIndex] = None  # built by the first search
         self.data: AggregatedData | None = None
         self.filtered_data: AggregatedData | None = None
         self._sort_asc = False
-        self._active_filters: list[FilterFunc] = []
+        self._sorted = False  # False while the list is in the file's order
+        self._data_key: Optional[tuple] = None  # of the loaded file
+        # (year, sport type) selected in the filter bar, None for all
+        self._selection: tuple[Optional[str], Optional[str]] = (None, None)
+        self._busy = 0  # running workers, the views show as loading while > 0
         self._current_view = "stats"
 
     # ── lifecycle ───────────────────────────────────────────
@@ -925,11 +1139,7 @@ class RunningTUI(App):
                 # all views stacked; only one visible at a time
                 with Horizontal(id="view-list"):
                     with Vertical(id="list-left"):
-                        yield DataTable(
-                            id="run-table",
-                            cursor_type="row",
-                            zebra_stripes=True,
-                        )
+                        yield RunTable(id="run-table")
                     with Vertical(id="list-right"):
                         yield RunDetailPanel(id="detail-panel")
                         with Vertical(id="route-panel"):
@@ -938,26 +1148,197 @@ class RunningTUI(App):
 
     def on_mount(self) -> None:
         self.title = "running_page TUI"
+        self._show_view("list")
+        self.query_one(RunTable).focus()
+        self._load()
+        self.set_interval(WATCH_INTERVAL, self._check_data_file)
+
+    # ── background work ─────────────────────────────────────
+
+    @contextmanager
+    def _loading(self):
+        """Count a running worker, showing the views as loading if it is slow."""
+        self._busy += 1
+        timer = self.set_timer(LOADING_DELAY, self._sync_loading)
         try:
-            self.activities = load_activities(self.data_path)
-            self.data = aggregate_activities(self.activities)
-            self.filtered_data = self.data
-        except Exception as exc:
-            self.notify(f"Failed to load data: {exc}", severity="error", timeout=10)
-            return
+            yield
+        finally:
+            self._busy -= 1
+            timer.stop()
+            self._sync_loading()
+
+    def _sync_loading(self) -> None:
+        # a query, as workers cancelled at exit get here after the views are gone
+        for widget in self.query("RunTable, StatsView"):
+            widget.loading = self._busy > 0
+
+    def _file_key(self) -> tuple:
+        if self._database:
+            return source_key(self.data_path)
+        return data_file_key(self.data_path)
 
-        # init filter bar — default to most recent year
+    @property
+    def search_index(self) -> Optional[SearchIndex]:
+        """Index of the loaded activities, built the first time it is used.
+
+        None for a database, which is never read whole.
+        """
+        if self._database:
+            return None
+        if self._search_index is None:
+            self._search_index = SearchIndex(self.activities)
+        return self._search_index
+
+    def _read_store(
+        self, descending: bool = False
+    ) -> tuple[tuple, Sequence[Activity], StatsCube | SQLiteSource, AggregatedData]:
+        if self._database:
+            source = SQLiteSource(self.data_path, descending)
+            # after opening, which may create the write-ahead log
+            key = source_key(self.data_path)
+            return key, source.activities, source, source.aggregate()
+        # before reading, so that a write meanwhile is seen as a change
+        key = data_file_key(self.data_path)
+        activities = load_activities(self.data_path)
+        cube = StatsCube(activities)
+        return key, activities, cube, cube.aggregate()
+
+    @work(exclusive=True, group="load")
+    async def _load(self, refresh: bool = False) -> None:
+        """Read the activities in a thread, then swap them in at once."""
+        with self._loading():
+            try:
+                store = await asyncio.to_thread(self._read_store)
+            except Exception as exc:
+                if refresh:
+                    self.notify(f"Refresh failed: {exc}", severity="error")
+                else:
+                    self.notify(
+                        f"Failed to load data: {exc}", severity="error", timeout=10
+                    )
+                return
+        self._data_key, self.activities, self.cube, self.data = store
+        self._search_index = None
+        self._sorted = False
+        self.filtered_data = self.data
+
+        # default to the most recent year
         self._sync_filter_bar(default_latest_year=True)
-
-        # populate table
-        table = self.query_one("#run-table", DataTable)
-        table.add_columns("#", "Date", "Distance", "Time", "Pace", "Type", "HR")
         self._rebuild_filters()
+        if refresh:
+            self.notify(f"Refreshed — {len(self.activities)} activities")
+        else:
+            self.notify(f"Loaded {len(self.activities)} activities", timeout=3)
+
+    @work(exclusive=True, group="sort")
+    async def _sort(self, ascending: bool) -> None:
+        source, cube = self.activities, self.cube
+
+        def sort() -> tuple[Sequence[Activity], StatsCube | SQLiteSource]:
+            if isinstance(cube, SQLiteSource):
+                ordered = cube.ordered(descending=not ascending)
+                return ordered.activities, ordered
+            activities = sorted(
+                source, key=lambda a: a.start_date_local, reverse=not ascending
+            )
+            # the cells keep positions in the list, so they follow the new order
+            return activities, StatsCube(activities)
 
-        self.notify(f"Loaded {len(self.activities)} activities", timeout=3)
+        with self._loading():
+            activities, cube = await asyncio.to_thread(sort)
+        if self.activities is not source:  # reloaded meanwhile
+            return
+        self.activities, self.cube = activities, cube
+        self._sorted = True
+        self._apply_filters()
 
-        self._show_view("list")
-        table.focus()
+    def _check_data_file(self) -> None:
+        if self._data_key is None:  # not loaded
+            return
+        try:
+            key = self._file_key()
+        except OSError:
+            return
+        loading = any(w.group == "load" and w.is_running for w in self.workers)
+        if key != self._data_key and not loading:
+            if self._database:
+                self._reopen_database()
+            else:
+                self._reload_changes()
+
+    @work(exclusive=True, group="load")
+    async def _reopen_database(self) -> None:
+        """Read the database again after a write, in the same order.
+
+        Its cells are rebuilt with a few GROUP BY queries, so there is no
+        diff to compute; the table keeps its cursor and scroll position.
+        """
+        source = self.activities
+        descending = self._sorted and not self._sort_asc
+        with self._loading():
+            try:
+                store = await asyncio.to_thread(self._read_store, descending)
+            except Exception:
+                return  # e.g. a locked database, retried on the next check
+        if self.activities is not source:  # reloaded or re-sorted meanwhile
+            return
+        self._data_key, self.activities, self.cube, self.data = store
+        self._search_index = None
+        self._sync_filter_bar(default_latest_year=False)
+        self._rebuild_filters(keep_cursor=True)
+        self.notify(f"Updated — {len(self.activities)} activities")
+
+    @work(exclusive=True, group="load")
+    async def _reload_changes(self) -> None:
+        """Apply the changes of the rewritten data file to the loaded data.
+
+        Activities are compared by run_id, only the cube cells of changed
+        ones are rebuilt, and the table keeps its cursor and scroll position.
+        """
+        source, cube, index = self.activities, self.cube, self._search_index
+        ascending = self._sort_asc if self._sorted else None
+
+        def read() -> tuple:
+            key = data_file_key(self.data_path)
+            activities, changes = diff_activities(
+                source, load_activities(self.data_path)
+            )
+            if ascending is not None:
+                activities.sort(key=lambda a: a.start_date_local, reverse=not ascending)
+            # an index not built yet is built from the new list when searched
+            patched = index.patch(changes) if index is not None else None
+            return key, activities, changes, cube.patch(activities, changes), patched
+
+        with self._loading():
+            try:
+                key, activities, changes, cube, index = await asyncio.to_thread(read)
+            except Exception:
+                return  # e.g. caught mid-write, retried on the next check
+        if self.activities is not source:  # reloaded or re-sorted meanwhile
+            return
+        self._data_key = key
+        if not changes:
+            return
+        self.activities, self.cube, self._search_index = activities, cube, index
+        self.data = cube.aggregate()
+        self._sync_filter_bar(default_latest_year=False)
+        self._rebuild_filters(keep_cursor=True)
+        self.notify(
+            f"Updated — {len(changes.added)} added, {len(changes.changed)} changed,"
+            f" {len(changes.removed)} removed"
+        )
+
+    @work(exclusive=True, group="filter")
+    async def _aggregate(
+        self,
+        cube: StatsCube | SQLiteSource,
+        selection: tuple[Optional[str], Optional[str]],
+        keep_cursor: bool = False,
+    ) -> None:
+        # a newer selection cancels this worker, so it never shows stale data
+        with self._loading():
+            data = await asyncio.to_thread(cube.aggregate, *selection)
+        self._show_filtered(data, keep_cursor)
 
     # ── view switching ──────────────────────────────────────
 
@@ -970,25 +1351,6 @@ class RunningTUI(App):
 
     # ── table helpers ───────────────────────────────────────
 
-    def _populate_table(self, table: DataTable, activities: list[Activity]) -> None:
-        table.clear()
-        rows: list[tuple[str, ...]] = []
-        for i, a in enumerate(activities, 1):
-            color = _type_color(a)
-            hr = f"{a.average_heartrate:.0f}" if a.average_heartrate else "-"
-            rows.append(
-                (
-                    str(i),
-                    a.date_local,
-                    f"{a.distance_km:.2f}",
-                    a.formatted_time,
-                    a.pace_min_km or "-",
-                    f"[{color}]{a.sport_type_normalized}[/]",
-                    hr,
-                )
-            )
-        table.add_rows(rows)
-
     def _select_activity(self, index: int) -> None:
         activities = self._displayed_activities or self.activities
         if not activities or index < 0 or index >= len(activities):
@@ -998,9 +1360,22 @@ class RunningTUI(App):
         detail.activity = a
         detail.data = self.data
         rw = self.query_one(RouteMapWidget)
-        rw.polyline_str = a.summary_polyline or ""
+        rw.polyline_str = self._polyline(a) or ""
         rw.activity_name = a.name or ""
         rw.distance_km = a.distance_km
+        rw.prefetch(
+            [
+                self._polyline(activities[i])
+                for i in (index + 1, index - 1)
+                if 0 <= i < len(activities)
+            ]
+        )
+
+    def _polyline(self, activity: Activity) -> Optional[str]:
+        # rows of a database leave their route to be fetched when shown
+        if self._database and activity.has_route:
+            return activity.summary_polyline or self.cube.polyline(activity.run_id)
+        return activity.summary_polyline
 
     def _sync_filter_bar(self, *, default_latest_year: bool) -> None:
         fb = self.query_one(FilterBar)
@@ -1038,29 +1413,29 @@ class RunningTUI(App):
 
     # ── filtering ───────────────────────────────────────────
 
-    def _rebuild_filters(self) -> None:
+    def _rebuild_filters(self, keep_cursor: bool = False) -> None:
         fb = self.query_one(FilterBar)
-        filters: list[FilterFunc] = []
-        if fb.selected_year != "All":
-            filters.append(make_year_filter(fb.selected_year))
-        if fb.selected_type != "All":
-            filters.append(make_type_filter(fb.selected_type))
-        self._active_filters = filters
-        self._apply_filters()
+        self._selection = (
+            fb.selected_year if fb.selected_year != "All" else None,
+            fb.selected_type if fb.selected_type != "All" else None,
+        )
+        self._apply_filters(keep_cursor)
 
-    def _apply_filters(self) -> None:
-        filtered = self.activities
-        for f in self._active_filters:
-            filtered = [a for a in filtered if f(a)]
+    def _apply_filters(self, keep_cursor: bool = False) -> None:
+        if self.cube is not None:
+            self._aggregate(self.cube, self._selection, keep_cursor)
+
+    def _show_filtered(self, data: AggregatedData, keep_cursor: bool = False) -> None:
+        self.filtered_data = data
+        filtered = data.activities
         self._displayed_activities = filtered
-        self.filtered_data = aggregate_activities(filtered)
-        table = self.query_one("#run-table", DataTable)
-        self._populate_table(table, filtered)
+        table = self.query_one(RunTable)
+        table.set_activities(filtered, keep_cursor)
         stats_view = self.query_one(StatsView)
         stats_view.period_label = self._overall_period_label()
         stats_view.data = self.filtered_data
         if filtered:
-            self._select_activity(0)
+            self._select_activity(table.cursor_row)
         else:
             self.query_one(RunDetailPanel).activity = None
             rw = self.query_one(RouteMapWidget)
@@ -1085,17 +1460,11 @@ class RunningTUI(App):
 
     # ── message handlers ────────────────────────────────────
 
-    def on_data_table_row_highlighted(self, event: DataTable.RowHighlighted) -> None:
+    def on_run_table_row_highlighted(self, event: RunTable.RowHighlighted) -> None:
         self._select_activity(event.cursor_row)
 
-    def on_data_table_row_selected(self, event: DataTable.RowSelected) -> None:
-        table = self.query_one("#run-table", DataTable)
-        try:
-            keys = list(table.rows.keys())
-            idx = keys.index(event.row_key)
-            self._select_activity(idx)
-        except (ValueError, IndexError):
-            pass
+    def on_run_table_row_selected(self, event: RunTable.RowSelected) -> None:
+        self._select_activity(event.cursor_row)
 
     def on_filter_bar_filter_changed(self, event: FilterBar.FilterChanged) -> None:
         self._rebuild_filters()
@@ -1110,28 +1479,16 @@ class RunningTUI(App):
     # ── actions ─────────────────────────────────────────────
 
     def action_refresh(self) -> None:
-        try:
-            self.activities = load_activities(self.data_path)
-            self.data = aggregate_activities(self.activities)
-            self.filtered_data = self.data
-            self._sync_filter_bar(default_latest_year=True)
-            self._rebuild_filters()
-            self.notify(f"Refreshed — {len(self.activities)} activities")
-        except Exception as exc:
-            self.notify(f"Refresh failed: {exc}", severity="error")
+        self._load(refresh=True)
 
     def action_toggle_sort(self) -> None:
         self._sort_asc = not self._sort_asc
-        self.activities.sort(
-            key=lambda a: a.start_date_local,
-            reverse=not self._sort_asc,
-        )
-        self._apply_filters()
+        self._sort(self._sort_asc)
 
     def action_next_run(self) -> None:
         if not self._displayed_activities:
             return
-        table = self.query_one("#run-table", DataTable)
+        table = self.query_one(RunTable)
         cur = table.cursor_row
         nxt = min(cur + 1, len(self._displayed_activities) - 1)
         if nxt != cur:
@@ -1141,7 +1498,7 @@ class RunningTUI(App):
     def action_prev_run(self) -> None:
         if not self._displayed_activities:
             return
-        table = self.query_one("#run-table", DataTable)
+        table = self.query_one(RunTable)
         cur = table.cursor_row
         prv = max(cur - 1, 0)
         if prv != cur:
@@ -1166,7 +1523,7 @@ class RunningTUI(App):
 
     def action_view_list(self) -> None:
         self._show_view("list")
-        self.query_one("#run-table", DataTable).focus()
+        self.query_one(RunTable).focus()
 
     def action_view_stats(self) -> None:
         self._show_view("stats")
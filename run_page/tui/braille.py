@@ -1,5 +1,8 @@
 """Braille canvas for rendering polylines as braille art."""
 
+import functools
+
+import numpy as np
 import polyline
 
 # Braille dot bit patterns — (col, row) in a 2x4 grid
@@ -13,9 +16,21 @@ _DOT_BITS = {
     (1, 2): 0x20,
     (1, 3): 0x80,
 }
+# the same bits as a (row, col) array for packing a 4x2 block at once
+_DOT_WEIGHTS = np.array(
+    [[_DOT_BITS[(col, row)] for col in (0, 1)] for row in range(4)], dtype=np.uint32
+)
 
 _BRAILLE_BASE = 0x2800
 
+# rendered routes kept, by (polyline, width, height)
+RENDER_CACHE_SIZE = 256
+
+
+def _round_div(num: np.ndarray, den: np.ndarray) -> np.ndarray:
+    """num / den rounded half away from zero, in integers (den > 0)."""
+    return np.sign(num) * ((2 * np.abs(num) + den) // (2 * den))
+
 
 class BrailleCanvas:
     """A 2-dot × 4-dot-per-character canvas for line rendering."""
@@ -23,63 +38,54 @@ class BrailleCanvas:
     def __init__(self, width_chars: int, height_chars: int):
         self.w = width_chars * 2
         self.h = height_chars * 4
-        self.dots = bytearray(self.w * self.h)
+        self.dots = np.zeros((self.h, self.w), dtype=bool)
 
     def _set(self, x: int, y: int) -> None:
         if 0 <= x < self.w and 0 <= y < self.h:
-            self.dots[y * self.w + x] = 1
+            self.dots[y, x] = True
 
     def draw_line(self, x0: int, y0: int, x1: int, y1: int) -> None:
-        dx = abs(x1 - x0)
-        sx = 1 if x0 < x1 else -1
-        dy = -abs(y1 - y0)
-        sy = 1 if y0 < y1 else -1
-        err = dx + dy
-
-        while True:
-            self._set(x0, y0)
-            if x0 == x1 and y0 == y1:
-                break
-            e2 = 2 * err
-            if e2 >= dy:
-                err += dy
-                x0 += sx
-            if e2 <= dx:
-                err += dx
-                y0 += sy
+        self.draw_lines(np.array([x0, x1]), np.array([y0, y1]))
+
+    def draw_lines(self, xs: np.ndarray, ys: np.ndarray) -> None:
+        """Draw the line through the dot coordinates (xs[i], ys[i]).
+
+        Each segment is sampled once per step along its major axis and the
+        minor axis rounded half away from its start, which sets the same
+        dots as Bresenham's algorithm, for all segments in one pass.
+        """
+        xs = np.asarray(xs, dtype=np.int64)
+        ys = np.asarray(ys, dtype=np.int64)
+        if len(xs) < 2:
+            return
+        dx, dy = np.diff(xs), np.diff(ys)
+        points = np.maximum(np.abs(dx), np.abs(dy)) + 1
+        segment = np.repeat(np.arange(len(dx)), points)
+        step = np.arange(len(segment)) - np.repeat(np.cumsum(points) - points, points)
+        steps = np.maximum(points[segment] - 1, 1)
+        x = xs[segment] + _round_div(step * dx[segment], steps)
+        y = ys[segment] + _round_div(step * dy[segment], steps)
+        inside = (x >= 0) & (x < self.w) & (y >= 0) & (y < self.h)
+        self.dots[y[inside], x[inside]] = True
 
     def to_lines(self) -> list[str]:
-        lines: list[str] = []
-        for cy in range(0, self.h, 4):
-            chars: list[str] = []
-            for cx in range(0, self.w, 2):
-                pattern = 0
-                for dy in range(4):
-                    for dx in (0, 1):
-                        px = cx + dx
-                        py = cy + dy
-                        if px < self.w and py < self.h and self.dots[py * self.w + px]:
-                            pattern |= _DOT_BITS.get((dx, dy), 0)
-                chars.append(chr(_BRAILLE_BASE + pattern))
-            lines.append("".join(chars))
-        return lines
-
+        # pack each 4x2 block of dots into the bits of its braille character
+        blocks = self.dots.reshape(self.h // 4, 4, self.w // 2, 2)
+        codes = (blocks * _DOT_WEIGHTS[None, :, None, :]).sum(axis=(1, 3))
+        codes = (codes + _BRAILLE_BASE).astype("<u4")
+        # a row of UCS-4 code points is the buffer of a numpy unicode string
+        return codes.view(f"<U{max(codes.shape[1], 1)}")[:, 0].tolist()
 
-def render_polyline(
-    polyline_str: str, width_chars: int, height_chars: int
-) -> list[str]:
-    """Render an encoded polyline as braille-art lines.
 
-    Returns a list of strings, one per character-row of the terminal.
-    """
+@functools.lru_cache(maxsize=RENDER_CACHE_SIZE)
+def _render(polyline_str: str, width_chars: int, height_chars: int) -> tuple:
     coords = polyline.decode(polyline_str)
     if not coords or len(coords) < 2:
-        return [f"  (route has {len(coords)} point(s))"]
+        return (f"  (route has {len(coords)} point(s))",)
 
-    lats = [c[0] for c in coords]
-    lngs = [c[1] for c in coords]
-    min_lat, max_lat = min(lats), max(lats)
-    min_lng, max_lng = min(lngs), max(lngs)
+    lats, lngs = np.array(coords, dtype=float).T
+    min_lat, max_lat = lats.min(), lats.max()
+    min_lng, max_lng = lngs.min(), lngs.max()
 
     lat_rng = max_lat - min_lat or 0.001
     lng_rng = max_lng - min_lng or 0.001
@@ -93,21 +99,20 @@ def render_polyline(
     lng_rng = max_lng - min_lng
 
     canvas = BrailleCanvas(width_chars, height_chars)
-    w_dots = canvas.w
-    h_dots = canvas.h
-
-    def sx(lng: float) -> int:
-        return int((lng - min_lng) / lng_rng * (w_dots - 1))
+    canvas.draw_lines(
+        ((lngs - min_lng) / lng_rng * (canvas.w - 1)).astype(np.int64),
+        ((max_lat - lats) / lat_rng * (canvas.h - 1)).astype(np.int64),
+    )
+    return tuple(canvas.to_lines())
 
-    def sy(lat: float) -> int:
-        return int((max_lat - lat) / lat_rng * (h_dots - 1))
 
-    for i in range(len(coords) - 1):
-        canvas.draw_line(
-            sx(coords[i][1]),
-            sy(coords[i][0]),
-            sx(coords[i + 1][1]),
-            sy(coords[i + 1][0]),
-        )
+def render_polyline(
+    polyline_str: str, width_chars: int, height_chars: int
+) -> list[str]:
+    """Render an encoded polyline as braille-art lines.
 
-    return canvas.to_lines()
+    Returns a list of strings, one per character-row of the terminal.
+    Renders are cached by polyline and size, so showing a route again, or
+    one prefetched by the TUI, costs a lookup.
+    """
+    return list(_render(polyline_str, width_chars, height_chars))
@@ -0,0 +1,191 @@
+"""Binary columnar cache of activities.json for fast TUI startup.
+
+The cache sits beside the JSON file as ``<name>.cache`` and holds one column
+per Activity field, derived fields included, so loading it parses nothing:
+numbers as raw little-endian arrays and strings as one UTF-8 blob with
+offsets. It records the JSON's size and mtime and is rebuilt whenever either
+changes, so reading it never returns stale activities.
+
+Layout: MAGIC, a uint32 header length, the JSON header, then each column at
+the 8-byte aligned offset the header gives.
+"""
+
+from __future__ import annotations
+
+import json
+import mmap
+import os
+import struct
+from dataclasses import fields
+from datetime import date
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from .data import Activity
+
+MAGIC = b"RPTUIC\x00\x01"
+VERSION = 2
+
+# columns stored as numbers; None is kept as NaN in float columns
+INT_COLUMNS = {"run_id", "streak", "hour", "moving_seconds"}
+FLOAT_COLUMNS = {
+    "distance",
+    "average_heartrate",
+    "elevation_gain",
+    "average_speed",
+    "distance_km",
+    "pace_seconds_per_km",
+}
+# dates are stored as proleptic Gregorian ordinals
+DATE_COLUMNS = {"date_obj"}
+BOOL_COLUMNS = {"has_route"}
+COLUMNS = [f.name for f in fields(Activity)]
+
+
+def cache_path(json_path: str | Path) -> Path:
+    path = Path(json_path)
+    return path.with_name(path.name + ".cache")
+
+
+def _source_key(json_path: Path) -> dict:
+    stat = json_path.stat()
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def _encode_strings(values: list) -> tuple[int, bytes, bytes, bytes, bytes]:
+    """Dictionary encode a string column.
+
+    Returns the number of distinct values, their UTF-8 blob, character
+    offsets and null mask, and the index of each row's value.
+    """
+    distinct = {value: i for i, value in enumerate(dict.fromkeys(values))}
+    text = "".join(v or "" for v in distinct)
+    offsets = np.zeros(len(distinct) + 1, dtype="<i8")
+    np.cumsum([len(v or "") for v in distinct], out=offsets[1:])
+    nulls = np.array([v is None for v in distinct], dtype=np.uint8)
+    codes = np.array([distinct[v] for v in values], dtype="<i4")
+    return (
+        len(distinct),
+        text.encode("utf-8"),
+        offsets.tobytes(),
+        nulls.tobytes(),
+        codes.tobytes(),
+    )
+
+
+def write_cache(json_path: str | Path, activities: list[Activity]) -> Path:
+    """Write the cache of the activities just read from json_path."""
+    json_path = Path(json_path)
+    columns = [[getattr(a, name) for a in activities] for name in COLUMNS]
+    chunks: list[bytes] = []
+    layout: dict[str, list] = {}
+    position = 0
+
+    def add(data: bytes) -> list:
+        nonlocal position
+        chunks.append(data)
+        chunks.append(b"\0" * (-len(data) % 8))
+        start = position
+        position += len(data) + (-len(data) % 8)
+        return [start, len(data)]
+
+    for name, values in zip(COLUMNS, columns):
+        if name in INT_COLUMNS:
+            layout[name] = ["int", add(np.array(values, dtype="<i8").tobytes())]
+        elif name in DATE_COLUMNS:
+            ordinals = np.array([v.toordinal() for v in values], dtype="<i8")
+            layout[name] = ["date", add(ordinals.tobytes())]
+        elif name in BOOL_COLUMNS:
+            layout[name] = ["bool", add(np.array(values, dtype="u1").tobytes())]
+        elif name in FLOAT_COLUMNS:
+            array = np.array([np.nan if v is None else v for v in values], dtype="<f8")
+            layout[name] = ["float", add(array.tobytes())]
+        else:
+            distinct, *arrays = _encode_strings(values)
+            layout[name] = ["str", distinct, *(add(array) for array in arrays)]
+
+    header = json.dumps(
+        {
+            "version": VERSION,
+            "source": _source_key(json_path),
+            "count": len(activities),
+            "columns": layout,
+        }
+    ).encode("utf-8")
+    prefix = MAGIC + struct.pack("<I", len(header)) + header
+    prefix += b"\0" * (-len(prefix) % 8)
+
+    path = cache_path(json_path)
+    tmp = path.with_name(path.name + f".{os.getpid()}.tmp")
+    try:
+        with open(tmp, "wb") as f:
+            f.write(prefix)
+            f.writelines(chunks)
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    return path
+
+
+def _numbers(buffer, base: int, dtype: str, count: int, location: list) -> list:
+    start, _ = location
+    return np.frombuffer(buffer, dtype, count, base + start).tolist()
+
+
+def _strings(buffer, base: int, count: int, distinct, blob, offsets, nulls, codes):
+    text = buffer[base + blob[0] : base + blob[0] + blob[1]].decode("utf-8")
+    bounds = _numbers(buffer, base, "<i8", distinct + 1, offsets)
+    missing = _numbers(buffer, base, "u1", distinct, nulls)
+    values = [
+        None if null else text[start:end]
+        for start, end, null in zip(bounds, bounds[1:], missing)
+    ]
+    # rows with the same value share one string object
+    return list(map(values.__getitem__, _numbers(buffer, base, "<i4", count, codes)))
+
+
+def read_cache(json_path: str | Path) -> Optional[list[Activity]]:
+    """Activities from the cache of json_path, None if it is missing or stale."""
+    json_path = Path(json_path)
+    try:
+        f = open(cache_path(json_path), "rb")
+    except OSError:
+        return None
+    with f:
+        try:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty file
+            return None
+        with buffer:
+            if buffer[: len(MAGIC)] != MAGIC:
+                return None
+            (length,) = struct.unpack_from("<I", buffer, len(MAGIC))
+            start = len(MAGIC) + 4
+            header = json.loads(buffer[start : start + length])
+            if header["version"] != VERSION:
+                return None
+            if header["source"] != _source_key(json_path):
+                return None
+            base = start + length
+            base += -base % 8
+            count = header["count"]
+            columns = []
+            for name in COLUMNS:
+                kind, *locations = header["columns"][name]
+                if kind == "int":
+                    columns.append(_numbers(buffer, base, "<i8", count, *locations))
+                elif kind == "date":
+                    values = _numbers(buffer, base, "<i8", count, *locations)
+                    columns.append([date.fromordinal(v) for v in values])
+                elif kind == "bool":
+                    values = _numbers(buffer, base, "u1", count, *locations)
+                    columns.append([bool(v) for v in values])
+                elif kind == "float":
+                    values = _numbers(buffer, base, "<f8", count, *locations)
+                    columns.append([None if v != v else v for v in values])
+                else:
+                    columns.append(_strings(buffer, base, count, *locations))
+    return [Activity(*row) for row in zip(*columns)]
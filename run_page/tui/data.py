@@ -2,12 +2,23 @@
 
 from __future__ import annotations
 
+import bisect
+import functools
+import heapq
 import json
+import logging
+import re
 from collections import defaultdict
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 from datetime import date, timedelta
 from pathlib import Path
-from typing import Callable, Optional
+from typing import Callable, Optional, Sequence
+
+import numpy as np
+
+from ..gpxtrackposter.month_index import MonthIndex
+
+log = logging.getLogger(__name__)
 
 # ── constants matching web UI ──────────────────────────────
 
@@ -42,10 +53,38 @@ SPORT_TYPE_ALIASES: dict[str, str] = {
 }
 
 
+PERIOD_LABELS: dict[str, str] = {
+    "Morning": "清晨跑步",
+    "Midday": "午间跑步",
+    "Afternoon": "午后跑步",
+    "Evening": "傍晚跑步",
+    "Night": "夜晚跑步",
+}
+
+COUNTRY_NAMES: dict[str, str] = {
+    "中国": "中国",
+    "美利坚合众国": "美国",
+    "United States": "美国",
+    "日本": "日本",
+    "대한민국": "韩国",
+}
+
+
+_PERIODS_BY_HOUR = [
+    next(name for name, lo, hi in PERIOD_RANGES if lo <= hour < hi)
+    for hour in range(24)
+]
+
+
 # ── activity dataclass ─────────────────────────────────────
 
 
-@dataclass
+def _derived(**kwargs):
+    """A field computed from the activity's data, not compared or printed."""
+    return field(default=None, repr=False, compare=False, **kwargs)
+
+
+@dataclass(slots=True)
 class Activity:
     run_id: int
     name: str
@@ -62,158 +101,128 @@ class Activity:
     average_speed: float  # m/s
     streak: int
 
-    # ── computed properties ────────────────────────────────
-
-    @property
-    def distance_km(self) -> float:
-        return self.distance / 1000
-
-    @property
-    def year(self) -> str:
-        return self.start_date_local[:4]
-
-    @property
-    def date_local(self) -> str:
-        return self.start_date_local[:10]
-
-    @property
-    def date_obj(self) -> date:
-        return date.fromisoformat(self.date_local)
-
-    @property
-    def hour(self) -> int:
-        return int(self.start_date_local[11:13])
-
-    @property
-    def period(self) -> str:
-        h = self.hour
-        for name, lo, hi in PERIOD_RANGES:
-            if lo <= h < hi:
-                return name
-        return "Night"
-
-    @property
-    def period_label(self) -> str:
-        labels = {
-            "Morning": "清晨跑步",
-            "Midday": "午间跑步",
-            "Afternoon": "午后跑步",
-            "Evening": "傍晚跑步",
-            "Night": "夜晚跑步",
-        }
-        return labels.get(self.period, self.period)
-
-    @property
-    def has_route(self) -> bool:
-        return bool(self.summary_polyline)
-
-    @property
-    def formatted_time(self) -> str:
-        parts = self.moving_time.split(":")
-        if len(parts) == 3:
-            h, m, s = int(parts[0]), int(parts[1]), int(parts[2])
-            if h > 0:
-                return f"{h}h{m}m"
-            return f"{m}m{s}s"
-        return self.moving_time
-
-    @property
-    def moving_seconds(self) -> int:
-        parts = self.moving_time.split(":")
-        if len(parts) == 3:
-            return int(parts[0]) * 3600 + int(parts[1]) * 60 + int(parts[2])
-        if "days" in self.moving_time or "day" in self.moving_time:
-            # "X days, HH:MM:SS"
-            try:
-                day_part, time_part = self.moving_time.split(", ")
-                days = int(day_part.split()[0])
-                h, m, s = [int(x) for x in time_part.split(":")]
-                return days * 86400 + h * 3600 + m * 60 + s
-            except (ValueError, IndexError):
-                pass
-        return 0
-
-    @property
-    def pace_min_km(self) -> Optional[str]:
-        if self.distance <= 0:
-            return None
-        secs = self.moving_seconds
-        if secs <= 0:
-            return None
-        pace = secs / self.distance_km
-        return f"{int(pace // 60)}:{int(pace % 60):02d}"
-
-    @property
-    def pace_seconds_per_km(self) -> Optional[float]:
-        if self.distance <= 0:
-            return None
-        secs = self.moving_seconds
-        if secs <= 0:
-            return None
-        return secs / self.distance_km
-
-    # ── location parsing ───────────────────────────────────
-
-    @property
-    def city(self) -> str:
-        loc = self.location_country
-        if not loc:
-            return ""
-        parts = [p.strip() for p in loc.split(",")]
-        # Chinese address: city is typically 3rd from end
-        # e.g. "..., 沈阳市, 辽宁省, 110142, 中国"
-        for p in reversed(parts):
-            if p.endswith("市") or p.endswith("县"):
-                return p
-        if len(parts) >= 3:
-            return parts[-3]
-        return parts[0] if parts else ""
+    # ── derived fields ─────────────────────────────────────
+    # Computed once in __post_init__ so that aggregation, filters and table
+    # redraws never parse strings; the binary cache stores them as columns
+    # and passes them in, which skips the computation.
+
+    distance_km: float = _derived()
+    year: str = _derived()
+    date_local: str = _derived()
+    date_obj: date = _derived()
+    hour: int = _derived()
+    period: str = _derived()
+    period_label: str = _derived()
+    moving_seconds: int = _derived()
+    formatted_time: str = _derived()
+    pace_seconds_per_km: Optional[float] = _derived()
+    pace_min_km: Optional[str] = _derived()
+    city: str = _derived()
+    province: str = _derived()
+    country: str = _derived()
+    race_label: Optional[str] = _derived()
+    sport_type_normalized: str = _derived()
+    has_route: bool = _derived()
+
+    def __post_init__(self) -> None:
+        if self.date_obj is None:
+            self._derive()
+
+    def _derive(self) -> None:
+        self.distance_km = self.distance / 1000
+        self.year = self.start_date_local[:4]
+        self.date_local = self.start_date_local[:10]
+        self.date_obj = date.fromisoformat(self.date_local)
+        self.hour = int(self.start_date_local[11:13])
+        self.period = _period(self.hour)
+        self.period_label = PERIOD_LABELS.get(self.period, self.period)
+        self.moving_seconds = _moving_seconds(self.moving_time)
+        self.formatted_time = _formatted_time(self.moving_time)
+        self.pace_seconds_per_km = None
+        self.pace_min_km = None
+        if self.distance > 0 and self.moving_seconds > 0:
+            pace = self.moving_seconds / self.distance_km
+            self.pace_seconds_per_km = pace
+            self.pace_min_km = f"{int(pace // 60)}:{int(pace % 60):02d}"
+        self.city, self.province, self.country = _location(self.location_country)
+        self.race_label = _race_label(self.distance_km)
+        self.sport_type_normalized = SPORT_TYPE_ALIASES.get(self.type, self.type)
+        self.has_route = bool(self.summary_polyline)
+
+
+def _period(hour: int) -> str:
+    if 0 <= hour < 24:
+        return _PERIODS_BY_HOUR[hour]
+    return "Night"
+
+
+def _formatted_time(moving_time: str) -> str:
+    parts = moving_time.split(":")
+    if len(parts) == 3 and "day" not in moving_time:
+        h, m, s = int(parts[0]), int(parts[1]), int(parts[2])
+        if h > 0:
+            return f"{h}h{m}m"
+        return f"{m}m{s}s"
+    return moving_time
+
+
+def _moving_seconds(moving_time: str) -> int:
+    parts = moving_time.split(":")
+    if len(parts) == 3 and "day" not in moving_time:
+        return int(parts[0]) * 3600 + int(parts[1]) * 60 + int(parts[2])
+    if "days" in moving_time or "day" in moving_time:
+        # "X days, HH:MM:SS"
+        try:
+            day_part, time_part = moving_time.split(", ")
+            days = int(day_part.split()[0])
+            h, m, s = [int(x) for x in time_part.split(":")]
+            return days * 86400 + h * 3600 + m * 60 + s
+        except (ValueError, IndexError):
+            pass
+    return 0
+
+
+# ── location parsing ───────────────────────────────────────
+
+
+@functools.lru_cache(maxsize=4096)
+def _location(loc: Optional[str]) -> tuple[str, str, str]:
+    """City, province and country of a location string.
+
+    Cached since most activities share a handful of places.
+    """
+    if not loc:
+        return "", "", ""
+    parts = [p.strip() for p in loc.split(",")]
+
+    # Chinese address: city is typically 3rd from end
+    # e.g. "..., 沈阳市, 辽宁省, 110142, 中国"
+    city = next((p for p in reversed(parts) if p.endswith(("市", "县"))), None)
+    if city is None:
+        city = parts[-3] if len(parts) >= 3 else parts[0]
+
+    province = next(
+        (p for p in reversed(parts) if p.endswith(("省", "自治区", "特别行政区"))),
+        None,
+    )
+    if province is None:
+        province = parts[-2] if len(parts) >= 2 else ""
 
-    @property
-    def province(self) -> str:
-        loc = self.location_country
-        if not loc:
-            return ""
-        parts = [p.strip() for p in loc.split(",")]
-        for p in reversed(parts):
-            if p.endswith("省") or p.endswith("自治区") or p.endswith("特别行政区"):
-                return p
-        if len(parts) >= 2:
-            return parts[-2]
-        return ""
+    country = parts[-1]
+    return city, province, COUNTRY_NAMES.get(country, country)
 
-    @property
-    def country(self) -> str:
-        loc = self.location_country
-        if not loc:
-            return ""
-        parts = [p.strip() for p in loc.split(",")]
-        country = parts[-1] if parts else ""
-        country_std = {
-            "中国": "中国",
-            "美利坚合众国": "美国",
-            "United States": "美国",
-            "日本": "日本",
-            "대한민국": "韩国",
-        }
-        return country_std.get(country, country)
 
-    # ── race classification ────────────────────────────────
+# ── race classification ────────────────────────────────────
 
-    @property
-    def race_label(self) -> Optional[str]:
-        km = self.distance_km
-        if km >= FULL_MARATHON:
-            return "全程马拉松"
-        if km >= HALF_MARATHON:
-            return "半程马拉松"
-        if km >= 10:
-            return "10K"
-        return None
 
-    @property
-    def sport_type_normalized(self) -> str:
-        return SPORT_TYPE_ALIASES.get(self.type, self.type)
+def _race_label(km: float) -> Optional[str]:
+    if km >= FULL_MARATHON:
+        return "全程马拉松"
+    if km >= HALF_MARATHON:
+        return "半程马拉松"
+    if km >= 10:
+        return "10K"
+    return None
 
 
 # ── filtering ──────────────────────────────────────────────
@@ -239,7 +248,16 @@ def make_period_filter(period: str) -> FilterFunc:
     return lambda a: a.period_label == period
 
 
-def make_search_filter(query: str) -> FilterFunc:
+def make_search_filter(query: str, index: Optional[SearchIndex] = None) -> FilterFunc:
+    """Match activities by name, place, type or date.
+
+    With the SearchIndex of the activities, the query's words are looked
+    up as token prefixes once, and the filter is a set lookup; without it,
+    the query is a substring of each activity's strings.
+    """
+    if index is not None:
+        run_ids = index.search(query)
+        return lambda a: a.run_id in run_ids
     q = query.lower()
     return lambda a: (
         q in (a.name or "").lower()
@@ -248,6 +266,134 @@ def make_search_filter(query: str) -> FilterFunc:
     )
 
 
+# ── search index ───────────────────────────────────────────
+
+_CJK = "\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff"
+_CJK_RE = re.compile(f"[{_CJK}]")
+# runs of CJK characters, numbers joined by dashes such as dates, other words
+_WORD_RE = re.compile(rf"[{_CJK}]+|\d+(?:-\d+)*|[^\W{_CJK}]+")
+
+
+def _bigrams(word: str) -> list[str]:
+    return [word[i : i + 2] for i in range(len(word) - 1)]
+
+
+def _tokens(text: str) -> list[str]:
+    """Lower-cased words of text, with CJK runs as overlapping bigrams.
+
+    A run's last character is kept as a token too, so that every single
+    character of it starts some token.
+    """
+    tokens = []
+    for word in _WORD_RE.findall(text.lower()):
+        if len(word) > 1 and _CJK_RE.match(word):
+            tokens += _bigrams(word)
+            tokens.append(word[-1])
+        else:
+            tokens.append(word)
+    return tokens
+
+
+def _activity_tokens(a: Activity) -> list[str]:
+    texts = (
+        a.name,
+        a.location_country,
+        a.city,
+        a.province,
+        a.country,
+        a.type,
+        a.sport_type_normalized,
+        a.date_local,
+    )
+    return _tokens(" ".join(t for t in texts if t))
+
+
+class SearchIndex:
+    """Inverted index of the names, places, types and dates of activities.
+
+    Maps each token to the run_ids of the activities containing it. A query
+    matches the activities having, for each of its words, a token starting
+    with that word, and for each CJK word of two or more characters, all of
+    its bigrams: "沈阳" finds "沈阳市" and "2026-03" every run of the month.
+    Tokens are kept sorted, so the tokens with a prefix are a bisect away.
+    """
+
+    def __init__(self, activities: Sequence[Activity]) -> None:
+        postings: dict[str, set[int]] = defaultdict(set)
+        for a in activities:
+            for token in _activity_tokens(a):
+                postings[token].add(a.run_id)
+        self.run_ids = frozenset(a.run_id for a in activities)
+        self.tokens = sorted(postings)
+        self.postings = {token: frozenset(ids) for token, ids in postings.items()}
+
+    def patch(self, changes: ActivityChanges) -> SearchIndex:
+        """Index of the activities after changes, like StatsCube.patch.
+
+        Only the postings of the tokens of changed activities are rebuilt,
+        and the tokens are sorted again only when some appear or disappear.
+        """
+        removed = [*changes.removed, *(old for old, _ in changes.changed)]
+        added = [*changes.added, *(new for _, new in changes.changed)]
+        edited: dict[str, set[int]] = {}
+        for activities, add in ((removed, False), (added, True)):
+            for a in activities:
+                for token in _activity_tokens(a):
+                    if token not in edited:
+                        edited[token] = set(self.postings.get(token, ()))
+                    if add:
+                        edited[token].add(a.run_id)
+                    else:
+                        edited[token].discard(a.run_id)
+        index = SearchIndex.__new__(SearchIndex)
+        index.run_ids = self.run_ids.difference(
+            a.run_id for a in changes.removed
+        ).union(a.run_id for a in changes.added)
+        index.postings = dict(self.postings)
+        for token, ids in edited.items():
+            if ids:
+                index.postings[token] = frozenset(ids)
+            else:
+                index.postings.pop(token, None)
+        if len(index.postings) == len(self.postings) and all(
+            token in self.postings for token in edited
+        ):
+            index.tokens = self.tokens
+        else:
+            index.tokens = sorted(index.postings)
+        return index
+
+    def _starting_with(self, prefix: str) -> frozenset[int]:
+        start = bisect.bisect_left(self.tokens, prefix)
+        end = start
+        while end < len(self.tokens) and self.tokens[end].startswith(prefix):
+            end += 1
+        if end - start == 1:
+            return self.postings[self.tokens[start]]
+        return frozenset().union(*map(self.postings.get, self.tokens[start:end]))
+
+    def search(self, query: str) -> frozenset[int]:
+        """run_ids of the activities matching every word of the query."""
+        terms = []
+        for word in _WORD_RE.findall(query.lower()):
+            if len(word) > 1 and _CJK_RE.match(word):
+                terms += [
+                    self.postings.get(bigram, frozenset()) for bigram in _bigrams(word)
+                ]
+            else:
+                terms.append(self._starting_with(word))
+        if not terms:
+            return self.run_ids
+        # intersect the rarest terms first, the sets only shrink
+        terms.sort(key=len)
+        matches = terms[0]
+        for term in terms[1:]:
+            if not matches:
+                break
+            matches = matches & term
+        return matches
+
+
 def filter_activities(
     activities: list[Activity],
     filters: list[FilterFunc],
@@ -308,7 +454,7 @@ class LocationStats:
 class AggregatedData:
     """Pre-computed aggregations over all activities."""
 
-    activities: list[Activity]
+    activities: Sequence[Activity]  # a list, or pages of the database
     years: list[str]
     year_stats: dict[str, YearStats]
 
@@ -339,6 +485,16 @@ class AggregatedData:
     first_date: Optional[str]
     last_date: Optional[str]
 
+    # km and run counts by month and day
+    month_index: MonthIndex
+
+    # race label -> count
+    races: dict[str, int]
+
+    # per-year series, memoized by (name, year): the instance is already one
+    # version of the data and one filter, so redraws and resizes reuse them
+    _series: dict = field(default_factory=dict, init=False, repr=False, compare=False)
+
     @property
     def overall_avg_pace(self) -> Optional[str]:
         if self.total_distance <= 0 or self.total_time_sec <= 0:
@@ -352,152 +508,305 @@ class AggregatedData:
             return None
         return self.total_heart_rate_sum / self.total_heart_rate_count
 
-    @property
-    def races(self) -> dict[str, int]:
-        counts: dict[str, int] = {"全程马拉松": 0, "半程马拉松": 0, "10K": 0}
-        for a in self.activities:
-            label = a.race_label
-            if label in counts:
-                counts[label] += 1
-        return counts
-
     def filter(self, filters: list[FilterFunc]) -> AggregatedData:
         """Return a new AggregatedData for the filtered subset."""
         filtered = filter_activities(self.activities, filters)
         return aggregate_activities(filtered)
 
+    def _memo(self, name: str, year: str, compute: Callable[[int], object]):
+        key = (name, year)
+        if key not in self._series:
+            self._series[key] = compute(int(year))
+        return self._series[key]
+
+    def monthly_distances(self, year: str) -> list[float]:
+        return self._memo(
+            "distances", year, lambda y: self.month_index.month_totals(y).tolist()
+        )
+
+    def monthly_counts(self, year: str) -> list[int]:
+        return self._memo(
+            "counts", year, lambda y: self.month_index.month_counts(y).tolist()
+        )
+
+    def contribution_grid(self, year: str) -> ContributionGrid:
+        """The year's contribution grid, from the month index's daily totals."""
+        key = ("grid", year)
+        if key not in self._series:
+            self._series[key] = _contribution_grid(self.month_index, year)
+        return self._series[key]
+
     def year_runs(self, year: str) -> list[Activity]:
+        if hasattr(self.activities, "year_runs"):  # pages of a database
+            return self.activities.year_runs(year)
         return [a for a in self.activities if a.year == year]
 
 
-def _parse_city_province_country(a: Activity) -> tuple[str, str, str]:
-    return a.city, a.province, a.country
-
+RACE_LABELS = ("全程马拉松", "半程马拉松", "10K")
 
-def aggregate_activities(activities: list[Activity]) -> AggregatedData:
-    """Compute all aggregations from a list of activities."""
 
-    years_set: set[str] = set()
-    cities: dict[str, float] = defaultdict(float)
-    provinces: dict[str, float] = defaultdict(float)
-    countries: dict[str, float] = defaultdict(float)
-    city_details: dict[str, LocationStats] = {}
-    periods: dict[str, int] = defaultdict(int)
-    type_counts: dict[str, int] = defaultdict(int)
-    type_distances: dict[str, float] = defaultdict(float)
-    year_stats: dict[str, YearStats] = {}
+@dataclass(slots=True)
+class _Cell:
+    """Partial aggregates of the activities of one (year, sport type)."""
 
-    total_dist = 0.0
-    total_time = 0.0
-    total_elev = 0.0
-    total_hr_sum = 0.0
-    total_hr_cnt = 0
-    total_max_dist = 0.0
-    total_max_speed = 0.0
-    first_date_val: Optional[str] = None
-    last_date_val: Optional[str] = None
-
-    for a in activities:
-        y = a.year
-        years_set.add(y)
+    year: str
+    sport_type: str
+    indices: list[int] = field(default_factory=list)  # positions in the list
+    count: int = 0
+    distance: float = 0.0  # km
+    time_sec: int = 0
+    elevation: float = 0.0
+    heart_rate_sum: float = 0.0
+    heart_rate_count: int = 0
+    max_distance: float = 0.0
+    max_speed: float = 0.0
+    max_streak: int = 0
+    daily_distances: dict[str, float] = field(default_factory=dict)
+    city_details: dict[str, LocationStats] = field(default_factory=dict)
+    # the cell's first activity in each city, which names its province, as
+    # an offset into indices so that it survives moving the cell's activities
+    city_first: dict[str, int] = field(default_factory=dict)
+    provinces: dict[str, float] = field(default_factory=dict)
+    countries: dict[str, float] = field(default_factory=dict)
+    periods: dict[str, int] = field(default_factory=dict)
+    races: dict[str, int] = field(default_factory=dict)
+    first_date: Optional[str] = None
+    last_date: Optional[str] = None
+    month_index: Optional[MonthIndex] = None
+
+    def add(self, index: int, a: Activity) -> None:
         d_km = a.distance_km
-        secs = a.moving_seconds
-
-        # year stats
-        if y not in year_stats:
-            year_stats[y] = YearStats(year=y)
-        ys = year_stats[y]
-        ys.year = y
-        ys.count += 1
-        ys.total_distance += d_km
-        ys.total_time_sec += secs
+        self.indices.append(index)
+        self.count += 1
+        self.distance += d_km
+        self.time_sec += a.moving_seconds
         if a.elevation_gain:
-            ys.total_elevation += a.elevation_gain
+            self.elevation += a.elevation_gain
         if a.average_heartrate:
-            ys.heart_rate_sum += a.average_heartrate
-            ys.heart_rate_count += 1
-        if d_km > ys.max_distance:
-            ys.max_distance = d_km
+            self.heart_rate_sum += a.average_heartrate
+            self.heart_rate_count += 1
+        if d_km > self.max_distance:
+            self.max_distance = d_km
         speed_kmh = a.average_speed * 3.6
-        if speed_kmh > ys.max_speed:
-            ys.max_speed = speed_kmh
-        if a.streak > ys.streak:
-            ys.streak = a.streak
-        ys.daily_distances[a.date_local] = (
-            ys.daily_distances.get(a.date_local, 0) + d_km
-        )
+        if speed_kmh > self.max_speed:
+            self.max_speed = speed_kmh
+        if a.streak > self.max_streak:
+            self.max_streak = a.streak
+        dl = a.date_local
+        self.daily_distances[dl] = self.daily_distances.get(dl, 0) + d_km
 
-        # location
-        city, prov, ctry = _parse_city_province_country(a)
-        if city:
-            cities[city] += d_km
-            if city not in city_details:
-                city_details[city] = LocationStats(
-                    city=city, province=prov, country=ctry
+        if a.city:
+            if a.city not in self.city_details:
+                self.city_details[a.city] = LocationStats(
+                    city=a.city, province=a.province, country=a.country
                 )
-            city_details[city].total_distance += d_km
-            city_details[city].count += 1
+                self.city_first[a.city] = len(self.indices) - 1
+            details = self.city_details[a.city]
+            details.total_distance += d_km
+            details.count += 1
             if a.elevation_gain:
-                city_details[city].total_elevation += a.elevation_gain
-        if prov:
-            provinces[prov] += d_km
-        if ctry:
-            countries[ctry] += d_km
-
-        # period
-        periods[a.period_label] += 1
-
-        # type
-        st = a.sport_type_normalized
-        type_counts[st] += 1
-        type_distances[st] += d_km
-
-        # overall
-        total_dist += d_km
-        total_time += secs
-        if a.elevation_gain:
-            total_elev += a.elevation_gain
-        if a.average_heartrate:
-            total_hr_sum += a.average_heartrate
-            total_hr_cnt += 1
-        if d_km > total_max_dist:
-            total_max_dist = d_km
-        if speed_kmh > total_max_speed:
-            total_max_speed = speed_kmh
-
-        # date range
-        dl = a.date_local
-        if first_date_val is None or dl < first_date_val:
-            first_date_val = dl
-        if last_date_val is None or dl > last_date_val:
-            last_date_val = dl
+                details.total_elevation += a.elevation_gain
+        if a.province:
+            self.provinces[a.province] = self.provinces.get(a.province, 0) + d_km
+        if a.country:
+            self.countries[a.country] = self.countries.get(a.country, 0) + d_km
+        self.periods[a.period_label] = self.periods.get(a.period_label, 0) + 1
+        if a.race_label:
+            self.races[a.race_label] = self.races.get(a.race_label, 0) + 1
+
+        if self.first_date is None or dl < self.first_date:
+            self.first_date = dl
+        if self.last_date is None or dl > self.last_date:
+            self.last_date = dl
+
+
+def _cell_positions(activities: list[Activity]) -> dict[tuple[str, str], list[int]]:
+    """Positions of the activities of each (year, sport type), in key order."""
+    positions: dict[tuple[str, str], list[int]] = {}
+    for i, a in enumerate(activities):
+        key = (a.year, a.sport_type_normalized)
+        if key in positions:
+            positions[key].append(i)
+        else:
+            positions[key] = [i]
+    return dict(sorted(positions.items()))
+
+
+def _build_cell(
+    key: tuple[str, str], activities: list[Activity], indices: list[int]
+) -> _Cell:
+    cell = _Cell(*key)
+    for i in indices:
+        cell.add(i, activities[i])
+    cell.month_index = MonthIndex(
+        [activities[i].date_obj for i in indices],
+        [activities[i].distance_km for i in indices],
+    )
+    return cell
+
+
+def _add_to(totals: dict, values: dict) -> None:
+    for key, value in values.items():
+        totals[key] = totals.get(key, 0) + value
+
+
+class StatsCube:
+    """Aggregations of activities pre-computed by (year, sport type).
+
+    Every cell holds mergeable partial aggregates (sums, counts, maxima and
+    per-day distances) of its activities, so a year and/or type selection
+    is answered by merging the matching cells, in O(cells) rather than
+    O(activities). Cells are always merged in key order, and
+    `aggregate_activities` is a merge of all cells of its own cube, so a
+    query gives exactly the same result as aggregating the filtered list.
+    """
+
+    def __init__(self, activities: list[Activity]) -> None:
+        self.activities = activities
+        self.cells = {
+            key: _build_cell(key, activities, indices)
+            for key, indices in _cell_positions(activities).items()
+        }
+
+    def patch(self, activities: list[Activity], changes: ActivityChanges) -> StatsCube:
+        """Cube of a new list of activities differing from this one by changes.
+
+        Only the cells of added, changed or removed activities are rebuilt,
+        the others are shared with their positions updated, so the result
+        equals StatsCube(activities) without aggregating every activity.
+        """
+        cube = StatsCube.__new__(StatsCube)
+        cube.activities = activities
+        cube.cells = {}
+        touched = changes.cell_keys
+        for key, indices in _cell_positions(activities).items():
+            cell = self.cells.get(key)
+            if cell is None or key in touched:
+                cube.cells[key] = _build_cell(key, activities, indices)
+            else:
+                cube.cells[key] = replace(cell, indices=indices)
+        return cube
+
+    def aggregate(
+        self, year: Optional[str] = None, sport_type: Optional[str] = None
+    ) -> AggregatedData:
+        """Aggregate the activities of a year and/or sport type, None for all.
+
+        Sport types match case-insensitively like `make_type_filter`.
+        """
+        cells = _select_cells(self.cells, year, sport_type)
+        if len(cells) == len(self.cells):
+            activities = self.activities
+        else:
+            indices = heapq.merge(*(cell.indices for cell in cells))
+            activities = [self.activities[i] for i in indices]
+        return _merge_cells(activities, cells)
+
+
+def _select_cells(
+    cells: dict[tuple[str, str], _Cell],
+    year: Optional[str],
+    sport_type: Optional[str],
+) -> list[_Cell]:
+    st = sport_type.lower() if sport_type is not None else None
+    return [
+        cell
+        for (cell_year, cell_type), cell in cells.items()
+        if (year is None or cell_year == year)
+        and (st is None or cell_type.lower() == st)
+    ]
+
 
+def _merge_cells(activities: Sequence[Activity], cells: list[_Cell]) -> AggregatedData:
+    year_stats: dict[str, YearStats] = {}
+    city_details: dict[str, LocationStats] = {}
+    city_first: dict[str, int] = {}
+    provinces: dict[str, float] = {}
+    countries: dict[str, float] = {}
+    periods: dict[str, int] = {}
+    races: dict[str, int] = dict.fromkeys(RACE_LABELS, 0)
+    type_counts: dict[str, int] = {}
+    type_distances: dict[str, float] = {}
+
+    for cell in cells:
+        if cell.year not in year_stats:
+            year_stats[cell.year] = YearStats(year=cell.year)
+        ys = year_stats[cell.year]
+        ys.count += cell.count
+        ys.total_distance += cell.distance
+        ys.total_time_sec += cell.time_sec
+        ys.total_elevation += cell.elevation
+        ys.heart_rate_sum += cell.heart_rate_sum
+        ys.heart_rate_count += cell.heart_rate_count
+        ys.max_distance = max(ys.max_distance, cell.max_distance)
+        ys.max_speed = max(ys.max_speed, cell.max_speed)
+        ys.streak = max(ys.streak, cell.max_streak)
+        _add_to(ys.daily_distances, cell.daily_distances)
+
+        for city, details in cell.city_details.items():
+            first = cell.indices[cell.city_first[city]]
+            if city not in city_details or first < city_first[city]:
+                merged = city_details.get(city) or LocationStats(city=city)
+                merged.province, merged.country = details.province, details.country
+                city_details[city] = merged
+                city_first[city] = first
+            merged = city_details[city]
+            merged.total_distance += details.total_distance
+            merged.count += details.count
+            merged.total_elevation += details.total_elevation
+        _add_to(provinces, cell.provinces)
+        _add_to(countries, cell.countries)
+        _add_to(periods, cell.periods)
+        _add_to(races, cell.races)
+        type_counts[cell.sport_type] = type_counts.get(cell.sport_type, 0) + cell.count
+        _add_to(type_distances, {cell.sport_type: cell.distance})
+
+    # in order of appearance, like a single pass over the activities
+    city_details = {
+        city: city_details[city] for city in sorted(city_details, key=city_first.get)
+    }
+    cities = {city: details.total_distance for city, details in city_details.items()}
+    first_dates = [cell.first_date for cell in cells]
+    last_dates = [cell.last_date for cell in cells]
     return AggregatedData(
         activities=activities,
-        years=sorted(years_set, reverse=True),
+        years=sorted(year_stats, reverse=True),
         year_stats={y: year_stats[y] for y in sorted(year_stats, reverse=True)},
         cities=dict(sorted(cities.items(), key=lambda x: -x[1])),
         provinces=dict(sorted(provinces.items(), key=lambda x: -x[1])),
         countries=dict(sorted(countries.items(), key=lambda x: -x[1])),
         city_details=city_details,
         periods=dict(sorted(periods.items(), key=lambda x: -x[1])),
-        total_distance=total_dist,
-        total_time_sec=total_time,
-        total_elevation=total_elev,
+        total_distance=sum((ys.total_distance for ys in year_stats.values()), 0.0),
+        total_time_sec=sum(cell.time_sec for cell in cells),
+        total_elevation=sum((ys.total_elevation for ys in year_stats.values()), 0.0),
         total_count=len(activities),
-        total_heart_rate_sum=total_hr_sum,
-        total_heart_rate_count=total_hr_cnt,
-        total_max_distance=total_max_dist,
-        total_max_speed=total_max_speed,
+        total_heart_rate_sum=sum(
+            (ys.heart_rate_sum for ys in year_stats.values()), 0.0
+        ),
+        total_heart_rate_count=sum(ys.heart_rate_count for ys in year_stats.values()),
+        total_max_distance=max(
+            (ys.max_distance for ys in year_stats.values()), default=0.0
+        ),
+        total_max_speed=max((ys.max_speed for ys in year_stats.values()), default=0.0),
         type_counts=type_counts,
         type_distances=type_distances,
-        first_date=first_date_val,
-        last_date=last_date_val,
+        first_date=min(first_dates) if cells else None,
+        last_date=max(last_dates) if cells else None,
+        month_index=MonthIndex.combine(cell.month_index for cell in cells),
+        races=races,
     )
 
 
+def aggregate_activities(activities: list[Activity]) -> AggregatedData:
+    """Compute all aggregations from a list of activities."""
+    return StatsCube(activities).aggregate()
+
+
 # ── contribution grid data ─────────────────────────────────
 
+MONTH_NAMES = [f"{month}月" for month in range(1, 13)]
+
 
 @dataclass
 class GridCell:
@@ -521,60 +830,43 @@ class ContributionGrid:
 
 def build_contribution_grid(activities: list[Activity], year: str) -> ContributionGrid:
     """Build a contribution grid for the given year."""
-    daily: dict[str, float] = defaultdict(float)
-    for a in activities:
-        if a.year == year:
-            daily[a.date_local] += a.distance_km
+    runs = [a for a in activities if a.year == year]
+    index = MonthIndex([a.date_obj for a in runs], [a.distance_km for a in runs])
+    return _contribution_grid(index, year)
 
-    if not daily:
-        return ContributionGrid(year=year, weeks=[], month_labels=[])
 
-    # Find the start and end of the year
+def _contribution_grid(index: MonthIndex, year: str) -> ContributionGrid:
+    """Contribution grid of the year's daily distances and activity counts."""
     try:
         start = date(int(year), 1, 1)
-        end = date(int(year), 12, 31)
     except (ValueError, OverflowError):
         return ContributionGrid(year=year, weeks=[], month_labels=[])
+    daily = index.year_day_totals(start.year)
+    if not index.year_day_counts(start.year).any():
+        return ContributionGrid(year=year, weeks=[], month_labels=[])
 
-    # Find the Monday on or before Jan 1
-    start_weekday = start.weekday()  # 0=Mon
-    grid_start = start - timedelta(days=start_weekday)
-
-    # Build the grid
-    weeks: list[list[Optional[GridCell]]] = [[None] * 7 for _ in range(53)]
-    current = grid_start
-    max_dist = max(daily.values()) if daily else 1
-
-    for col in range(53):
-        for row in range(7):
-            if current > end:
-                weeks[col][row] = None
-            elif current < start:
-                weeks[col][row] = GridCell(
-                    date_str=current.isoformat(),
-                    distance_km=0.0,
-                    level=0,
-                )
-            else:
-                ds = current.isoformat()
-                d = daily.get(ds, 0.0)
-                level = 0
-                if d > 0:
-                    ratio = d / max_dist
-                    if ratio > 0.75:
-                        level = 4
-                    elif ratio > 0.5:
-                        level = 3
-                    elif ratio > 0.25:
-                        level = 2
-                    else:
-                        level = 1
-                weeks[col][row] = GridCell(date_str=ds, distance_km=d, level=level)
-            current += timedelta(days=1)
-            if current > end:
-                break
-        if current > end:
-            break
+    # levels 1-4 by quarter of the longest day, all days at once
+    levels = np.zeros(len(daily), dtype=int)
+    ran = daily > 0
+    if ran.any():
+        ratio = daily[ran] / daily.max()
+        levels[ran] = 1 + (ratio > 0.25) + (ratio > 0.5) + (ratio > 0.75)
+
+    def cell(day: int) -> Optional[GridCell]:
+        if day >= len(daily):
+            return None
+        ds = (start + timedelta(days=day)).isoformat()
+        if day < 0:
+            return GridCell(date_str=ds, distance_km=0.0, level=0)
+        return GridCell(
+            date_str=ds, distance_km=float(daily[day]), level=int(levels[day])
+        )
+
+    # 7 rows x 53 columns from the Monday on or before Jan 1
+    offset = start.weekday()  # 0=Mon
+    weeks: list[list[Optional[GridCell]]] = [
+        [cell(col * 7 + row - offset) for row in range(7)] for col in range(53)
+    ]
 
     # Remove trailing empty columns
     while weeks and all(c is None for c in weeks[-1]):
@@ -582,28 +874,14 @@ def build_contribution_grid(activities: list[Activity], year: str) -> Contributi
 
     # Month labels: find the first column where each month appears
     month_labels: list[tuple[int, int, str]] = []
-    month_names = [
-        "1月",
-        "2月",
-        "3月",
-        "4月",
-        "5月",
-        "6月",
-        "7月",
-        "8月",
-        "9月",
-        "10月",
-        "11月",
-        "12月",
-    ]
     seen_months: set[int] = set()
     for col_idx, col in enumerate(weeks):
-        for cell in col:
-            if cell and cell.date_str >= start.isoformat():
-                m = int(cell.date_str[5:7])
+        for c in col:
+            if c and c.date_str >= start.isoformat():
+                m = int(c.date_str[5:7])
                 if m not in seen_months:
                     seen_months.add(m)
-                    month_labels.append((col_idx, 1, month_names[m - 1]))
+                    month_labels.append((col_idx, 1, MONTH_NAMES[m - 1]))
                 break
 
     return ContributionGrid(year=year, weeks=weeks, month_labels=month_labels)
@@ -612,13 +890,83 @@ def build_contribution_grid(activities: list[Activity], year: str) -> Contributi
 # ── loading ────────────────────────────────────────────────
 
 
-def load_activities(json_path: str | Path) -> list[Activity]:
+def load_activities(json_path: str | Path, use_cache: bool = True) -> list[Activity]:
+    """Load activities, from the binary cache beside the JSON when it is fresh."""
+    # the cache module builds Activity rows, so it imports this one
+    from .cache import read_cache, write_cache
+
     path = Path(json_path)
     if not path.exists():
         raise FileNotFoundError(f"Activities file not found: {path}")
+    if use_cache:
+        try:
+            activities = read_cache(path)
+        except Exception:
+            # the cache only speeds up loading, a broken one is a miss
+            log.warning("Ignoring the unreadable cache of %s", path, exc_info=True)
+            activities = None
+        if activities is not None:
+            return activities
     with open(path) as f:
         data = json.load(f)
-    return [Activity(**item) for item in data]
+    activities = [Activity(**item) for item in data]
+    if use_cache:
+        try:
+            write_cache(path, activities)
+        except Exception:
+            # e.g. a read-only data directory or a value the cache cannot hold
+            log.warning("Cannot write the cache of %s", path, exc_info=True)
+    return activities
+
+
+def data_file_key(path: str | Path) -> tuple[int, int]:
+    """Size and mtime of a data file, which change whenever it is rewritten."""
+    stat = Path(path).stat()
+    return stat.st_size, stat.st_mtime_ns
+
+
+@dataclass
+class ActivityChanges:
+    """Activities added, changed and removed between two loads, by run_id."""
+
+    added: list[Activity] = field(default_factory=list)
+    changed: list[tuple[Activity, Activity]] = field(default_factory=list)  # old, new
+    removed: list[Activity] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.changed or self.removed)
+
+    @property
+    def cell_keys(self) -> set[tuple[str, str]]:
+        """(year, sport type) of every version of the activities involved."""
+        activities = [*self.added, *self.removed]
+        for old, new in self.changed:
+            activities += [old, new]
+        return {(a.year, a.sport_type_normalized) for a in activities}
+
+
+def diff_activities(
+    old: list[Activity], new: list[Activity]
+) -> tuple[list[Activity], ActivityChanges]:
+    """Compare a reload of the activities with the current ones by run_id.
+
+    Returns the new list, in its order, with unchanged activities kept as
+    the current objects, and the changes.
+    """
+    current = {a.run_id: a for a in old}
+    activities = []
+    changes = ActivityChanges()
+    for a in new:
+        previous = current.pop(a.run_id, None)
+        if previous is None:
+            changes.added.append(a)
+        elif previous != a:
+            changes.changed.append((previous, a))
+        else:
+            a = previous
+        activities.append(a)
+    changes.removed = list(current.values())
+    return activities, changes
 
 
 def find_data_file() -> Path:
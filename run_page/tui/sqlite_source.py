@@ -0,0 +1,361 @@
+"""Read the TUI's activities straight from run_page/data.db.
+
+Instead of loading every row of activities.json, the source keeps one
+read-only connection to the database and:
+
+- fetches the list a page at a time, with LIMIT/OFFSET over the index on
+  start_date_local, keeping only the last few pages in memory;
+- builds the StatsCube cells with GROUP BY queries by day, location and
+  hour, so aggregations read no activity rows at all;
+- fetches a polyline only when its activity is shown.
+
+Memory then depends on the number of days, places and cached pages, not on
+the number of activities. Rows are read like Generator.load reads them:
+activities longer than 0.1 m, in start_date_local order, with the streak
+of their day.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import threading
+from collections import OrderedDict
+from collections.abc import Sequence
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Optional
+
+from ..gpxtrackposter.month_index import MonthIndex
+from .data import (
+    FULL_MARATHON,
+    HALF_MARATHON,
+    PERIOD_LABELS,
+    RACE_LABELS,
+    SPORT_TYPE_ALIASES,
+    Activity,
+    AggregatedData,
+    LocationStats,
+    _Cell,
+    _location,
+    _merge_cells,
+    _period,
+    _select_cells,
+    data_file_key,
+)
+
+# rows fetched per query, and pages kept, by the activity list
+PAGE_SIZE = 200
+CACHED_PAGES = 8
+
+WHERE = "distance > 0.1"
+# moving_time is an Interval, stored as a datetime from the epoch
+EPOCH = datetime(1970, 1, 1)
+
+COLUMNS = """run_id, name, distance, moving_time, type, subtype, start_date,
+    start_date_local, location_country, average_heartrate, elevation_gain,
+    average_speed, coalesce(summary_polyline, '') != ''"""
+
+KM = "distance / 1000.0"
+# sort key of a row, a string so that MIN and MAX find the first and last
+ROW_KEY = "start_date_local || printf(' %020d', run_id)"
+
+
+def source_key(path: str | Path) -> tuple:
+    """Keys of the database and its write-ahead log, changed by every write."""
+    path = Path(path)
+    wal = path.with_name(path.name + "-wal")
+    return data_file_key(path), data_file_key(wal) if wal.exists() else None
+
+
+def _moving_time(value: Optional[str]) -> str:
+    if not value:
+        return "0:00:00"
+    return str(datetime.fromisoformat(value).replace(microsecond=0) - EPOCH)
+
+
+def _streaks(days: list[str]) -> dict[str, int]:
+    """Running streak of each day with activities, like Generator.load."""
+    streaks: dict[str, int] = {}
+    last = None
+    streak = 0
+    for day in days:
+        current = date.fromisoformat(day)
+        if last is not None and current == last + timedelta(days=1):
+            streak += 1
+        else:
+            streak = 1
+        streaks[day] = streak
+        last = current
+    return streaks
+
+
+class SQLiteSource:
+    """Activities and aggregations of a running_page database.
+
+    Used by the TUI like a StatsCube: `aggregate` answers a year and type
+    selection, with `activities` as pages of the database.
+    """
+
+    def __init__(self, path: str | Path, descending: bool = False) -> None:
+        path = Path(path)
+        if not path.exists():
+            raise FileNotFoundError(f"Database not found: {path}")
+        self.path = path
+        self.descending = descending
+        self._conn = sqlite3.connect(
+            path.resolve().as_uri() + "?mode=ro", uri=True, check_same_thread=False
+        )
+        # the connection is shared by the UI thread and workers
+        self._lock = threading.Lock()
+        days = self.query(
+            f"SELECT DISTINCT substr(start_date_local, 1, 10) FROM activities"
+            f" WHERE {WHERE} ORDER BY 1"
+        )
+        self.streaks = _streaks([day for (day,) in days])
+        self.types = [t for (t,) in self.query("SELECT DISTINCT type FROM activities")]
+        self.cells = self._build_cells()
+        self.activities = ActivityPages(self)
+
+    def query(self, sql: str, params: Sequence = ()) -> list[tuple]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def ordered(self, descending: bool) -> SQLiteSource:
+        """The source with its activities in another order, on this connection."""
+        source = SQLiteSource.__new__(SQLiteSource)
+        source.__dict__.update(self.__dict__)
+        source.descending = descending
+        source.cells = source._build_cells()
+        source.activities = ActivityPages(source)
+        return source
+
+    def _where(
+        self, year: Optional[str], sport_type: Optional[str]
+    ) -> tuple[str, list]:
+        where, params = [WHERE], []
+        if year is not None:
+            where.append("start_date_local >= ? AND start_date_local < ?")
+            params += [year, str(int(year) + 1)]
+        if sport_type is not None:
+            st = sport_type.lower()
+            types = [
+                t for t in self.types if SPORT_TYPE_ALIASES.get(t, t).lower() == st
+            ]
+            where.append(f"type IN ({', '.join('?' * len(types))})")
+            params += types
+        return " AND ".join(where), params
+
+    def aggregate(
+        self, year: Optional[str] = None, sport_type: Optional[str] = None
+    ) -> AggregatedData:
+        """Aggregate the activities of a year and/or sport type, None for all."""
+        cells = _select_cells(self.cells, year, sport_type)
+        if len(cells) == len(self.cells):
+            activities = self.activities
+        else:
+            activities = ActivityPages(self, *self._where(year, sport_type))
+        return _merge_cells(activities, cells)
+
+    def polyline(self, run_id: int) -> Optional[str]:
+        rows = self.query(
+            "SELECT summary_polyline FROM activities WHERE run_id = ?", (run_id,)
+        )
+        return rows[0][0] if rows else None
+
+    def activity(self, row: tuple) -> Activity:
+        *values, has_route = row
+        values[3] = _moving_time(values[3])
+        a = Activity(
+            *values[:9],
+            None,  # summary_polyline, fetched by polyline()
+            *values[9:],
+            streak=self.streaks.get(values[7][:10], 0),
+        )
+        a.has_route = bool(has_route)
+        return a
+
+    # ── cells ──────────────────────────────────────────────
+
+    def _build_cells(self) -> dict[tuple[str, str], _Cell]:
+        """Cells of every (year, sport type), from GROUP BY queries.
+
+        Their indices are the ranks of the first activity in each place
+        rather than list positions, which is all _merge_cells reads of them
+        to keep the cities in order of appearance. Dict entries are added in
+        the order of the list too, so the cells depend on it.
+        """
+        cells: dict[tuple[str, str], _Cell] = {}
+        self._add_days(cells)
+        self._add_periods(cells)
+        self._add_locations(cells)
+        return dict(sorted(cells.items()))
+
+    def _cell(self, cells: dict, year: str, raw_type: str) -> _Cell:
+        key = (year, SPORT_TYPE_ALIASES.get(raw_type, raw_type))
+        if key not in cells:
+            cells[key] = _Cell(*key)
+        return cells[key]
+
+    def _add_days(self, cells: dict) -> None:
+        order = "DESC" if self.descending else "ASC"
+        rows = self.query(
+            f"""SELECT substr(start_date_local, 1, 10), type, COUNT(*),
+                TOTAL({KM}),
+                COALESCE(SUM(CAST(strftime('%s', moving_time) AS INTEGER)), 0),
+                TOTAL(elevation_gain), TOTAL(average_heartrate),
+                COUNT(NULLIF(average_heartrate, 0)),
+                MAX({KM}), MAX(average_speed * 3.6),
+                SUM({KM} >= :full), SUM({KM} >= :half AND {KM} < :full),
+                SUM({KM} >= 10 AND {KM} < :half)
+            FROM activities WHERE {WHERE}
+            GROUP BY 1, 2 ORDER BY 1 {order}, 2""",
+            {"full": FULL_MARATHON, "half": HALF_MARATHON},
+        )
+        days: dict[tuple[str, str], list] = {}
+        for day, raw_type, count, km, seconds, elevation, hr, hr_count, *rest in rows:
+            cell = self._cell(cells, day[:4], raw_type)
+            max_km, max_speed, *races = rest
+            cell.count += count
+            cell.distance += km
+            cell.time_sec += seconds
+            cell.elevation += elevation
+            cell.heart_rate_sum += hr
+            cell.heart_rate_count += hr_count
+            cell.max_distance = max(cell.max_distance, max_km)
+            cell.max_speed = max(cell.max_speed, max_speed or 0.0)
+            cell.max_streak = max(cell.max_streak, self.streaks[day])
+            cell.daily_distances[day] = cell.daily_distances.get(day, 0) + km
+            for label, races_count in zip(RACE_LABELS, races):
+                if races_count:
+                    cell.races[label] = cell.races.get(label, 0) + races_count
+            if cell.first_date is None or day < cell.first_date:
+                cell.first_date = day
+            if cell.last_date is None or day > cell.last_date:
+                cell.last_date = day
+            days.setdefault((cell.year, cell.sport_type), []).append((day, km, count))
+        for key, entries in days.items():
+            dates, kms, counts = zip(*entries)
+            cells[key].month_index = MonthIndex(
+                [date.fromisoformat(d) for d in dates], kms, counts
+            )
+
+    def _first_rows(self, sql: str) -> list[tuple]:
+        """Rows of a GROUP BY query whose last column is {first}(ROW_KEY),
+        in order of their first activity in the list."""
+        first = "MAX" if self.descending else "MIN"
+        rows = self.query(sql.format(first=f"{first}({ROW_KEY})"))
+        return sorted(rows, key=lambda row: row[-1], reverse=self.descending)
+
+    def _add_periods(self, cells: dict) -> None:
+        rows = self._first_rows(f"""SELECT substr(start_date_local, 1, 4), type,
+                CAST(substr(start_date_local, 12, 2) AS INTEGER), COUNT(*), {{first}}
+            FROM activities WHERE {WHERE} GROUP BY 1, 2, 3""")
+        for year, raw_type, hour, count, _ in rows:
+            cell = self._cell(cells, year, raw_type)
+            period = _period(hour)
+            label = PERIOD_LABELS.get(period, period)
+            cell.periods[label] = cell.periods.get(label, 0) + count
+
+    def _add_locations(self, cells: dict) -> None:
+        rows = self._first_rows(
+            f"""SELECT substr(start_date_local, 1, 4), type, location_country,
+                COUNT(*), TOTAL({KM}), TOTAL(elevation_gain), {{first}}
+            FROM activities WHERE {WHERE} GROUP BY 1, 2, 3"""
+        )
+        for rank, row in enumerate(rows):
+            year, raw_type, location, count, km, elevation, _ = row
+            cell = self._cell(cells, year, raw_type)
+            city, province, country = _location(location)
+            if city:
+                if city not in cell.city_details:
+                    cell.city_details[city] = LocationStats(
+                        city=city, province=province, country=country
+                    )
+                    cell.city_first[city] = len(cell.indices)
+                    cell.indices.append(rank)
+                details = cell.city_details[city]
+                details.total_distance += km
+                details.count += count
+                details.total_elevation += elevation
+            if province:
+                cell.provinces[province] = cell.provinces.get(province, 0) + km
+            if country:
+                cell.countries[country] = cell.countries.get(country, 0) + km
+
+
+class ActivityPages(Sequence):
+    """The activities matching a WHERE clause, read a page at a time.
+
+    Indexing fetches the page holding the row with LIMIT/OFFSET and keeps
+    the last CACHED_PAGES pages, so scrolling the list reads each page once
+    and memory stays bounded however many rows match.
+    """
+
+    def __init__(self, source: SQLiteSource, where: str = WHERE, params=()) -> None:
+        self.source = source
+        self.where = where
+        self.params = list(params)
+        self.order = "DESC" if source.descending else "ASC"
+        self._len: Optional[int] = None
+        self._pages: OrderedDict[int, list[Activity]] = OrderedDict()
+        self._year_runs: tuple[Optional[str], list[Activity]] = (None, [])
+
+    def __len__(self) -> int:
+        if self._len is None:
+            sql = f"SELECT COUNT(*) FROM activities WHERE {self.where}"
+            self._len = self.source.query(sql, self.params)[0][0]
+        return self._len
+
+    def _select(self, where: str = "", suffix: str = "") -> str:
+        return (
+            f"SELECT {COLUMNS} FROM activities WHERE {self.where}{where}"
+            f" ORDER BY start_date_local {self.order}, run_id {self.order}{suffix}"
+        )
+
+    def _page(self, number: int) -> list[Activity]:
+        page = self._pages.get(number)
+        if page is None:
+            rows = self.source.query(
+                self._select(suffix=" LIMIT ? OFFSET ?"),
+                [*self.params, PAGE_SIZE, number * PAGE_SIZE],
+            )
+            page = [self.source.activity(row) for row in rows]
+            self._pages[number] = page
+            if len(self._pages) > CACHED_PAGES:
+                self._pages.popitem(last=False)
+        else:
+            self._pages.move_to_end(number)
+        return page
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("activity index out of range")
+        return self._page(index // PAGE_SIZE)[index % PAGE_SIZE]
+
+    def position(self, run_id: int) -> Optional[int]:
+        """Index of an activity, None if it is not one of these."""
+        found = self.source.query(
+            f"SELECT {ROW_KEY} FROM activities WHERE {self.where} AND run_id = ?",
+            [*self.params, run_id],
+        )
+        if not found:
+            return None
+        before = "<" if self.order == "ASC" else ">"
+        sql = (
+            f"SELECT COUNT(*) FROM activities WHERE {self.where}"
+            f" AND {ROW_KEY} {before} ?"
+        )
+        return self.source.query(sql, [*self.params, found[0][0]])[0][0]
+
+    def year_runs(self, year: str) -> list[Activity]:
+        if self._year_runs[0] != year:
+            rows = self.source.query(
+                self._select(" AND start_date_local >= ? AND start_date_local < ?"),
+                [*self.params, year, str(int(year) + 1)],
+            )
+            self._year_runs = (year, [self.source.activity(row) for row in rows])
+        return self._year_runs[1]
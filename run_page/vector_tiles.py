@@ -0,0 +1,245 @@
+"""Clip routes to web mercator tiles and encode them as Mapbox Vector Tiles.
+
+See https://github.com/mapbox/vector-tile-spec/tree/master/2.1 for the format.
+"""
+
+import math
+import struct
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+# tile coordinates run from 0 to EXTENT, lines are kept up to BUFFER past it
+# so that line joins and caps at tile edges are drawn correctly
+EXTENT = 4096
+BUFFER = 64
+
+# feature geometry types and commands of the spec
+LINESTRING = 2
+MOVE_TO = 1
+LINE_TO = 2
+
+
+def lat_lng_to_world(points) -> np.ndarray:
+    """Web mercator position in [0, 1] of (lat, lng) degrees, as (x, y) rows."""
+    points = np.asarray(points, dtype=float).reshape(-1, 2)
+    lat = np.clip(points[:, 0], -85.0511287798, 85.0511287798)
+    world = np.empty_like(points)
+    world[:, 0] = points[:, 1] / 360 + 0.5
+    world[:, 1] = 0.5 - np.log(np.tan(np.pi / 4 + np.radians(lat) / 2)) / (2 * np.pi)
+    return world
+
+
+def world_to_lng_lat(x: float, y: float) -> Tuple[float, float]:
+    """(lng, lat) degrees of a web mercator position in [0, 1]."""
+    return x * 360 - 180, math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * y))))
+
+
+def tile_bounds(zoom: int, x: int, y: int) -> Tuple[float, float, float, float]:
+    """West, south, east and north edges of a tile in degrees."""
+    n = 2**zoom
+    west, north = world_to_lng_lat(x / n, y / n)
+    east, south = world_to_lng_lat((x + 1) / n, (y + 1) / n)
+    return west, south, east, north
+
+
+def simplify_lines(lines: List[np.ndarray], zoom: int) -> List[np.ndarray]:
+    """Snap world coordinate lines to the pixel grid of a zoom level.
+
+    Points are rounded to tile coordinates, and points repeating the previous
+    one or lying on a straight line between their neighbours are dropped.
+    Lines are returned in tile coordinates of the whole zoom level.
+    """
+    scale = 2**zoom * EXTENT
+    simplified = []
+    for line in lines:
+        points = np.rint(line * scale)
+        moved = np.ones(len(points), dtype=bool)
+        moved[1:] = (points[1:] != points[:-1]).any(axis=1)
+        points = points[moved]
+        if len(points) > 2:
+            deltas = np.diff(points, axis=0)
+            cross = deltas[:-1, 0] * deltas[1:, 1] - deltas[:-1, 1] * deltas[1:, 0]
+            dot = (deltas[:-1] * deltas[1:]).sum(axis=1)
+            keep = np.ones(len(points), dtype=bool)
+            keep[1:-1] = (cross != 0) | (dot < 0)
+            points = points[keep]
+        simplified.append(points)
+    return simplified
+
+
+def clip_to_tiles(
+    lines: List[np.ndarray], zoom: int
+) -> Dict[Tuple[int, int], Dict[int, List[np.ndarray]]]:
+    """Split lines in tile coordinates of a zoom level into its tiles.
+
+    Every segment is clipped to each tile its bounding box touches (with
+    BUFFER) in one vectorized Liang-Barsky pass, and the clipped pieces are
+    joined back into lines.
+
+    Returns {(x, y): {line index: [(N, 2) int arrays of tile coordinates]}}.
+    """
+    n = 2**zoom
+    lines = [(i, line) for i, line in enumerate(lines) if len(line) > 1]
+    if not lines:
+        return {}
+    starts = np.concatenate([line[:-1] for _, line in lines])
+    ends = np.concatenate([line[1:] for _, line in lines])
+    line_ids = np.concatenate([np.full(len(line) - 1, i) for i, line in lines])
+    segment_ids = np.concatenate([np.arange(len(line) - 1) for _, line in lines])
+
+    # the tiles touched by each segment's bounding box
+    lo = np.floor((np.minimum(starts, ends) - BUFFER) / EXTENT).astype(np.int64)
+    hi = np.floor((np.maximum(starts, ends) + BUFFER) / EXTENT).astype(np.int64)
+    lo, hi = np.clip(lo, 0, n - 1), np.clip(hi, 0, n - 1)
+    counts = hi - lo + 1
+    repeats = counts[:, 0] * counts[:, 1]
+    pair = np.repeat(np.arange(len(starts)), repeats)
+    k = np.arange(len(pair)) - np.repeat(np.cumsum(repeats) - repeats, repeats)
+    tx = lo[pair, 0] + k % counts[pair, 0]
+    ty = lo[pair, 1] + k // counts[pair, 0]
+
+    # Liang-Barsky against each tile's buffered box
+    p0 = starts[pair]
+    d = ends[pair] - p0
+    box_lo = np.stack([tx, ty], axis=1) * EXTENT - BUFFER
+    box_hi = box_lo + EXTENT + 2 * BUFFER
+    t0 = np.zeros(len(pair))
+    t1 = np.ones(len(pair))
+    keep = np.ones(len(pair), dtype=bool)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for axis in (0, 1):
+            for p, q in (
+                (-d[:, axis], p0[:, axis] - box_lo[:, axis]),
+                (d[:, axis], box_hi[:, axis] - p0[:, axis]),
+            ):
+                r = q / p
+                keep &= (p != 0) | (q >= 0)
+                t0 = np.where(p < 0, np.maximum(t0, r), t0)
+                t1 = np.where(p > 0, np.minimum(t1, r), t1)
+    keep &= t0 <= t1
+    pair, tx, ty, p0, d, t0, t1 = (a[keep] for a in (pair, tx, ty, p0, d, t0, t1))
+    origin = np.stack([tx, ty], axis=1) * EXTENT
+    first = np.rint(p0 + t0[:, None] * d - origin).astype(np.int64)
+    last = np.rint(p0 + t1[:, None] * d - origin).astype(np.int64)
+
+    # consecutive clipped segments of a line in the same tile form one piece
+    order = np.lexsort((segment_ids[pair], line_ids[pair], ty, tx))
+    pair, tx, ty, t0, t1, first, last = (
+        a[order] for a in (pair, tx, ty, t0, t1, first, last)
+    )
+    line = line_ids[pair]
+    segment = segment_ids[pair]
+    joined = np.zeros(len(pair), dtype=bool)
+    joined[1:] = (
+        (tx[1:] == tx[:-1])
+        & (ty[1:] == ty[:-1])
+        & (line[1:] == line[:-1])
+        & (segment[1:] == segment[:-1] + 1)
+        & (t1[:-1] == 1)
+        & (t0[1:] == 0)
+    )
+    tiles = {}
+    piece_starts = np.flatnonzero(~joined)
+    for start, end in zip(piece_starts, np.append(piece_starts[1:], len(pair))):
+        points = np.concatenate([first[start : start + 1], last[start:end]])
+        moved = np.ones(len(points), dtype=bool)
+        moved[1:] = (points[1:] != points[:-1]).any(axis=1)
+        points = points[moved]
+        if len(points) < 2:
+            continue
+        key = (int(tx[start]), int(ty[start]))
+        tiles.setdefault(key, {}).setdefault(int(line[start]), []).append(points)
+    return tiles
+
+
+def _varint(value: int) -> bytes:
+    out = bytearray()
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+def _key(field: int, wire_type: int) -> bytes:
+    return _varint(field << 3 | wire_type)
+
+
+def _bytes_field(field: int, data: bytes) -> bytes:
+    return _key(field, 2) + _varint(len(data)) + data
+
+
+def _varint_field(field: int, value: int) -> bytes:
+    return _key(field, 0) + _varint(value)
+
+
+def _packed_field(field: int, values) -> bytes:
+    """Packed uint32 varints; long arrays are encoded with numpy at once."""
+    if len(values) < 64:
+        return _bytes_field(field, b"".join(_varint(int(v)) for v in values))
+    values = np.asarray(values, dtype=np.uint64).reshape(-1, 1)
+    shifts = np.arange(0, 35, 7, dtype=np.uint64)
+    groups = (values >> shifts) & np.uint64(0x7F)
+    # a varint has a byte for each 7 bit group up to the highest non-zero one
+    lengths = np.maximum((values >> shifts != 0).sum(axis=1), 1)
+    used = np.arange(len(shifts)) < lengths[:, None]
+    more = np.arange(len(shifts)) < lengths[:, None] - 1
+    data = (groups | np.where(more, 0x80, 0).astype(np.uint64))[used]
+    return _bytes_field(field, data.astype(np.uint8).tobytes())
+
+
+def _zigzag(values: np.ndarray) -> np.ndarray:
+    return (values << 1) ^ (values >> 63)
+
+
+def encode_geometry(lines: List[np.ndarray]) -> List[int]:
+    """Command integers of a (multi) linestring in tile coordinates."""
+    commands = []
+    cursor = np.zeros(2, dtype=np.int64)
+    for points in lines:
+        deltas = _zigzag(np.diff(points, axis=0, prepend=[cursor]))
+        commands.append(MOVE_TO | 1 << 3)
+        commands.extend(deltas[0].tolist())
+        commands.append(LINE_TO | (len(points) - 1) << 3)
+        commands.extend(deltas[1:].ravel().tolist())
+        cursor = points[-1]
+    return commands
+
+
+def _value(value) -> bytes:
+    if isinstance(value, bool):
+        return _varint_field(7, int(value))
+    if isinstance(value, int) and value >= 0:
+        return _varint_field(5, value)
+    if isinstance(value, (int, float)):
+        return _key(3, 1) + struct.pack("<d", value)
+    return _bytes_field(1, str(value).encode())
+
+
+def encode_layer(name: str, features) -> bytes:
+    """Encode (id, properties, lines) features as a linestring layer."""
+    keys, values = {}, {}
+    encoded = []
+    for feature_id, properties, lines in features:
+        tags = []
+        for key, value in properties.items():
+            if value is None:
+                continue
+            tags.append(keys.setdefault(key, len(keys)))
+            tags.append(values.setdefault((type(value), value), len(values)))
+        encoded.append(
+            _bytes_field(
+                2,
+                _varint_field(1, feature_id)
+                + _packed_field(2, tags)
+                + _varint_field(3, LINESTRING)
+                + _packed_field(4, encode_geometry(lines)),
+            )
+        )
+    layer = [_varint_field(15, 2), _bytes_field(1, name.encode())]
+    layer.extend(encoded)
+    layer.extend(_bytes_field(3, key.encode()) for key in keys)
+    layer.extend(_bytes_field(4, _value(value)) for _, value in values)
+    layer.append(_varint_field(5, EXTENT))
+    return _bytes_field(3, b"".join(layer))
@@ -0,0 +1,76 @@
+import datetime
+import unittest
+from types import SimpleNamespace
+
+import svgwrite
+
+from run_page.gpxtrackposter.github_drawer import GithubDrawer, _year_layout
+from run_page.gpxtrackposter.poster import Poster
+from run_page.gpxtrackposter.xy import XY
+
+
+def _track(day: int, length: float, subtype=None) -> SimpleNamespace:
+    start = datetime.datetime(2024, 1, day, 7, 0)
+    return SimpleNamespace(
+        start_time=start,
+        start_time_local=start,
+        end_time=start + datetime.timedelta(minutes=30),
+        length=length,
+        subtype=subtype,
+        moving_dict={},
+    )
+
+
+def _draw(svg_writer: str, interactive: bool) -> str:
+    poster = Poster()
+    poster.colors.update(track2="#4DD2FF", special2="#FFFF00")
+    poster.set_tracks([_track(1, 5000.0), _track(2, 10000.0, "indoor")])
+    poster.svg_writer = svg_writer
+    poster.svg_interactive = interactive
+    drawing = svgwrite.Drawing()
+    GithubDrawer(poster).draw(drawing, XY(200, 300), XY(10, 30))
+    return drawing.tostring()
+
+
+class YearLayoutTest(unittest.TestCase):
+    def test_columns_start_with_january_first(self) -> None:
+        # 2025-01-01 is a Wednesday
+        layout = _year_layout(2025, False)
+        self.assertEqual(len(layout), 365)
+        self.assertEqual(layout[0], ("2025-01-01", 10.0, 3.5 * 3))
+        self.assertEqual(layout[5], ("2025-01-06", 13.5, 3.5))
+        self.assertEqual(layout[-1], ("2025-12-31", 10.0 + 3.5 * 52, 3.5 * 3))
+
+    def test_align_monday_starts_in_the_previous_year(self) -> None:
+        layout = _year_layout(2025, True)
+        self.assertEqual(len(layout), 367)
+        self.assertEqual(layout[0], ("2024-12-30", 10.0, 3.5))
+        self.assertEqual(layout[2], ("2025-01-01", 10.0, 3.5 * 3))
+        self.assertEqual(layout[-1][0], "2025-12-31")
+
+    def test_at_most_54_columns(self) -> None:
+        # a leap year starting on a Sunday needs all of them
+        layout = _year_layout(2012, False)
+        self.assertEqual(layout[-1], ("2012-12-31", 10.0 + 3.5 * 53, 3.5))
+
+
+class GithubDrawerTest(unittest.TestCase):
+    def test_default_output_has_a_rect_with_a_title_per_day(self) -> None:
+        svg = _draw("svgwrite", True)
+        self.assertNotIn("<use", svg)
+        # 366 days and the indoor stripe over January 2nd
+        self.assertEqual(svg.count("<rect"), 367)
+        self.assertEqual(svg.count("<title>"), 366)
+        self.assertIn("<title>2024-01-02 10.0 km</title>", svg)
+
+    def test_other_outputs_reuse_the_day_symbols(self) -> None:
+        svg = _draw("stream", True)
+        self.assertEqual(svg.count("<use"), 366)
+        self.assertEqual(svg.count("<title>"), 366)
+        svg = _draw("svgwrite", False)
+        self.assertEqual(svg.count("<use"), 366)
+        self.assertNotIn("<title>", svg)
+
+
+if __name__ == "__main__":
+    unittest.main()
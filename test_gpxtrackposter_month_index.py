@@ -0,0 +1,74 @@
+import datetime
+import unittest
+from types import SimpleNamespace
+
+from run_page.gpxtrackposter.month_index import MonthIndex
+
+
+def _track(when: str, length: float) -> SimpleNamespace:
+    return SimpleNamespace(
+        start_time_local=datetime.datetime.fromisoformat(when), length=length
+    )
+
+
+class MonthIndexTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.index = MonthIndex.from_tracks(
+            [
+                _track("2023-12-31 07:00:00", 1000.0),
+                _track("2024-01-01 07:00:00", 5000.0),
+                _track("2024-01-01 18:00:00", 2500.0),
+                _track("2024-02-29 07:00:00", 10000.0),
+            ]
+        )
+
+    def test_month_lookups(self) -> None:
+        self.assertEqual(self.index.total(2024, 1), 7500.0)
+        self.assertEqual(self.index.count(2024, 1), 2)
+        self.assertEqual(self.index.total(2023, 12), 1000.0)
+        self.assertEqual(self.index.total(2030, 5), 0.0)
+        self.assertEqual(self.index.count(1990, 5), 0)
+
+    def test_day_and_year_totals(self) -> None:
+        days = self.index.day_totals(2024, 2)
+        self.assertEqual(len(days), 31)
+        self.assertEqual(days[28], 10000.0)
+        self.assertEqual(days.sum(), 10000.0)
+        self.assertEqual(
+            self.index.month_totals(2024).tolist(), [7500.0, 10000.0] + [0.0] * 10
+        )
+        self.assertEqual(self.index.month_counts(2023).tolist(), [0] * 11 + [1])
+
+    def test_year_days(self) -> None:
+        days = self.index.year_day_totals(2024)
+        self.assertEqual(len(days), 366)
+        self.assertEqual(days[0], 7500.0)
+        self.assertEqual(days[31 + 28], 10000.0)
+        self.assertEqual(days.sum(), 17500.0)
+        counts = self.index.year_day_counts(2023)
+        self.assertEqual(len(counts), 365)
+        self.assertEqual(counts[-1], 1)
+        self.assertEqual(counts.sum(), 1)
+
+    def test_empty(self) -> None:
+        index = MonthIndex([], [])
+        self.assertEqual(index.total(2024, 1), 0.0)
+        self.assertEqual(index.month_counts(2024).tolist(), [0] * 12)
+
+    def test_combine(self) -> None:
+        other = MonthIndex.from_tracks(
+            [
+                _track("2022-06-15 07:00:00", 3000.0),
+                _track("2024-01-01 09:00:00", 500.0),
+            ]
+        )
+        combined = MonthIndex.combine([self.index, MonthIndex([], []), other])
+        self.assertEqual(combined.total(2024, 1), 8000.0)
+        self.assertEqual(combined.count(2024, 1), 3)
+        self.assertEqual(combined.total(2022, 6), 3000.0)
+        self.assertEqual(combined.total(2024, 2), 10000.0)
+        self.assertEqual(MonthIndex.combine([]).month_counts(2024).tolist(), [0] * 12)
+
+
+if __name__ == "__main__":
+    unittest.main()
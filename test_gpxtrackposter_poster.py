@@ -0,0 +1,28 @@
+import locale
+import unittest
+
+from run_page.gpxtrackposter.poster import DEFAULT_LOCALE, Poster
+
+
+class PosterLanguageTest(unittest.TestCase):
+    def tearDown(self) -> None:
+        locale.setlocale(locale.LC_ALL, DEFAULT_LOCALE)
+
+    def test_no_language_restores_the_default_locale(self) -> None:
+        # as left by the poster of an earlier job in the same process
+        locale.setlocale(locale.LC_NUMERIC, "C.UTF-8")
+        locale.setlocale(locale.LC_TIME, "C.UTF-8")
+        poster = Poster()
+        poster.set_language(None)
+        self.assertEqual(locale.setlocale(locale.LC_ALL), DEFAULT_LOCALE)
+
+    def test_unknown_language_falls_back_to_the_default_locale(self) -> None:
+        locale.setlocale(locale.LC_TIME, "C.UTF-8")
+        poster = Poster()
+        poster.set_language("xx_XX")
+        self.assertIsNone(poster.language)
+        self.assertEqual(locale.setlocale(locale.LC_ALL), DEFAULT_LOCALE)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+import struct
+import unittest
+import zlib
+
+import numpy as np
+
+from run_page.gpxtrackposter.raster import (
+    accumulate_lines,
+    encode_png,
+    mask_rects,
+    scale_density,
+)
+
+
+class AccumulateLinesTest(unittest.TestCase):
+    def test_density_sums_to_line_length(self) -> None:
+        lines = [
+            np.array([[2.0, 2.5], [12.0, 2.5], [12.0, 8.5]]),
+            np.array([[3.3, 7.1], [9.9, 3.2]]),
+        ]
+        density = accumulate_lines(lines, 16, 12)
+
+        self.assertEqual(density.shape, (12, 16))
+        expected = 10 + 6 + np.hypot(6.6, 3.9)
+        self.assertAlmostEqual(density.sum(), expected)
+        # a horizontal line through pixel centers stays in its row
+        self.assertAlmostEqual(density[1, 5], 0)
+        self.assertAlmostEqual(density[2, 5], 1)
+
+    def test_clips_lines_outside_the_raster(self) -> None:
+        density = accumulate_lines([np.array([[-10.0, 4.5], [20.0, 4.5]])], 10, 10)
+        self.assertAlmostEqual(density.sum(), 10, places=1)
+        self.assertEqual(accumulate_lines([], 4, 3).shape, (3, 4))
+
+    def test_scale_density(self) -> None:
+        density = np.array([[0.0, 1.0], [10.0, 1000.0]])
+        log = scale_density(density, "log")
+        self.assertEqual(log[0, 0], 0)
+        self.assertEqual(log[1, 1], 1)
+        self.assertGreater(log[0, 1], 0.05)
+        percentile = scale_density(density, "percentile", 50)
+        np.testing.assert_allclose(percentile, [[0, 0.1], [1, 1]])
+
+
+class EncodeTest(unittest.TestCase):
+    def test_encode_png(self) -> None:
+        rgba = np.arange(2 * 3 * 4, dtype=np.uint8).reshape(2, 3, 4)
+        png = encode_png(rgba)
+
+        self.assertTrue(png.startswith(b"\x89PNG\r\n\x1a\n"))
+        self.assertEqual(struct.unpack(">II", png[16:24]), (3, 2))
+        length = struct.unpack(">I", png[33:37])[0]
+        self.assertEqual(png[37:41], b"IDAT")
+        rows = np.frombuffer(zlib.decompress(png[41 : 41 + length]), np.uint8)
+        rows = rows.reshape(2, 13)
+        self.assertTrue((rows[:, 0] == 0).all())
+        np.testing.assert_array_equal(rows[:, 1:].reshape(2, 3, 4), rgba)
+
+    def test_mask_rects_cover_the_mask(self) -> None:
+        mask = np.array(
+            [
+                [0, 1, 1, 0, 1],
+                [0, 1, 1, 0, 0],
+                [1, 1, 1, 0, 0],
+                [0, 0, 0, 0, 1],
+            ],
+            dtype=bool,
+        )
+        rects = mask_rects(mask)
+
+        self.assertEqual(
+            rects, [(1, 0, 2, 2), (4, 0, 1, 1), (0, 2, 3, 1), (4, 3, 1, 1)]
+        )
+        covered = np.zeros_like(mask)
+        for x, y, width, height in rects:
+            covered[y : y + height, x : x + width] = True
+        np.testing.assert_array_equal(covered, mask)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+import datetime
+import os
+import tempfile
+import unittest
+from types import SimpleNamespace
+
+from run_page.gpxtrackposter.render_manifest import (
+    RenderManifest,
+    render_digest,
+    task_digest,
+    tracks_digest,
+)
+
+
+def _track(run_id: int, length: float, year: int = 2024) -> SimpleNamespace:
+    start = datetime.datetime(year, 1, run_id, 7, 0)
+    return SimpleNamespace(
+        run_id=run_id,
+        start_time=start,
+        start_time_local=start,
+        end_time=start + datetime.timedelta(hours=1),
+        length=length,
+        special=False,
+        type="Run",
+        moving_dict={"moving_time": datetime.timedelta(hours=1)},
+        polyline_str="",
+        polyline_lods="",
+    )
+
+
+class RenderManifestTest(unittest.TestCase):
+    def test_digest_changes_with_inputs(self) -> None:
+        args = {"type": "circular", "track_color": "red", "workers": 4}
+        tracks = tracks_digest([_track(1, 5000.0), _track(2, 10000.0)])
+        digest = render_digest("code", args, 2024, tracks)
+
+        self.assertEqual(digest, render_digest("code", dict(args), 2024, tracks))
+        self.assertEqual(
+            digest, render_digest("code", {**args, "workers": 1}, 2024, tracks)
+        )
+        self.assertNotEqual(digest, render_digest("code2", args, 2024, tracks))
+        self.assertNotEqual(digest, render_digest("code", args, 2023, tracks))
+        self.assertNotEqual(
+            digest, render_digest("code", {**args, "track_color": "blue"}, 2024, tracks)
+        )
+        changed = tracks_digest([_track(1, 5000.0), _track(2, 10001.0)])
+        self.assertNotEqual(digest, render_digest("code", args, 2024, changed))
+
+    def test_year_tasks_hash_the_tracks_they_draw(self) -> None:
+        def digests(tracks: list) -> dict:
+            tracks_by_year = {}
+            for t in tracks:
+                tracks_by_year.setdefault(t.start_time_local.year, []).append(t)
+            first = min(t.start_time_local for t in tracks)
+            result = {}
+            for poster_type in ("circular", "github", "year_summary"):
+                task = SimpleNamespace(
+                    args=SimpleNamespace(type=poster_type),
+                    poster=SimpleNamespace(yearly_stats=SimpleNamespace(first=first)),
+                    drawer=SimpleNamespace(uses_today=False),
+                    tracks=tracks,
+                    tracks_by_year=tracks_by_year,
+                    year=2024,
+                )
+                result[poster_type] = task_digest(task, "code", {})
+            return result
+
+        tracks = [_track(1, 5000.0), _track(2, 10000.0)]
+        before = digests(tracks)
+        # a run of another year is totalled in the github footer only
+        after = digests([*tracks, _track(3, 5000.0, year=2026)])
+        self.assertEqual(after["circular"], before["circular"])
+        self.assertEqual(after["year_summary"], before["year_summary"])
+        self.assertNotEqual(after["github"], before["github"])
+        # an earlier first run changes the year summary header
+        after = digests([_track(3, 5000.0, year=2020), *tracks])
+        self.assertNotEqual(after["year_summary"], before["year_summary"])
+        self.assertEqual(after["circular"], before["circular"])
+
+    def test_manifest_round_trip(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            output = os.path.join(tmp, "year_2024.svg")
+            manifest_file = os.path.join(tmp, "manifest.json")
+            manifest = RenderManifest(manifest_file)
+            manifest.update(output, "abc")
+            manifest.save()
+
+            manifest = RenderManifest(manifest_file)
+            self.assertFalse(manifest.is_current(output, "abc"))
+            with open(output, "w") as f:
+                f.write("<svg/>")
+            self.assertTrue(manifest.is_current(output, "abc"))
+            self.assertFalse(manifest.is_current(output, "def"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,176 @@
+import os
+import tempfile
+import unittest
+import xml.etree.ElementTree as ET
+
+import numpy as np
+
+from run_page.gpxtrackposter.svg_stream import (
+    CompactDrawing,
+    StreamingDrawing,
+    format_number,
+)
+
+SVG = "{http://www.w3.org/2000/svg}"
+
+
+def _draw(output: str) -> None:
+    d = StreamingDrawing(output, ("200mm", "300mm"))
+    d.viewbox(0, 0, 200, 300)
+    d.add(d.rect((0, 0), (200, 300), fill="#222222"))
+    pattern = d.pattern(id="stripe", size=(2, 2), patternUnits="userSpaceOnUse")
+    pattern.add(d.line((0, 2), (2, 0), stroke="white", stroke_width=0.5))
+    d.defs.add(pattern)
+    polyline = d.polyline(
+        points=np.array([[1.0, 2.123456], [3.5, -0.00001]]),
+        stroke="red",
+        stroke_linejoin="round",
+    )
+    polyline.set_desc(title="2024-01-01 10.0km", desc=42)
+    d.add(polyline)
+    path = d.path(d=("M", 1, 2), fill="none")
+    path.push("l", 0.5, 0.25)
+    tpath = d.textPath(path, "January & co", startOffset=3.25)
+    d.add(path)
+    text = d.text("", fill="white", text_anchor="middle")
+    text.add(tpath)
+    d.add(text)
+    d.save()
+
+
+class StreamingDrawingTest(unittest.TestCase):
+    def test_format_number(self) -> None:
+        self.assertEqual(format_number(3, 3), "3")
+        self.assertEqual(format_number(2.5000, 3), "2.5")
+        self.assertEqual(format_number(2.12345, 3), "2.123")
+        self.assertEqual(format_number(-0.0001, 3), "0")
+        self.assertEqual(format_number(np.float64(10.0), 3), "10")
+
+    def test_output_is_well_formed_and_byte_stable(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            first = os.path.join(tmp, "first.svg")
+            second = os.path.join(tmp, "second.svg")
+            _draw(first)
+            _draw(second)
+            with open(first, "rb") as f1, open(second, "rb") as f2:
+                self.assertEqual(f1.read(), f2.read())
+            root = ET.parse(first).getroot()
+
+        self.assertEqual(root.get("viewBox"), "0 0 200 300")
+        polyline = root.find(f"{SVG}polyline")
+        self.assertEqual(polyline.get("points"), "1,2.123 3.5,0")
+        self.assertEqual(polyline.get("stroke-linejoin"), "round")
+        self.assertEqual(polyline.find(f"{SVG}title").text, "2024-01-01 10.0km")
+        self.assertEqual(polyline.find(f"{SVG}desc").text, "42")
+        path = root.find(f"{SVG}path")
+        self.assertEqual(path.get("d"), "M 1 2 l 0.5 0.25")
+        text_path = root.find(f"{SVG}text/{SVG}textPath")
+        self.assertEqual(
+            text_path.get("{http://www.w3.org/1999/xlink}href"), f"#{path.get('id')}"
+        )
+        self.assertEqual(text_path.text, "January & co")
+        self.assertIsNotNone(root.find(f"{SVG}defs/{SVG}pattern[@id='stripe']"))
+
+    def test_symbols_and_uses(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            output = os.path.join(tmp, "github.svg")
+            d = StreamingDrawing(output)
+            symbol = d.symbol(id="day")
+            symbol.add(d.rect((0, 0), (2.6, 2.6)))
+            d.defs.add(symbol)
+            use = d.use(symbol, insert=(10, 3.5), fill="#444444")
+            use.set_desc(title="2024-01-01")
+            d.add(use)
+            d.save()
+            root = ET.parse(output).getroot()
+
+        self.assertIsNotNone(root.find(f"{SVG}defs/{SVG}symbol[@id='day']/{SVG}rect"))
+        use = root.find(f"{SVG}use")
+        self.assertEqual(use.get("{http://www.w3.org/1999/xlink}href"), "#day")
+        self.assertEqual((use.get("x"), use.get("y")), ("10", "3.5"))
+        self.assertEqual(use.find(f"{SVG}title").text, "2024-01-01")
+
+
+def _draw_tracks(d, tracks: int = 3) -> None:
+    d.viewbox(0, 0, 200, 300)
+    d.add(d.rect((0, 0), (200, 300), fill="#222222"))
+    for i in range(tracks):
+        polyline = d.polyline(
+            points=[(10.0 + i, 10.004), (10.5 + i, 10.004), (11.25 + i, 9.5)],
+            stroke="#4DD2FF",
+            fill="none",
+            stroke_width=0.5,
+            stroke_linejoin="round",
+        )
+        polyline.set_desc(title=f"2024-01-0{i + 1} 10.0km", desc=i + 1)
+        d.add(polyline)
+    d.add(d.text("Runner", insert=(10, 280), fill="#FFFFFF"))
+    d.save()
+
+
+class CompactDrawingTest(unittest.TestCase):
+    def test_number_formatting(self) -> None:
+        d = CompactDrawing(os.devnull, precision=2)
+        self.assertEqual(d.number(0.5), ".5")
+        self.assertEqual(d.number(-0.504), "-.5")
+        self.assertEqual(d.number(12.0), "12")
+        self.assertEqual(d.number(-0.001), "0")
+        self.assertEqual(d.join(["1", "-.5", ".25"]), "1-.5 .25")
+
+    def test_polylines_become_relative_paths_with_css_classes(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            output = os.path.join(tmp, "grid.svg")
+            d = CompactDrawing(output)
+            _draw_tracks(d)
+            root = ET.parse(output).getroot()
+
+        self.assertIn(
+            ".grid-0{fill:none;stroke-width:.5;stroke-linejoin:round}",
+            root.find(f"{SVG}style").text,
+        )
+        paths = root.findall(f"{SVG}path")
+        self.assertEqual(len(paths), 3)
+        self.assertEqual(paths[0].get("d"), "M10 10l.5 0 .75-.5")
+        self.assertEqual(paths[0].get("class"), "grid-0")
+        self.assertEqual(paths[0].get("stroke"), "#4DD2FF")
+        self.assertEqual(paths[2].find(f"{SVG}desc").text, "3")
+        self.assertLess(d.compact_size, d.plain_size)
+        self.assertIn("x smaller", d.size_report())
+
+    def test_static_output_merges_same_style_shapes_in_order(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            output = os.path.join(tmp, "grid.svg")
+            _draw_tracks(CompactDrawing(output, interactive=False))
+            root = ET.parse(output).getroot()
+
+        children = [child.tag for child in root if child.tag != f"{SVG}style"]
+        self.assertEqual(children, [f"{SVG}path", f"{SVG}path", f"{SVG}text"])
+        background, tracks = root.findall(f"{SVG}path")
+        self.assertEqual(background.get("d"), "M0 0h200v300h-200z")
+        self.assertEqual(background.get("fill"), "#222222")
+        self.assertEqual(tracks.get("d").count("M"), 3)
+        self.assertIsNone(root.find(f".//{SVG}title"))
+
+    def test_static_output_expands_uses_of_rect_symbols(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            output = os.path.join(tmp, "github.svg")
+            d = CompactDrawing(output, interactive=False)
+            symbol = d.symbol(id="day")
+            symbol.add(d.rect((0, 0), (2, 2)))
+            d.defs.add(symbol)
+            for x in (10, 20):
+                d.add(d.use("#day", insert=(x, 5), fill="#444444"))
+            d.add(d.use(symbol, insert=(30, 5), fill="red"))
+            d.save()
+            root = ET.parse(output).getroot()
+
+        self.assertIsNotNone(root.find(f"{SVG}defs/{SVG}symbol/{SVG}rect"))
+        self.assertIsNone(root.find(f"{SVG}use"))
+        gray, red = root.findall(f"{SVG}path")
+        self.assertEqual(gray.get("d"), "M10 5h2v2h-2zM20 5h2v2h-2z")
+        self.assertEqual(gray.get("fill"), "#444444")
+        self.assertEqual(red.get("d"), "M30 5h2v2h-2z")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,133 @@
+import time
+import unittest
+
+import numpy as np
+import s2sphere as s2
+
+from run_page.gpxtrackposter.utils import (
+    COLOR_STEPS,
+    color_gradient,
+    compute_grid,
+    coordinates_bbox,
+    interpolate_color,
+    latlng2xy,
+    project,
+)
+from run_page.gpxtrackposter.value_range import ValueRange
+from run_page.gpxtrackposter.xy import XY
+
+DIMENSIONS = [XY(180, 240), XY(190, 77.5), XY(200, 200), XY(0.9, 13.1)]
+
+
+def _brute_force_grid(count: int, dimensions: XY):
+    """Exhaustive search over every (count_x, count_y) pair, in the same order."""
+    counts = np.arange(1, count + 1, dtype=float)
+    size_y = dimensions.y / counts
+    best = (None, None, -1.0)
+    for count_x in range(1, count + 1):
+        size = np.minimum(dimensions.x / count_x, size_y)
+        waste = dimensions.x * dimensions.y - count * size * size
+        valid = (count_x * counts >= count) & (waste >= 0)
+        if not valid.any():
+            continue
+        index = int(np.argmin(np.where(valid, waste, np.inf)))
+        if best[0] is None or waste[index] < best[2]:
+            best = (size[index], (count_x, index + 1), waste[index])
+    return best[0], best[1]
+
+
+class ComputeGridTest(unittest.TestCase):
+    def test_matches_brute_force_for_small_counts(self) -> None:
+        for dimensions in DIMENSIONS:
+            for count in range(0, 160):
+                with self.subTest(count=count, dimensions=dimensions):
+                    self.assertEqual(
+                        compute_grid(count, dimensions),
+                        _brute_force_grid(count, dimensions),
+                    )
+
+    def test_matches_brute_force_for_large_counts(self) -> None:
+        for dimensions in DIMENSIONS:
+            for count in (997, 1024, 3571, 5000):
+                with self.subTest(count=count, dimensions=dimensions):
+                    self.assertEqual(
+                        compute_grid(count, dimensions),
+                        _brute_force_grid(count, dimensions),
+                    )
+
+    def test_scales_to_100k_tracks(self) -> None:
+        dimensions = XY(180, 240)
+        for count in (10_000, 54_321, 100_000):
+            with self.subTest(count=count):
+                start = time.perf_counter()
+                size, (count_x, count_y) = compute_grid(count, dimensions)
+                self.assertLess(time.perf_counter() - start, 2.0)
+                self.assertGreaterEqual(count_x * count_y, count)
+                self.assertEqual(
+                    size, min(dimensions.x / count_x, dimensions.y / count_y)
+                )
+                self.assertGreaterEqual(
+                    dimensions.x * dimensions.y - count * size * size, 0
+                )
+
+
+class ProjectTest(unittest.TestCase):
+    def test_matches_per_point_projection(self) -> None:
+        line = np.array(
+            [(38.86 + 0.001 * i, 121.51 + 0.002 * (i % 5)) for i in range(50)]
+        )
+        bbox = coordinates_bbox([line])
+        size, offset = XY(20, 30), XY(5, 7)
+
+        projected = project(bbox, size, offset, [line])
+
+        self.assertEqual(len(projected), 1)
+        self.assertEqual(projected[0].shape, (50, 2))
+        d_x = (bbox.lng_hi().degrees - bbox.lng_lo().degrees) / 180
+        d_y = abs(latlng2xy(bbox.lo()).y - latlng2xy(bbox.hi()).y)
+        scale = min(size.x / d_x, size.y / d_y)
+        first = latlng2xy(s2.LatLng.from_degrees(*line[0]))
+        last = latlng2xy(s2.LatLng.from_degrees(*line[-1]))
+        np.testing.assert_allclose(
+            projected[0][-1] - projected[0][0],
+            [scale * (last.x - first.x), scale * (last.y - first.y)],
+        )
+
+    def test_splits_lines_leaving_bbox(self) -> None:
+        line = np.array([(1.0, 1.0), (1.5, 1.5), (5.0, 5.0), (1.2, 1.8), (2.0, 2.0)])
+        bbox = s2.LatLngRect.from_point_pair(
+            s2.LatLng.from_degrees(1.0, 1.0), s2.LatLng.from_degrees(2.0, 2.0)
+        )
+
+        projected = project(bbox, XY(10, 10), XY(0, 0), [line])
+
+        self.assertEqual([len(segment) for segment in projected], [2, 2])
+
+
+class ColorGradientTest(unittest.TestCase):
+    def test_hsl_gradient_matches_interpolate_color(self) -> None:
+        gradient = color_gradient("#4DD2FF", "#FF0000")
+        self.assertEqual(len(gradient), COLOR_STEPS)
+        self.assertIs(gradient, color_gradient("#4DD2FF", "#FF0000"))
+        for ratio in (0, 0.25, 0.5, 1):
+            index = ValueRange.from_pair(0, 1).index(ratio, COLOR_STEPS)
+            self.assertEqual(
+                gradient[index],
+                interpolate_color("#4DD2FF", "#FF0000", index / (COLOR_STEPS - 1)),
+            )
+
+    def test_rgb_gradient(self) -> None:
+        gradient = color_gradient("#000000", "#ff8000", 3, space="rgb")
+        self.assertEqual(gradient, ("#000000", "#7f4000", "#ff8000"))
+
+    def test_value_range_index_is_clamped(self) -> None:
+        length_range = ValueRange.from_pair(1000, 11000)
+        self.assertEqual(length_range.index(1000, 256), 0)
+        self.assertEqual(length_range.index(6000, 256), 128)
+        self.assertEqual(length_range.index(50000, 256), 255)
+        self.assertEqual(length_range.index(0, 256), 0)
+        self.assertEqual(ValueRange.from_pair(5, 5).index(5, 256), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
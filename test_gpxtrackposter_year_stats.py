@@ -0,0 +1,69 @@
+import datetime
+import unittest
+from types import SimpleNamespace
+
+from run_page.gpxtrackposter.year_stats import YearlyStats
+
+
+def _track(when: str, length: float, moving_time=None) -> SimpleNamespace:
+    start = datetime.datetime.fromisoformat(when)
+    return SimpleNamespace(
+        start_time=start,
+        start_time_local=start,
+        end_time=start + datetime.timedelta(seconds=length / 2),
+        length=length,
+        moving_dict={} if moving_time is None else {"moving_time": moving_time},
+    )
+
+
+class YearlyStatsTest(unittest.TestCase):
+    def setUp(self) -> None:
+        # out of order on purpose, the sweep sorts by start time
+        self.stats = YearlyStats.from_tracks(
+            [
+                _track("2024-01-02 07:00:00", 42195.0, datetime.timedelta(hours=4)),
+                _track("2023-12-31 07:00:00", 21097.5, 7200),
+                _track("2024-01-01 07:00:00", 10000.0),
+                _track("2024-01-01 18:00:00", 5000.0),
+                _track("2024-01-04 07:00:00", 3000.0),
+            ]
+        )
+
+    def test_year_stats(self) -> None:
+        year = self.stats.year(2024)
+        self.assertEqual(year.count, 4)
+        self.assertEqual(year.total_length, 60195.0)
+        self.assertEqual(year.moving_time, 4 * 3600 + 5000 + 2500 + 1500)
+        self.assertEqual(year.longest, 42195.0)
+        self.assertEqual(
+            (year.marathon_count, year.half_marathon_count, year.ten_k_count),
+            (1, 0, 1),
+        )
+        # Jan 1st and 2nd; the streak doesn't carry over from Dec 31st
+        self.assertEqual(year.streak, 2)
+        self.assertEqual(self.stats.year(2023).half_marathon_count, 1)
+        self.assertEqual(self.stats.year(2023).streak, 1)
+        self.assertEqual(self.stats.year(2030).count, 0)
+
+    def test_overall_stats(self) -> None:
+        self.assertEqual(self.stats.count, 5)
+        self.assertEqual(self.stats.total_length, 81292.5)
+        self.assertEqual(self.stats.length_range.lower(), 3000.0)
+        self.assertEqual(self.stats.length_range.upper(), 42195.0)
+        # (2023, 52), (2024, 1)
+        self.assertEqual(self.stats.weeks, 2)
+        self.assertEqual(self.stats.first, datetime.datetime(2023, 12, 31, 7))
+        self.assertEqual(self.stats.last, datetime.datetime(2024, 1, 4, 7))
+        self.assertEqual(
+            self.stats.total_length_by_year(), {2023: 21097.5, 2024: 60195.0}
+        )
+
+    def test_empty(self) -> None:
+        stats = YearlyStats([], [], [])
+        self.assertEqual(stats.years, {})
+        self.assertIsNone(stats.first)
+        self.assertEqual(stats.weeks, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
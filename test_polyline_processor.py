@@ -0,0 +1,56 @@
+import json
+import unittest
+
+import polyline
+
+from run_page.polyline_processor import (
+    LOD_TOLERANCES,
+    build_polyline_lods,
+    select_polyline_lod,
+    simplify_points,
+)
+
+
+def _zigzag(count: int = 400) -> list[tuple[float, float]]:
+    return [
+        (38.0 + i * 0.0001, 121.0 + (0.00002 if i % 2 else 0.0)) for i in range(count)
+    ]
+
+
+class PolylineLodTest(unittest.TestCase):
+    def test_simplify_points_keeps_endpoints_and_drops_noise(self) -> None:
+        points = _zigzag()
+
+        simplified = simplify_points(points, 0.0001)
+
+        self.assertEqual(simplified, [points[0], points[-1]])
+        self.assertEqual(simplify_points(points, 0), points)
+
+    def test_build_polyline_lods_is_coarser_at_each_level(self) -> None:
+        summary_polyline = polyline.encode(
+            [(38.0 + 0.01 * (i % 7) / 7, 121.0 + i * 0.0001) for i in range(300)]
+        )
+
+        lods = json.loads(build_polyline_lods(summary_polyline))
+
+        self.assertEqual(len(lods), len(LOD_TOLERANCES))
+        counts = [len(polyline.decode(lod)) for lod in lods]
+        self.assertEqual(counts, sorted(counts, reverse=True))
+        self.assertLess(counts[-1], len(polyline.decode(summary_polyline)))
+
+    def test_build_polyline_lods_skips_trivial_routes(self) -> None:
+        self.assertEqual(build_polyline_lods(""), "")
+        self.assertEqual(build_polyline_lods(polyline.encode([(1.0, 2.0)])), "")
+
+    def test_select_polyline_lod_picks_cheapest_level_for_budget(self) -> None:
+        lods = json.dumps(["fine", "medium", "coarse"])
+
+        self.assertEqual(select_polyline_lod("full", lods, 10), "coarse")
+        self.assertEqual(select_polyline_lod("full", lods, 60), "medium")
+        self.assertEqual(select_polyline_lod("full", lods, 200), "fine")
+        self.assertEqual(select_polyline_lod("full", lods, 4000), "full")
+        self.assertEqual(select_polyline_lod("full", "", 10), "full")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -7,11 +7,14 @@ from run_page.tui.app import (
     FilterBar,
     NavSidebar,
     RunDetailPanel,
+    RouteMapWidget,
     RunningTUI,
+    RunTable,
     StatsView,
+    _monthly_counts,
     _monthly_distances,
 )
-from run_page.tui.data import Activity, YearStats
+from run_page.tui.data import Activity, aggregate_activities
 
 
 def _activity(run_id: int, date_local: str) -> dict:
@@ -40,23 +43,33 @@ def _many_activities(count: int = 108) -> list[dict]:
     ]
 
 
+async def _settle(app: RunningTUI, pilot) -> None:
+    """Wait until the app's load, sort and filter workers are done."""
+    await pilot.pause()
+    while any(worker.is_running for worker in app.workers):
+        await pilot.pause()
+
+
 class RunningTUITest(unittest.IsolatedAsyncioTestCase):
     def test_monthly_distances_aggregates_by_month(self) -> None:
-        year_stats = YearStats(
-            year="2026",
-            daily_distances={
-                "2026-01-01": 5.0,
-                "2026-01-15": 3.5,
-                "2026-02-02": 7.0,
-            },
-        )
+        activities = [
+            Activity(**_activity(1, "2026-01-01")),
+            Activity(**{**_activity(2, "2026-01-15"), "distance": 3500.0}),
+            Activity(**{**_activity(3, "2026-02-02"), "distance": 7000.0}),
+            Activity(**_activity(4, "2025-12-31")),
+        ]
+        data = aggregate_activities(activities)
 
-        totals = _monthly_distances(year_stats)
+        totals = _monthly_distances(data, "2026")
+        counts = _monthly_counts(data, "2026")
 
         self.assertEqual(len(totals), 12)
         self.assertAlmostEqual(totals[0], 8.5)
         self.assertAlmostEqual(totals[1], 7.0)
         self.assertTrue(all(value == 0 for value in totals[2:]))
+        self.assertEqual(counts[:3], [2, 1, 0])
+        self.assertEqual(_monthly_counts(data, "2025")[11], 1)
+        self.assertEqual(_monthly_distances(data, "2024"), [0.0] * 12)
 
     async def test_default_year_filter_uses_latest_year(self) -> None:
         from tempfile import TemporaryDirectory
@@ -75,7 +88,7 @@ class RunningTUITest(unittest.IsolatedAsyncioTestCase):
             app = RunningTUI(data_path)
 
             async with app.run_test() as pilot:
-                await pilot.pause()
+                await _settle(app, pilot)
 
                 filter_bar = app.query_one(FilterBar)
                 detail = app.query_one(RunDetailPanel)
@@ -122,18 +135,201 @@ class RunningTUITest(unittest.IsolatedAsyncioTestCase):
 
             async with app.run_test() as pilot:
                 await pilot.press("1")
-                await pilot.pause()
+                await _settle(app, pilot)
 
                 detail = app.query_one(RunDetailPanel)
                 self.assertIsNotNone(detail.activity)
                 self.assertEqual(detail.activity.date_local, "2026-01-01")
 
                 await pilot.press("down")
-                await pilot.pause()
+                await _settle(app, pilot)
 
                 self.assertIsNotNone(detail.activity)
                 self.assertEqual(detail.activity.date_local, "2026-01-02")
 
+    async def test_run_table_formats_only_visible_rows(self) -> None:
+        from tempfile import TemporaryDirectory
+
+        with TemporaryDirectory() as tmp:
+            data_path = f"{tmp}/activities.json"
+            with open(data_path, "w") as fh:
+                json.dump(_many_activities(), fh)
+
+            app = RunningTUI(data_path)
+
+            async with app.run_test(size=(120, 30)) as pilot:
+                await pilot.press("1")
+                await _settle(app, pilot)
+
+                table = app.query_one(RunTable)
+                self.assertEqual(len(table.activities), 108)
+                self.assertEqual(table.render_line(0).text.split()[:2], ["#", "Date"])
+                self.assertIn(" 1 ", table.render_line(1).text)
+                self.assertLess(
+                    len(table._rows), table.size.height + 2 * table.OVERSCAN
+                )
+
+                await pilot.press("end")
+                await _settle(app, pilot)
+
+                self.assertEqual(table.cursor_row, 107)
+                self.assertGreater(table.scroll_offset.y, 0)
+                self.assertIn(" 108 ", table.render_line(table.size.height - 1).text)
+                self.assertNotIn(0, table._rows)
+                self.assertIs(
+                    app.query_one(RunDetailPanel).activity, table.activities[107]
+                )
+
+                await pilot.press("up")
+                await _settle(app, pilot)
+
+                self.assertEqual(table.cursor_row, 106)
+                self.assertIs(
+                    app.query_one(RunDetailPanel).activity, table.activities[106]
+                )
+
+    async def test_filters_and_sort_run_in_workers(self) -> None:
+        from tempfile import TemporaryDirectory
+
+        with TemporaryDirectory() as tmp:
+            data_path = f"{tmp}/activities.json"
+            with open(data_path, "w") as fh:
+                json.dump(
+                    [
+                        _activity(1, "2024-01-01"),
+                        _activity(2, "2025-01-02"),
+                        _activity(3, "2025-03-04"),
+                        _activity(4, "2026-01-03"),
+                    ],
+                    fh,
+                )
+
+            app = RunningTUI(data_path)
+
+            async with app.run_test() as pilot:
+                await _settle(app, pilot)
+                # each selection supersedes the aggregation still in flight
+                await pilot.press("left", "left", "right", "s")
+                await _settle(app, pilot)
+
+                self.assertEqual(app.query_one(FilterBar).selected_year, "2025")
+                self.assertEqual(app.filtered_data.total_count, 2)
+                self.assertEqual(
+                    [a.date_local for a in app._displayed_activities],
+                    ["2025-01-02", "2025-03-04"],
+                )
+                self.assertEqual(app._busy, 0)
+                self.assertFalse(app.query_one(RunTable).loading)
+
+                await pilot.press("s")
+                await _settle(app, pilot)
+
+                self.assertEqual(
+                    [a.date_local for a in app._displayed_activities],
+                    ["2025-03-04", "2025-01-02"],
+                )
+
+    async def test_data_file_changes_are_applied_in_place(self) -> None:
+        from tempfile import TemporaryDirectory
+
+        with TemporaryDirectory() as tmp:
+            data_path = f"{tmp}/activities.json"
+            activities = [_activity(i, f"2026-01-{i:02d}") for i in range(1, 6)]
+            with open(data_path, "w") as fh:
+                json.dump(activities, fh)
+
+            app = RunningTUI(data_path)
+
+            async with app.run_test() as pilot:
+                await _settle(app, pilot)
+                await pilot.press("down", "down")
+                await _settle(app, pilot)
+                selected = app.query_one(RunDetailPanel).activity
+                self.assertEqual(selected.run_id, 3)
+                unchanged = app.activities[3]
+                self.assertEqual(app.search_index.search("2026-01-02"), {2})
+
+                # a sync adds a run, edits one and deletes another
+                activities[0]["distance"] = 12000.0
+                del activities[1]
+                activities.append(_activity(6, "2026-01-06"))
+                with open(data_path, "w") as fh:
+                    json.dump(activities, fh)
+                app._check_data_file()
+                await _settle(app, pilot)
+
+                self.assertEqual(
+                    [a.run_id for a in app._displayed_activities], [1, 3, 4, 5, 6]
+                )
+                self.assertEqual(app.filtered_data.total_distance, 32.0)
+                self.assertIs(app.activities[2], unchanged)
+                self.assertEqual(app.search_index.search("2026-01-0"), {1, 3, 4, 5, 6})
+                # the cursor stays on the selected run
+                self.assertEqual(app.query_one(RunTable).cursor_row, 1)
+                self.assertEqual(app.query_one(RunDetailPanel).activity.run_id, 3)
+
+    async def test_database_is_read_without_loading_every_row(self) -> None:
+        import sqlite3
+        from tempfile import TemporaryDirectory
+
+        import polyline
+
+        from run_page.tui.sqlite_source import SQLiteSource
+
+        routes = {
+            i: polyline.encode([(39.9, 116.4), (39.9 + i / 100, 116.5)])
+            for i in range(7)
+        }
+
+        def insert(conn, run_id: int, date_local: str) -> None:
+            row = _activity(run_id, date_local)
+            del row["streak"]
+            row["moving_time"] = "1970-01-01 00:25:00.000000"
+            row["summary_polyline"] = routes[run_id]
+            conn.execute(
+                f"INSERT INTO activities ({', '.join(row)})"
+                f" VALUES ({', '.join('?' * len(row))})",
+                list(row.values()),
+            )
+
+        with TemporaryDirectory() as tmp:
+            data_path = f"{tmp}/data.db"
+            with sqlite3.connect(data_path) as conn:
+                conn.execute(
+                    "CREATE TABLE activities (run_id INTEGER PRIMARY KEY, name,"
+                    " distance, moving_time, type, subtype, start_date,"
+                    " start_date_local, location_country, summary_polyline,"
+                    " average_heartrate, elevation_gain, average_speed)"
+                )
+                for i in range(1, 6):
+                    insert(conn, i, f"2026-01-{i:02d}")
+            conn.close()
+
+            app = RunningTUI(data_path)
+
+            async with app.run_test() as pilot:
+                await _settle(app, pilot)
+                await pilot.press("down")
+                await _settle(app, pilot)
+
+                self.assertIsInstance(app.cube, SQLiteSource)
+                self.assertEqual(app.filtered_data.total_count, 5)
+                selected = app.query_one(RunDetailPanel).activity
+                self.assertEqual(selected.run_id, 2)
+                self.assertIsNone(selected.summary_polyline)
+                self.assertEqual(app.query_one(RouteMapWidget).polyline_str, routes[2])
+
+                # a sync writes to the database while the TUI reads it
+                with sqlite3.connect(data_path) as conn:
+                    insert(conn, 6, "2025-12-31")
+                conn.close()
+                app._check_data_file()
+                await _settle(app, pilot)
+
+                self.assertEqual(len(app.activities), 6)
+                self.assertEqual(app.query_one(RunTable).cursor_row, 1)
+                self.assertEqual(app.query_one(RunDetailPanel).activity.run_id, 2)
+
     def test_run_detail_rows_keep_city_only(self) -> None:
         activity = Activity(
             run_id=1,
@@ -224,7 +420,7 @@ class RunningTUITest(unittest.IsolatedAsyncioTestCase):
 
             async with app.run_test() as pilot:
                 await pilot.press("y")
-                await pilot.pause()
+                await _settle(app, pilot)
 
                 self.assertEqual(app.query_one(FilterBar).selected_year, "2025")
                 self.assertEqual(app.query_one(StatsView).period_label, "2025-2026")
@@ -248,7 +444,7 @@ class RunningTUITest(unittest.IsolatedAsyncioTestCase):
 
             async with app.run_test() as pilot:
                 await pilot.press("y", "y")
-                await pilot.pause()
+                await _settle(app, pilot)
 
                 self.assertEqual(app.query_one(FilterBar).selected_year, "2021")
                 self.assertEqual(app.query_one(StatsView).period_label, "2021-2022")
@@ -265,7 +461,7 @@ class RunningTUITest(unittest.IsolatedAsyncioTestCase):
 
             async with app.run_test(size=(160, 55)) as pilot:
                 await pilot.press("2")
-                await pilot.pause()
+                await _settle(app, pilot)
 
                 stats_view = app.query_one(StatsView)
 
@@ -283,12 +479,47 @@ class RunningTUITest(unittest.IsolatedAsyncioTestCase):
 
             async with app.run_test(size=(120, 24)) as pilot:
                 await pilot.press("2")
-                await pilot.pause()
+                await _settle(app, pilot)
 
                 stats_view = app.query_one(StatsView)
 
                 self.assertGreater(stats_view.max_scroll_y, 0)
 
+    async def test_stats_view_resize_reuses_series(self) -> None:
+        from tempfile import TemporaryDirectory
+
+        class Untouchable(list):
+            def __iter__(self):
+                raise AssertionError("activities read on resize")
+
+            __getitem__ = __iter__
+
+        with TemporaryDirectory() as tmp:
+            data_path = f"{tmp}/activities.json"
+            with open(data_path, "w") as fh:
+                json.dump(_many_activities(), fh)
+
+            app = RunningTUI(data_path)
+
+            async with app.run_test(size=(120, 40)) as pilot:
+                await pilot.press("2")
+                await _settle(app, pilot)
+
+                data = app.query_one(StatsView).data
+                series = dict(data._series)
+                self.assertIn(("distances", "2026"), series)
+                data.activities = Untouchable(data.activities)
+
+                await pilot.resize_terminal(150, 60)
+                await _settle(app, pilot)
+                await pilot.resize_terminal(100, 30)
+                await _settle(app, pilot)
+
+                self.assertEqual(data._series.keys(), series.keys())
+                self.assertIs(
+                    data.monthly_distances("2026"), series[("distances", "2026")]
+                )
+
     async def test_left_right_keys_switch_selected_year(self) -> None:
         from tempfile import TemporaryDirectory
 
@@ -307,15 +538,15 @@ class RunningTUITest(unittest.IsolatedAsyncioTestCase):
             app = RunningTUI(data_path)
 
             async with app.run_test() as pilot:
-                await pilot.pause()
+                await _settle(app, pilot)
 
                 filter_bar = app.query_one(FilterBar)
                 self.assertEqual(filter_bar.selected_year, "2026")
 
                 await pilot.press("left")
-                await pilot.pause()
+                await _settle(app, pilot)
                 self.assertEqual(filter_bar.selected_year, "2025")
 
                 await pilot.press("right")
-                await pilot.pause()
+                await _settle(app, pilot)
                 self.assertEqual(filter_bar.selected_year, "2026")
@@ -0,0 +1,67 @@
+import random
+import unittest
+
+import polyline
+
+from run_page.tui.braille import BrailleCanvas, _render, render_polyline
+
+
+def _bresenham(x0: int, y0: int, x1: int, y1: int) -> set:
+    dx, sx = abs(x1 - x0), 1 if x0 < x1 else -1
+    dy, sy = -abs(y1 - y0), 1 if y0 < y1 else -1
+    err = dx + dy
+    points = set()
+    while True:
+        points.add((x0, y0))
+        if x0 == x1 and y0 == y1:
+            return points
+        e2 = 2 * err
+        if e2 >= dy:
+            err += dy
+            x0 += sx
+        if e2 <= dx:
+            err += dx
+            y0 += sy
+
+
+class BrailleCanvasTest(unittest.TestCase):
+    def test_draw_lines_sets_bresenham_dots(self) -> None:
+        rng = random.Random(7)
+        for _ in range(500):
+            xs = [rng.randint(-5, 45) for _ in range(4)]
+            ys = [rng.randint(-5, 45) for _ in range(4)]
+            canvas = BrailleCanvas(20, 10)
+            canvas.draw_lines(xs, ys)
+            expected = set()
+            for i in range(3):
+                expected |= _bresenham(xs[i], ys[i], xs[i + 1], ys[i + 1])
+            expected = {(x, y) for x, y in expected if 0 <= x < 40 and 0 <= y < 40}
+            dots = {(x, y) for y, x in zip(*canvas.dots.nonzero())}
+            self.assertEqual(dots, expected, (xs, ys))
+
+    def test_to_lines_packs_dots_into_braille(self) -> None:
+        canvas = BrailleCanvas(2, 2)
+        canvas.draw_line(0, 0, 0, 3)
+        canvas.draw_line(3, 7, 3, 7)
+        self.assertEqual(canvas.to_lines(), ["⡇⠀", "⠀⢀"])
+
+
+class RenderPolylineTest(unittest.TestCase):
+    def test_render_is_cached(self) -> None:
+        route = polyline.encode([(39.90, 116.39), (39.91, 116.40), (39.92, 116.38)])
+        lines = render_polyline(route, 20, 6)
+        self.assertEqual(len(lines), 6)
+        self.assertTrue(all(len(line) == 20 for line in lines))
+
+        hits = _render.cache_info().hits
+        lines.append("changed by the caller")
+        self.assertEqual(render_polyline(route, 20, 6), lines[:-1])
+        self.assertEqual(_render.cache_info().hits, hits + 1)
+
+    def test_short_route(self) -> None:
+        route = polyline.encode([(39.9, 116.4)])
+        self.assertEqual(render_polyline(route, 20, 6), ["  (route has 1 point(s))"])
+
+
+if __name__ == "__main__":
+    unittest.main()
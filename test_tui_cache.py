@@ -0,0 +1,99 @@
+import json
+import os
+import unittest
+from tempfile import TemporaryDirectory
+
+from run_page.tui.cache import cache_path, read_cache
+from run_page.tui.data import Activity, load_activities
+
+
+def _activity(run_id: int, **extra) -> dict:
+    return {
+        "run_id": run_id,
+        "name": f"晨跑 {run_id}",
+        "distance": 5000.5,
+        "moving_time": "00:25:00",
+        "type": "Run",
+        "subtype": None,
+        "start_date": "2026-01-01 00:00:00",
+        "start_date_local": "2026-01-01 08:00:00",
+        "location_country": "沈阳市, 辽宁省, 中国",
+        "summary_polyline": "_p~iF~ps|U_ulLnnqC",
+        "average_heartrate": None,
+        "elevation_gain": 12.5,
+        "average_speed": 3.33,
+        "streak": 1,
+        **extra,
+    }
+
+
+class ActivityCacheTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "activities.json")
+        self._write([_activity(1), _activity(2, name="", summary_polyline=None)])
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def _write(self, activities: list[dict], mtime_ns: int = 10**18) -> None:
+        with open(self.path, "w") as f:
+            json.dump(activities, f)
+        os.utime(self.path, ns=(mtime_ns, mtime_ns))
+
+    def test_cache_round_trips_activities(self) -> None:
+        self.assertIsNone(read_cache(self.path))
+        activities = load_activities(self.path)
+
+        self.assertTrue(cache_path(self.path).exists())
+        cached = read_cache(self.path)
+        self.assertEqual(cached, activities)
+        self.assertIsInstance(cached[0], Activity)
+        self.assertEqual(cached[0].name, "晨跑 1")
+        self.assertIsNone(cached[0].average_heartrate)
+        self.assertEqual(cached[1].name, "")
+        self.assertIsNone(cached[1].summary_polyline)
+        # derived fields are stored too, not recomputed
+        for name in ("date_obj", "hour", "moving_seconds", "pace_min_km", "city"):
+            self.assertEqual(getattr(cached[0], name), getattr(activities[0], name))
+        self.assertEqual((cached[0].has_route, cached[1].has_route), (True, False))
+        self.assertEqual(load_activities(self.path), activities)
+
+    def test_cache_is_rebuilt_when_the_json_changes(self) -> None:
+        load_activities(self.path)
+        self._write([_activity(3)], mtime_ns=2 * 10**18)
+
+        self.assertIsNone(read_cache(self.path))
+        self.assertEqual([a.run_id for a in load_activities(self.path)], [3])
+        self.assertEqual([a.run_id for a in read_cache(self.path)], [3])
+
+    def test_invalid_cache_is_ignored(self) -> None:
+        cache_path(self.path).write_bytes(b"not a cache")
+        self.assertIsNone(read_cache(self.path))
+        self.assertEqual(len(load_activities(self.path)), 2)
+
+    def test_corrupt_cache_is_a_miss(self) -> None:
+        load_activities(self.path)
+        data = cache_path(self.path).read_bytes()
+        cache_path(self.path).write_bytes(data[:20])
+        with self.assertLogs("run_page.tui.data", "WARNING"):
+            activities = load_activities(self.path)
+        self.assertEqual([a.run_id for a in activities], [1, 2])
+        # and is replaced by a good one
+        self.assertEqual(read_cache(self.path), activities)
+
+    def test_activities_load_when_the_cache_cannot_be_written(self) -> None:
+        self._write([_activity(1), _activity("x")])
+        with self.assertLogs("run_page.tui.data", "WARNING"):
+            activities = load_activities(self.path)
+        self.assertEqual([a.run_id for a in activities], [1, "x"])
+        self.assertEqual(os.listdir(self.tmp.name), ["activities.json"])
+
+    def test_empty_activities(self) -> None:
+        self._write([])
+        self.assertEqual(load_activities(self.path), [])
+        self.assertEqual(read_cache(self.path), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
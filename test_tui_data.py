@@ -0,0 +1,298 @@
+import unittest
+from datetime import date
+
+from run_page.tui.data import (
+    Activity,
+    SearchIndex,
+    StatsCube,
+    aggregate_activities,
+    build_contribution_grid,
+    diff_activities,
+    filter_activities,
+    make_search_filter,
+    make_type_filter,
+    make_year_filter,
+)
+
+
+def _activity(**extra) -> Activity:
+    return Activity(
+        **{
+            "run_id": 1,
+            "name": "Morning Run",
+            "distance": 10000.0,
+            "moving_time": "00:50:30",
+            "type": "running",
+            "subtype": None,
+            "start_date": "2026-03-01 23:30:00",
+            "start_date_local": "2026-03-02 07:30:00",
+            "location_country": "浑南区, 沈阳市, 辽宁省, 110142, 中国",
+            "summary_polyline": "",
+            "average_heartrate": None,
+            "elevation_gain": None,
+            "average_speed": 3.3,
+            "streak": 1,
+            **extra,
+        }
+    )
+
+
+class ActivityTest(unittest.TestCase):
+    def test_derived_fields(self) -> None:
+        a = _activity()
+        self.assertEqual(a.distance_km, 10.0)
+        self.assertEqual((a.year, a.date_local), ("2026", "2026-03-02"))
+        self.assertEqual(a.date_obj, date(2026, 3, 2))
+        self.assertEqual((a.hour, a.period, a.period_label), (7, "Morning", "清晨跑步"))
+        self.assertEqual(a.moving_seconds, 3030)
+        self.assertEqual(a.formatted_time, "50m30s")
+        self.assertEqual(a.pace_seconds_per_km, 303.0)
+        self.assertEqual(a.pace_min_km, "5:03")
+        self.assertEqual((a.city, a.province, a.country), ("沈阳市", "辽宁省", "中国"))
+        self.assertEqual(a.race_label, "10K")
+        self.assertEqual(a.sport_type_normalized, "Run")
+        self.assertFalse(a.has_route)
+
+    def test_derived_fields_fallbacks(self) -> None:
+        a = _activity(
+            distance=0.0,
+            moving_time="2 days, 01:00:00",
+            start_date_local="2026-03-02 23:00:00",
+            location_country="Kyoto, Kyoto Prefecture, 日本",
+        )
+        self.assertEqual(a.moving_seconds, 2 * 86400 + 3600)
+        self.assertEqual(a.formatted_time, "2 days, 01:00:00")
+        self.assertIsNone(a.pace_min_km)
+        self.assertIsNone(a.race_label)
+        self.assertEqual(a.period, "Night")
+        self.assertEqual(
+            (a.city, a.province, a.country), ("Kyoto", "Kyoto Prefecture", "日本")
+        )
+        self.assertEqual(_activity(location_country=None).city, "")
+
+    def test_derived_fields_are_not_compared(self) -> None:
+        self.assertEqual(_activity(), _activity())
+        self.assertNotEqual(_activity(), _activity(distance=5000.0))
+        with self.assertRaises(AttributeError):
+            _activity().extra = 1
+
+
+class StatsCubeTest(unittest.TestCase):
+    def setUp(self) -> None:
+        runs = [
+            (
+                "2026-03-02 07:30:00",
+                "running",
+                10000.0,
+                "浑南区, 沈阳市, 辽宁省, 110142, 中国",
+            ),
+            ("2026-02-01 18:00:00", "Ride", 30000.0, "朝阳区, 北京市, 100000, 中国"),
+            ("2025-12-31 12:00:00", "running", 42500.0, "浑南区, 沈阳市, 中国"),
+            ("2025-12-30 07:00:00", "Run", 21500.0, "Kyoto, Kyoto Prefecture, 日本"),
+            ("2024-05-01 21:00:00", "Hike", 5000.0, None),
+        ]
+        self.activities = [
+            _activity(
+                run_id=i,
+                start_date_local=start,
+                type=sport_type,
+                distance=distance,
+                location_country=location,
+                average_heartrate=140.0 + i,
+                elevation_gain=10.0 * i,
+                streak=i,
+            )
+            for i, (start, sport_type, distance, location) in enumerate(runs)
+        ]
+        self.cube = StatsCube(self.activities)
+
+    def test_aggregate_matches_filtered_activities(self) -> None:
+        for year in [None, "2024", "2025", "2026", "2030"]:
+            for sport_type in [None, "Run", "ride", "Hike"]:
+                filters = []
+                if year:
+                    filters.append(make_year_filter(year))
+                if sport_type:
+                    filters.append(make_type_filter(sport_type))
+                expected = aggregate_activities(
+                    filter_activities(self.activities, filters)
+                )
+                data = self.cube.aggregate(year, sport_type)
+                for name in vars(expected):
+                    if name == "month_index":
+                        for y in (2024, 2025, 2026):
+                            self.assertEqual(
+                                data.month_index.month_totals(y).tolist(),
+                                expected.month_index.month_totals(y).tolist(),
+                            )
+                        continue
+                    self.assertEqual(
+                        getattr(data, name),
+                        getattr(expected, name),
+                        (year, sport_type, name),
+                    )
+
+    def test_aggregate(self) -> None:
+        data = self.cube.aggregate()
+        self.assertIs(data.activities, self.activities)
+        self.assertEqual(data.years, ["2026", "2025", "2024"])
+        self.assertEqual(data.type_counts, {"Hike": 1, "Run": 3, "Ride": 1})
+        self.assertEqual(data.races, {"全程马拉松": 1, "半程马拉松": 2, "10K": 1})
+        self.assertEqual(
+            (data.first_date, data.last_date), ("2024-05-01", "2026-03-02")
+        )
+        # the province of a city comes from its first activity
+        self.assertEqual(data.city_details["沈阳市"].province, "辽宁省")
+        self.assertEqual(data.city_details["沈阳市"].count, 2)
+        self.assertEqual(data.year_stats["2025"].streak, 3)
+
+        runs = self.cube.aggregate("2025", "run")
+        self.assertEqual([a.run_id for a in runs.activities], [2, 3])
+        self.assertEqual(runs.total_distance, 64.0)
+        self.assertEqual(self.cube.aggregate("2030").total_count, 0)
+
+    def test_patch_matches_rebuild(self) -> None:
+        new = [
+            _activity(run_id=7, start_date_local="2025-06-01 07:00:00"),
+            self.activities[0],
+            _activity(run_id=1, type="Run", distance=5000.0, streak=1),
+            *self.activities[3:],
+        ]
+        activities, changes = diff_activities(self.activities, new)
+
+        self.assertEqual([a.run_id for a in changes.added], [7])
+        self.assertEqual([new.run_id for _, new in changes.changed], [1])
+        self.assertEqual([a.run_id for a in changes.removed], [2])
+        self.assertEqual(
+            changes.cell_keys,
+            {("2025", "Run"), ("2026", "Ride"), ("2026", "Run")},
+        )
+        self.assertIs(activities[1], self.activities[0])
+
+        patched = self.cube.patch(activities, changes)
+        self.assertEqual(patched.cells[("2024", "Hike")].count, 1)
+        self.assertEqual(patched.cells.keys(), StatsCube(activities).cells.keys())
+        for year in [None, "2025", "2026"]:
+            expected = StatsCube(activities).aggregate(year)
+            data = patched.aggregate(year)
+            self.assertEqual(data.activities, expected.activities)
+            self.assertEqual(data.year_stats, expected.year_stats)
+            self.assertEqual(data.city_details, expected.city_details)
+            self.assertEqual(data.total_distance, expected.total_distance)
+        self.assertFalse(diff_activities(activities, activities)[1])
+
+
+class ContributionGridTest(unittest.TestCase):
+    def test_grid_levels_and_memo(self) -> None:
+        activities = [
+            _activity(run_id=1, start_date_local="2024-01-01 07:00:00"),
+            _activity(run_id=2, start_date_local="2024-01-01 18:00:00"),
+            _activity(run_id=3, start_date_local="2024-03-04 07:00:00"),
+            _activity(
+                run_id=4, start_date_local="2024-12-31 07:00:00", distance=4000.0
+            ),
+            _activity(run_id=5, start_date_local="2025-01-01 07:00:00"),
+        ]
+        grid = build_contribution_grid(activities, "2024")
+        cells = {c.date_str: c for week in grid.weeks for c in week if c}
+        # 2024 starts on a Monday and is a leap year
+        self.assertEqual(len(cells), 366)
+        self.assertEqual(grid.weeks[0][0].date_str, "2024-01-01")
+        self.assertEqual(cells["2024-01-01"].distance_km, 20.0)
+        self.assertEqual(cells["2024-01-01"].level, 4)
+        self.assertEqual(cells["2024-03-04"].level, 2)
+        self.assertEqual(cells["2024-12-31"].level, 1)
+        self.assertEqual(cells["2024-06-01"].level, 0)
+        self.assertEqual(grid.month_labels[:2], [(0, 1, "1月"), (5, 1, "2月")])
+
+        data = aggregate_activities(activities)
+        self.assertEqual(data.contribution_grid("2024"), grid)
+        self.assertIs(data.contribution_grid("2024"), data.contribution_grid("2024"))
+        self.assertEqual(build_contribution_grid(activities, "2023").weeks, [])
+        self.assertEqual(data.contribution_grid("2023").weeks, [])
+        self.assertEqual(data.contribution_grid("all").weeks, [])
+
+
+class SearchIndexTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.activities = [
+            _activity(run_id=1),
+            _activity(
+                run_id=2,
+                name="Evening Ride",
+                type="cycling",
+                start_date_local="2025-11-20 18:00:00",
+                location_country="朝阳区, 北京市, 100000, 中国",
+            ),
+            _activity(
+                run_id=3,
+                name="Tempo 10K",
+                location_country="Brooklyn, New York, United States",
+            ),
+        ]
+        self.index = SearchIndex(self.activities)
+
+    def test_words_match_token_prefixes(self) -> None:
+        self.assertEqual(self.index.search("morn"), {1})
+        self.assertEqual(self.index.search("RIDE"), {2})
+        self.assertEqual(self.index.search("10k"), {3})
+        self.assertEqual(self.index.search("new york"), {3})
+        self.assertEqual(self.index.search("run tempo"), {3})
+        self.assertEqual(self.index.search("york new"), {3})
+        self.assertEqual(self.index.search("ork"), set())
+        self.assertEqual(self.index.search(""), {1, 2, 3})
+
+    def test_dates_match_by_prefix(self) -> None:
+        self.assertEqual(self.index.search("2026-03"), {1, 3})
+        self.assertEqual(self.index.search("2025-11-2"), {2})
+        self.assertEqual(self.index.search("2025-12"), set())
+
+    def test_cjk_matches_bigrams(self) -> None:
+        self.assertEqual(self.index.search("沈阳"), {1})
+        self.assertEqual(self.index.search("阳市"), {1})
+        self.assertEqual(self.index.search("辽宁省"), {1})
+        self.assertEqual(self.index.search("市"), {1, 2})
+        self.assertEqual(self.index.search("中国"), {1, 2})
+        self.assertEqual(self.index.search("美国"), {3})
+        self.assertEqual(self.index.search("北京 ride"), {2})
+        self.assertEqual(self.index.search("沈北"), set())
+
+    def test_search_filter_uses_the_index(self) -> None:
+        for query in ("run", "中国", "2026", "ride 朝阳"):
+            matched = filter_activities(
+                self.activities, [make_search_filter(query, self.index)]
+            )
+            self.assertEqual(
+                [a.run_id for a in matched], sorted(self.index.search(query))
+            )
+        self.assertEqual(
+            filter_activities(self.activities, [make_search_filter("阳市")]),
+            [self.activities[0]],
+        )
+
+    def test_patch_matches_rebuild(self) -> None:
+        new = [
+            _activity(run_id=1, name="Long Run", location_country=None),
+            self.activities[2],
+            _activity(run_id=4, name="Evening Walk", type="Walk"),
+        ]
+        activities, changes = diff_activities(self.activities, new)
+        patched = self.index.patch(changes)
+        expected = SearchIndex(activities)
+
+        self.assertEqual(patched.run_ids, expected.run_ids)
+        self.assertEqual(patched.tokens, expected.tokens)
+        self.assertEqual(patched.postings, expected.postings)
+        self.assertEqual(patched.search("ride"), set())
+        self.assertEqual(patched.search("evening"), {4})
+        self.assertEqual(self.index.search("evening"), {2})
+        removed = self.index.patch(diff_activities(self.activities, new[1:2])[1])
+        self.assertEqual(removed.postings, SearchIndex(new[1:2]).postings)
+        # no token appears or disappears, the sorted tokens are shared
+        farther = [_activity(run_id=1, distance=12000.0), *self.activities[1:]]
+        patched = self.index.patch(diff_activities(self.activities, farther)[1])
+        self.assertIs(patched.tokens, self.index.tokens)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,160 @@
+import math
+import os
+import sqlite3
+import unittest
+from dataclasses import fields
+from tempfile import TemporaryDirectory
+
+from run_page.tui.data import StatsCube
+from run_page.tui.sqlite_source import PAGE_SIZE, SQLiteSource, source_key
+
+SCHEMA = """CREATE TABLE activities (
+    run_id INTEGER NOT NULL, name VARCHAR, distance FLOAT, moving_time DATETIME,
+    elapsed_time DATETIME, type VARCHAR, subtype VARCHAR, start_date VARCHAR,
+    start_date_local VARCHAR, location_country VARCHAR, summary_polyline VARCHAR,
+    average_heartrate FLOAT, average_speed FLOAT, elevation_gain FLOAT,
+    summary_polyline_lods VARCHAR, PRIMARY KEY (run_id)
+)"""
+
+PLACES = [
+    "沈阳市, 辽宁省, 110142, 中国",
+    "朝阳区, 北京市, 100000, 中国",
+    "Brooklyn, Kings County, New York, United States",
+    None,
+]
+TYPES = ["Run", "running", "Ride", "Walk"]
+
+
+def _row(i: int) -> tuple:
+    day = 1 + i * 3 % 28
+    month = 1 + i * 5 % 12
+    year = 2023 + i % 3
+    km = [5.2, 10.5, 21.3, 42.5, 0.0001][i % 5]
+    seconds = int(km * 330) + i
+    return (
+        1000 + i,
+        f"Run {i}",
+        km * 1000,
+        f"1970-01-01 {seconds // 3600:02d}:{seconds // 60 % 60:02d}"
+        f":{seconds % 60:02d}.000000",
+        TYPES[i % len(TYPES)],
+        None,
+        f"{year}-{month:02d}-{day:02d} {i % 24:02d}:00:00+00:00",
+        f"{year}-{month:02d}-{day:02d} {(i * 7) % 24:02d}:{i % 60:02d}:00",
+        PLACES[i % len(PLACES)],
+        "_p~iF~ps|U_ulLnnqC" if i % 3 else None,
+        [None, 0.0, 150.0, 161.5][i % 4],
+        3.0 + i % 4,
+        [None, 12.5, 0.0][i % 3],
+    )
+
+
+class SQLiteSourceTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "data.db")
+        conn = sqlite3.connect(self.path)
+        conn.execute(SCHEMA)
+        conn.executemany(
+            "INSERT INTO activities (run_id, name, distance, moving_time, type,"
+            " subtype, start_date, start_date_local, location_country,"
+            " summary_polyline, average_heartrate, average_speed, elevation_gain)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [_row(i) for i in range(2 * PAGE_SIZE + 30)],
+        )
+        conn.commit()
+        conn.close()
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def assertSame(self, got, expected, where: str) -> None:
+        if isinstance(expected, float):
+            self.assertTrue(math.isclose(got, expected, abs_tol=1e-9), where)
+        elif isinstance(expected, dict):
+            self.assertEqual(list(got), list(expected), where)
+            for key in expected:
+                self.assertSame(got[key], expected[key], f"{where}[{key}]")
+        elif hasattr(expected, "__dataclass_fields__"):
+            for f in fields(expected):
+                self.assertSame(
+                    getattr(got, f.name), getattr(expected, f.name), where + f.name
+                )
+        else:
+            self.assertEqual(got, expected, where)
+
+    def test_aggregates_match_the_cube_of_its_rows(self) -> None:
+        for descending in (False, True):
+            source = SQLiteSource(self.path).ordered(descending)
+            cube = StatsCube(list(source.activities))
+            for year in (None, "2023", "2025", "2030"):
+                for sport_type in (None, "Run", "ride", "Swim"):
+                    got = source.aggregate(year, sport_type)
+                    expected = cube.aggregate(year, sport_type)
+                    where = f"{descending} {year} {sport_type}: "
+                    self.assertEqual(
+                        [a.run_id for a in got.activities],
+                        [a.run_id for a in expected.activities],
+                    )
+                    for f in fields(expected):
+                        if f.name == "activities":
+                            continue
+                        value = getattr(expected, f.name)
+                        if f.name == "month_index":
+                            self.assertEqual(
+                                got.month_index.counts.tolist(), value.counts.tolist()
+                            )
+                            continue
+                        self.assertSame(getattr(got, f.name), value, where + f.name)
+
+    def test_rows_are_read_like_the_generator(self) -> None:
+        source = SQLiteSource(self.path)
+        activities = source.activities
+        # the 0.1 m activities are skipped
+        self.assertEqual(len(activities), sum(i % 5 != 4 for i in range(430)))
+        dates = [a.start_date_local for a in activities]
+        self.assertEqual(dates, sorted(dates))
+        self.assertEqual(activities[-1].run_id, list(activities)[-1].run_id)
+
+        a = next(a for a in activities if a.run_id == 1001)
+        self.assertEqual(a.moving_time, "0:57:46")
+        self.assertEqual(a.moving_seconds, 3466)
+        self.assertEqual(a.sport_type_normalized, "Run")
+        self.assertIsNone(a.summary_polyline)
+        self.assertTrue(a.has_route)
+        self.assertEqual(source.polyline(a.run_id), "_p~iF~ps|U_ulLnnqC")
+        self.assertFalse(next(a for a in activities if a.run_id == 1003).has_route)
+
+    def test_pages_keep_the_order_and_filters(self) -> None:
+        activities = SQLiteSource(self.path).ordered(descending=True).activities
+        dates = [a.start_date_local for a in activities]
+        self.assertEqual(dates, sorted(dates, reverse=True))
+        for index in (0, PAGE_SIZE - 1, PAGE_SIZE, len(activities) - 1):
+            self.assertEqual(activities.position(activities[index].run_id), index)
+        self.assertIsNone(activities.position(1004))  # a skipped activity
+
+        runs = SQLiteSource(self.path).aggregate("2024", "Run").activities
+        self.assertTrue(all(a.year == "2024" for a in runs))
+        self.assertTrue(all(a.type in ("Run", "running") for a in runs))
+        self.assertEqual(
+            [a.run_id for a in runs.year_runs("2024")], [a.run_id for a in runs]
+        )
+
+    def test_database_is_only_read(self) -> None:
+        with open(self.path, "rb") as f:
+            content = f.read()
+        SQLiteSource(self.path).aggregate("2024", "Run")
+        with open(self.path, "rb") as f:
+            self.assertEqual(f.read(), content)
+
+    def test_writes_change_the_key(self) -> None:
+        SQLiteSource(self.path)
+        key = source_key(self.path)
+        with sqlite3.connect(self.path) as conn:
+            conn.execute("DELETE FROM activities WHERE run_id = 1000")
+        self.assertNotEqual(source_key(self.path), key)
+        self.assertEqual(len(SQLiteSource(self.path).activities), 343)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,122 @@
+import unittest
+
+import numpy as np
+
+from run_page.vector_tiles import (
+    BUFFER,
+    EXTENT,
+    _packed_field,
+    _varint,
+    clip_to_tiles,
+    encode_geometry,
+    encode_layer,
+    lat_lng_to_world,
+    simplify_lines,
+    tile_bounds,
+)
+
+
+def _read_varint(data: bytes, pos: int):
+    value = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        shift += 7
+        if byte < 0x80:
+            return value, pos
+
+
+def _fields(data: bytes):
+    """(field, value) pairs of a protobuf message with varint and bytes fields."""
+    pos = 0
+    fields = []
+    while pos < len(data):
+        key, pos = _read_varint(data, pos)
+        if key & 7 == 0:
+            value, pos = _read_varint(data, pos)
+        else:
+            length, pos = _read_varint(data, pos)
+            value = data[pos : pos + length]
+            pos += length
+        fields.append((key >> 3, value))
+    return fields
+
+
+class VectorTilesTest(unittest.TestCase):
+    def test_world_coordinates(self) -> None:
+        np.testing.assert_allclose(
+            lat_lng_to_world([(0, 0), (0, 180), (85.0511287798, -180)]),
+            [(0.5, 0.5), (1, 0.5), (0, 0)],
+            atol=1e-9,
+        )
+        west, south, east, north = tile_bounds(1, 1, 0)
+        self.assertEqual((west, east), (0, 180))
+        self.assertAlmostEqual(south, 0)
+        self.assertAlmostEqual(north, 85.0511287798)
+
+    def test_simplify_drops_repeated_and_collinear_points(self) -> None:
+        line = np.array([[0, 0], [1, 0], [1.00001, 0], [2, 0], [2, 3], [0, 3]])
+        (snapped,) = simplify_lines([line / EXTENT], 0)
+        np.testing.assert_array_equal(snapped, [[0, 0], [2, 0], [2, 3], [0, 3]])
+
+    def test_clip_to_tiles_splits_lines_at_tile_edges(self) -> None:
+        # from the middle of tile (0, 0) to the middle of tile (1, 0)
+        line = np.array([[EXTENT / 2, 100.0], [EXTENT * 3 / 2, 100.0]])
+        tiles = clip_to_tiles([line], 1)
+
+        self.assertEqual(sorted(tiles), [(0, 0), (1, 0)])
+        np.testing.assert_array_equal(
+            tiles[(0, 0)][0][0], [[EXTENT / 2, 100], [EXTENT + BUFFER, 100]]
+        )
+        np.testing.assert_array_equal(
+            tiles[(1, 0)][0][0], [[-BUFFER, 100], [EXTENT / 2, 100]]
+        )
+
+    def test_clip_to_tiles_keeps_segments_crossing_a_tile(self) -> None:
+        # both points are outside tile (1, 0), the segment goes through it
+        line = np.array([[100.0, 100.0], [EXTENT * 2 + 100, 100.0], [100, 300]])
+        tiles = clip_to_tiles([line], 2)
+
+        pieces = tiles[(1, 0)][0]
+        self.assertEqual(len(pieces), 2)
+        np.testing.assert_array_equal(
+            pieces[0], [[-BUFFER, 100], [EXTENT + BUFFER, 100]]
+        )
+
+    def test_encode_geometry_matches_the_spec_example(self) -> None:
+        line = np.array([[2, 2], [2, 10], [10, 10]])
+        self.assertEqual(encode_geometry([line]), [9, 4, 4, 18, 0, 16, 16, 0])
+
+    def test_packed_field_encodes_large_arrays_like_single_varints(self) -> None:
+        values = [0, 1, 127, 128, 300, 16383, 16384, 2**28, 2**32 - 1] * 10
+        expected = b"".join(_varint(v) for v in values)
+        self.assertEqual(_packed_field(4, values)[-len(expected) :], expected)
+
+    def test_encode_layer(self) -> None:
+        line = np.array([[2, 2], [2, 10], [10, 10]])
+        tile = encode_layer(
+            "runs",
+            [
+                (7, {"type": "Run", "distance": 5000.5, "name": None}, [line]),
+                (8, {"type": "Run", "run_id": 8}, [line]),
+            ],
+        )
+        ((field, layer),) = _fields(tile)
+        self.assertEqual(field, 3)
+        layer = _fields(layer)
+        self.assertIn((15, 2), layer)
+        self.assertIn((1, b"runs"), layer)
+        self.assertIn((5, EXTENT), layer)
+        self.assertEqual(
+            [value for field, value in layer if field == 3],
+            [b"type", b"distance", b"run_id"],
+        )
+        features = [_fields(value) for field, value in layer if field == 2]
+        self.assertEqual(features[0][0], (1, 7))
+        self.assertEqual(features[1][1], (2, bytes([0, 0, 2, 2])))
+        self.assertEqual(features[1][2], (3, 2))
+
+
+if __name__ == "__main__":
+    unittest.main()